@@ -4,11 +4,11 @@ Handles user authentication, password hashing, and session management.
 """
 
 import logging
+from functools import lru_cache
 from typing import Optional
 
 from fastapi import APIRouter, Form, Request
 from fastapi.responses import RedirectResponse
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from starlette.status import HTTP_302_FOUND
 
@@ -19,12 +19,23 @@ from templates import templates
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Constants
 MAX_PASSWORD_LENGTH = 72  # Bcrypt limit
 
 
+@lru_cache(maxsize=1)
+def _pwd_context():
+    """Password hashing context, built on first use.
+
+    passlib/bcrypt are only needed at login, so importing them lazily keeps
+    them out of the cold start.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt.
     
@@ -41,7 +52,7 @@ def get_password_hash(password: str) -> str:
         password = password[:MAX_PASSWORD_LENGTH]
         logger.warning("Password truncated to 72 characters for hashing")
     
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -58,7 +69,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         if len(plain_password) > MAX_PASSWORD_LENGTH:
             plain_password = plain_password[:MAX_PASSWORD_LENGTH]
         
-        return pwd_context.verify(plain_password, hashed_password)
+        return _pwd_context().verify(plain_password, hashed_password)
     except Exception as e:
         logger.error(f"Password verification error: {e}")
         return False
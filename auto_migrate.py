@@ -1,103 +1,364 @@
 """
-Auto-migration: executa migrations pendentes automaticamente no startup
+Auto-migration: aplica as migrations pendentes no startup
 Útil para ambientes onde não há acesso SSH (Render free tier)
+
+As migrations são versionadas: a tabela schema_version guarda as versões já
+aplicadas. No startup basta uma consulta (MAX(versao)); só quando há versões
+pendentes o esquema é inspecionado e as migrations rodam, uma transação por
+versão, sob uma trava (advisory lock no PostgreSQL) para que vários workers
+subindo juntos não migrem ao mesmo tempo.
+
+Para adicionar uma migration: escreva a função (idempotente, sem commit) e
+acrescente-a ao fim de MIGRACOES com o próximo número de versão. Use SQL
+sobre as tabelas como estão naquela versão, não models nem services: o
+código atual muda e a migration tem de continuar valendo para bancos antigos.
 """
-from sqlalchemy import text, inspect
-from database import engine, SessionLocal
+import argparse
 import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from database import Base, engine
+from utils.cache import TravaArquivo
 
 logger = logging.getLogger(__name__)
 
 
-def verificar_e_executar_migrations():
-    """Verifica e executa migrations necessárias automaticamente"""
+# ==========================================================
+# MIGRATIONS
+# ==========================================================
+# Todas são idempotentes: um banco anterior ao versionamento (sem
+# schema_version) passa por todas e só recebe o que falta.
+
+def _esquema_base(db: Session) -> None:
+    """Cria as tabelas (e seus índices) que ainda não existem."""
+    import models  # noqa: F401  (registra os models no metadata)
+
+    Base.metadata.create_all(bind=db.connection())
+
+
+# (tabela, coluna, tipo) adicionadas depois da criação das tabelas
+COLUNAS_LEGADAS = (
+    ("users", "telefone", "VARCHAR(20)"),
+    ("propostas", "desconto", "FLOAT"),
+    ("propostas", "atualizado_em", "TIMESTAMP"),
+    ("propostas", "responsavel_vendedor", "VARCHAR(200)"),
+    ("propostas", "responsavel_telefone", "VARCHAR(20)"),
+    ("simulacoes", "automatica", "BOOLEAN DEFAULT FALSE"),
+)
+
+
+def _colunas_legadas(db: Session) -> None:
+    inspector = inspect(db.connection())
+    for tabela, coluna, tipo in COLUNAS_LEGADAS:
+        if coluna not in {col["name"] for col in inspector.get_columns(tabela)}:
+            db.execute(text(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}"))
+            logger.info(f"✅ Coluna {tabela}.{coluna} criada")
+
+    db.execute(text("UPDATE propostas SET atualizado_em = criado_em WHERE atualizado_em IS NULL"))
+
+
+def _enum_tipo_notificacao(db: Session) -> None:
+    """
+    Enum tiponotificacao com o valor 'envio' (só PostgreSQL; no SQLite é VARCHAR).
+
+    Exceção à regra "sem commit": ALTER TYPE ... ADD VALUE não roda dentro de
+    uma transação (PostgreSQL < 12) e o valor novo só pode ser usado depois do
+    commit. Por isso vai num passo próprio, em autocommit, como no baseline; o
+    IF NOT EXISTS mantém a migration idempotente se o registro da versão falhar.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return
+
+    existe = db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'tiponotificacao')"
+    )).scalar()
+    if not existe:
+        db.execute(text("CREATE TYPE tiponotificacao AS ENUM ('simulacao', 'cotacao', 'envio')"))
+        logger.info("✅ Enum tiponotificacao criado")
+        return
+
+    tem_envio = db.execute(text("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_enum
+            WHERE enumtypid = (SELECT oid FROM pg_type WHERE typname = 'tiponotificacao')
+            AND enumlabel = 'envio'
+        )
+    """)).scalar()
+    if not tem_envio:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as autocommit:
+            autocommit.execute(text("ALTER TYPE tiponotificacao ADD VALUE IF NOT EXISTS 'envio'"))
+        logger.info("✅ Valor 'envio' adicionado ao enum tiponotificacao")
+
+
+# Preenche propostas.valor_total (itens - desconto) nas linhas ainda sem valor.
+# Mesma regra de Proposta.calcular_valor_total / PropostaService.recalcular_valor_total.
+BACKFILL_VALOR_TOTAL_SQL = """
+    UPDATE propostas
+    SET valor_total = COALESCE((
+            SELECT SUM(COALESCE(i.preco_total, i.preco_unitario * i.quantidade))
+            FROM propostas_produtos i
+            WHERE i.proposta_id = propostas.id
+        ), 0)
+        - CASE WHEN propostas.desconto > 0 THEN propostas.desconto ELSE 0 END
+    WHERE valor_total IS NULL
+"""
+
+
+def _migrar_valor_total(db: Session) -> None:
+    """Cria a coluna materializada propostas.valor_total (com índice) e faz o backfill."""
+    propostas_columns = [col['name'] for col in inspect(db.connection()).get_columns('propostas')]
+
+    if 'valor_total' not in propostas_columns:
+        db.execute(text("ALTER TABLE propostas ADD COLUMN valor_total FLOAT"))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_propostas_valor_total ON propostas (valor_total)"))
+        logger.info("✅ Coluna propostas.valor_total criada")
+
+    resultado = db.execute(text(BACKFILL_VALOR_TOTAL_SQL))
+    if resultado.rowcount:
+        logger.info(f"✅ propostas.valor_total preenchido em {resultado.rowcount} proposta(s)")
+
+
+# Carga inicial do resumo: mesma agregação de ResumoDiarioService._agregar, em SQL
+# sobre as tabelas desta versão (a migration não pode depender do código atual).
+# date() existe no SQLite e no PostgreSQL (cast para date).
+POPULAR_RESUMO_DIARIO_SQL = """
+    INSERT INTO propostas_resumo_diario
+        (dia, status, origem, vendedor_id, quantidade, valor_total, cubagem_total, atualizado_em)
+    SELECT
+        date(criado_em),
+        status,
+        origem,
+        COALESCE(vendedor_id, 0),
+        COUNT(id),
+        COALESCE(SUM(valor_total), 0),
+        COALESCE(SUM(
+            CASE WHEN cubagem_ajustada AND cubagem_manual_m3 IS NOT NULL
+                 THEN cubagem_manual_m3 ELSE cubagem_m3 END
+        ), 0),
+        :agora
+    FROM propostas
+    WHERE criado_em IS NOT NULL
+    GROUP BY date(criado_em), status, origem, COALESCE(vendedor_id, 0)
+"""
+
+
+def _popular_resumo_diario(db: Session) -> None:
+    """Carga inicial de propostas_resumo_diario."""
+    if db.execute(text("SELECT 1 FROM propostas_resumo_diario LIMIT 1")).first() is not None:
+        return
+
+    resultado = db.execute(text(POPULAR_RESUMO_DIARIO_SQL), {"agora": datetime.utcnow()})
+    logger.info(f"✅ propostas_resumo_diario populada com {resultado.rowcount} linha(s)")
+
+
+# Índices declarados nos models que o create_all não cria em tabelas já existentes
+INDICES = (
+    ("ix_propostas_historico_proposta_criado", "propostas_historico (proposta_id, criado_em)"),
+    ("ix_propostas_status_atualizado", "propostas (status, atualizado_em)"),
+    ("ix_propostas_historico_criado", "propostas_historico (criado_em, id)"),
+    ("ix_propostas_historico_status_criado", "propostas_historico (status, criado_em)"),
+    ("ix_propostas_vendedor", "propostas (vendedor_id)"),
+    ("ix_simulacoes_criado", "simulacoes (criado_em, id)"),
+    ("ix_caixas_nome", "caixas (nome, id)"),
+    ("ix_contatos_notificacao_tipo_nome", "contatos_notificacao (tipo, nome, id)"),
+    ("ix_propostas_criado", "propostas (criado_em)"),
+    ("ix_propostas_produtos_proposta", "propostas_produtos (proposta_id)"),
+)
+
+UNICIDADE_COTACOES = "uq_cotacoes_frete_proposta_transportadora"
+
+
+def _criar_indices(db: Session) -> None:
+    for nome, definicao in INDICES:
+        db.execute(text(f"CREATE INDEX IF NOT EXISTS {nome} ON {definicao}"))
+
+
+# Cotações repetidas por (proposta, transportadora): fica a selecionada ou, sem ela, a mais recente
+REMOVER_COTACOES_REPETIDAS_SQL = """
+    DELETE FROM cotacoes_frete
+    WHERE id IN (
+        SELECT id FROM (
+            SELECT
+                id,
+                ROW_NUMBER() OVER (
+                    PARTITION BY proposta_id, transportadora_id
+                    ORDER BY COALESCE(selecionada, FALSE) DESC, id DESC
+                ) AS posicao
+            FROM cotacoes_frete
+        ) ordenadas
+        WHERE posicao > 1
+    )
+"""
+
+
+def _unicidade_cotacoes(db: Session) -> None:
+    """Remove cotações repetidas por (proposta, transportadora) e cria o índice único."""
+    indices = inspect(db.connection()).get_indexes("cotacoes_frete")
+    if any(indice["name"] == UNICIDADE_COTACOES for indice in indices):
+        return
+
+    removidas = db.execute(text(REMOVER_COTACOES_REPETIDAS_SQL)).rowcount
+    db.execute(text(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {UNICIDADE_COTACOES} "
+        "ON cotacoes_frete (proposta_id, transportadora_id)"
+    ))
+    logger.info(f"✅ Índice único {UNICIDADE_COTACOES} criado ({removidas} cotação(ões) repetida(s) removida(s))")
+
+
+def _atualizado_em_obrigatorio(db: Session) -> None:
+    """
+    propostas.atualizado_em NOT NULL: a ordem e o cursor do kanban usam a coluna
+    pura, e uma linha sem valor ficaria fora da paginação por keyset.
+    No SQLite não há ALTER COLUMN: só o preenchimento (bancos novos já nascem
+    com a restrição, pelo model).
+    """
+    resultado = db.execute(
+        text("UPDATE propostas SET atualizado_em = COALESCE(criado_em, :agora) WHERE atualizado_em IS NULL"),
+        {"agora": datetime.utcnow()},
+    )
+    if resultado.rowcount:
+        logger.info(f"✅ propostas.atualizado_em preenchido em {resultado.rowcount} proposta(s)")
+    if db.bind.dialect.name == "postgresql":
+        db.execute(text("ALTER TABLE propostas ALTER COLUMN atualizado_em SET NOT NULL"))
+
+
+# (versão, descrição, migration) em ordem; nunca renumere nem remova versões já publicadas
+MIGRACOES: list[tuple[int, str, Callable[[Session], None]]] = [
+    (1, "esquema base (tabelas dos models)", _esquema_base),
+    (2, "colunas adicionadas após a criação das tabelas", _colunas_legadas),
+    (3, "enum tiponotificacao com 'envio'", _enum_tipo_notificacao),
+    (4, "propostas.valor_total materializado", _migrar_valor_total),
+    (5, "carga inicial de propostas_resumo_diario", _popular_resumo_diario),
+    (6, "índices de kanban, histórico, listagens e caminhos quentes", _criar_indices),
+    (7, "cotação única por proposta e transportadora", _unicidade_cotacoes),
+    (8, "propostas.atualizado_em obrigatório", _atualizado_em_obrigatorio),
+]
+
+
+# ==========================================================
+# EXECUÇÃO
+# ==========================================================
+
+CRIAR_TABELA_VERSAO_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        versao INTEGER PRIMARY KEY,
+        descricao VARCHAR(200) NOT NULL,
+        aplicada_em TIMESTAMP NOT NULL
+    )
+"""
+
+# Chave do pg_advisory_lock das migrations (qualquer inteiro fixo, único no banco)
+CHAVE_TRAVA_MIGRACOES = 740_213_001
+
+# SQLite (desenvolvimento): trava de arquivo entre processos da máquina
+_trava_local = TravaArquivo("migracoes")
+
+
+def _versao_atual(conn) -> int | None:
+    """Maior versão aplicada; None se a tabela schema_version ainda não existe."""
     try:
-        db = SessionLocal()
-        inspector = inspect(engine)
-        
-        # Verificar se coluna telefone existe em users
-        users_columns = [col['name'] for col in inspector.get_columns('users')]
-        
-        if 'telefone' not in users_columns:
-            logger.info("🔧 Executando migration: adicionando coluna users.telefone")
-            db.execute(text("ALTER TABLE users ADD COLUMN telefone VARCHAR(20)"))
-            db.commit()
-            logger.info("✅ Coluna users.telefone criada")
-        
-        # Verificar se tipo tiponotificacao existe
-        result = db.execute(text("""
-            SELECT EXISTS (
-                SELECT 1 FROM pg_type WHERE typname = 'tiponotificacao'
+        versao = conn.execute(text("SELECT MAX(versao) FROM schema_version")).scalar()
+    except SQLAlchemyError:
+        conn.rollback()
+        return None
+    conn.commit()
+    return versao or 0
+
+
+@contextmanager
+def _trava_migracoes(conn):
+    """Só um processo migra por vez; os demais esperam e depois releem a versão."""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_lock(:chave)"), {"chave": CHAVE_TRAVA_MIGRACOES})
+        conn.commit()
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:chave)"), {"chave": CHAVE_TRAVA_MIGRACOES})
+            conn.commit()
+    else:
+        _trava_local.tentar(esperar=True)
+        try:
+            yield
+        finally:
+            _trava_local.liberar()
+
+
+def aplicar_migracoes() -> int:
+    """Aplica as migrations pendentes. Retorna quantas foram aplicadas."""
+    ultima = MIGRACOES[-1][0]
+
+    with engine.connect() as conn:
+        if _versao_atual(conn) == ultima:
+            logger.info(f"Esquema do banco na versão {ultima}")
+            return 0
+
+        with _trava_migracoes(conn):
+            # Outro worker pode ter migrado enquanto esperávamos a trava
+            versao = _versao_atual(conn)
+            if versao is None:
+                conn.execute(text(CRIAR_TABELA_VERSAO_SQL))
+                conn.commit()
+                versao = 0
+
+            aplicadas = 0
+            for numero, descricao, migracao in MIGRACOES:
+                if numero <= versao:
+                    continue
+
+                logger.info(f"🔧 Migration {numero}: {descricao}")
+                db = Session(bind=conn)
+                try:
+                    migracao(db)
+                    db.execute(
+                        text(
+                            "INSERT INTO schema_version (versao, descricao, aplicada_em) "
+                            "VALUES (:versao, :descricao, :aplicada_em)"
+                        ),
+                        {"versao": numero, "descricao": descricao, "aplicada_em": datetime.utcnow()},
+                    )
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"❌ Migration {numero} falhou (as seguintes ficam para o próximo início): {e}")
+                    break
+                finally:
+                    db.close()
+                aplicadas += 1
+
+    if aplicadas:
+        logger.info(f"🎉 {aplicadas} migration(s) aplicada(s)")
+    return aplicadas
+
+
+def versoes_aplicadas() -> list[tuple[int, str, datetime]]:
+    with engine.connect() as conn:
+        if _versao_atual(conn) is None:
+            return []
+        return [
+            tuple(linha)
+            for linha in conn.execute(
+                text("SELECT versao, descricao, aplicada_em FROM schema_version ORDER BY versao")
             )
-        """)).scalar()
-        
-        if not result:
-            logger.info("🔧 Executando migration: criando enum tiponotificacao")
-            db.execute(text("CREATE TYPE tiponotificacao AS ENUM ('simulacao', 'cotacao', 'envio')"))
-            db.commit()
-            logger.info("✅ Enum tiponotificacao criado")
-        else:
-            # Verificar se valor 'envio' existe no enum
-            envio_exists = db.execute(text("""
-                SELECT EXISTS (
-                    SELECT 1 FROM pg_enum 
-                    WHERE enumtypid = (SELECT oid FROM pg_type WHERE typname = 'tiponotificacao')
-                    AND enumlabel = 'envio'
-                )
-            """)).scalar()
-            
-            if not envio_exists:
-                logger.info("🔧 Executando migration: adicionando valor 'envio' ao enum tiponotificacao")
-                db.execute(text("ALTER TYPE tiponotificacao ADD VALUE 'envio'"))
-                db.commit()
-                logger.info("✅ Valor 'envio' adicionado ao enum tiponotificacao")
-        
-        # Verificar se tabela contatos_notificacao existe
-        if 'contatos_notificacao' not in inspector.get_table_names():
-            logger.info("🔧 Executando migration: criando tabela contatos_notificacao")
-            db.execute(text("""
-                CREATE TABLE contatos_notificacao (
-                    id SERIAL PRIMARY KEY,
-                    nome VARCHAR(100) NOT NULL,
-                    telefone VARCHAR(20) NOT NULL,
-                    tipo tiponotificacao NOT NULL,
-                    ativo BOOLEAN DEFAULT TRUE,
-                    criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """))
-            db.execute(text("CREATE INDEX idx_contatos_notificacao_tipo ON contatos_notificacao(tipo)"))
-            db.execute(text("CREATE INDEX idx_contatos_notificacao_ativo ON contatos_notificacao(ativo)"))
-            db.commit()
-            logger.info("✅ Tabela contatos_notificacao criada")
-        
-        # Verificar se colunas responsavel_vendedor e responsavel_telefone existem em propostas
-        propostas_columns = [col['name'] for col in inspector.get_columns('propostas')]
-        
-        if 'responsavel_vendedor' not in propostas_columns:
-            logger.info("🔧 Executando migration: adicionando coluna propostas.responsavel_vendedor")
-            db.execute(text("ALTER TABLE propostas ADD COLUMN responsavel_vendedor VARCHAR(200)"))
-            db.commit()
-            logger.info("✅ Coluna propostas.responsavel_vendedor criada")
-        
-        if 'responsavel_telefone' not in propostas_columns:
-            logger.info("🔧 Executando migration: adicionando coluna propostas.responsavel_telefone")
-            db.execute(text("ALTER TABLE propostas ADD COLUMN responsavel_telefone VARCHAR(20)"))
-            db.commit()
-            logger.info("✅ Coluna propostas.responsavel_telefone criada")
-        
-        db.close()
-        logger.info("🎉 Migrations concluídas com sucesso!")
-        return True
-        
-    except Exception as e:
-        logger.error(f"❌ Erro ao executar migrations: {e}")
-        if db:
-            db.rollback()
-            db.close()
-        return False
+        ]
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    verificar_e_executar_migrations()
+    parser = argparse.ArgumentParser(description="Aplica as migrations pendentes do banco")
+    parser.add_argument("--status", action="store_true", help="só lista as versões aplicadas e pendentes")
+    args = parser.parse_args()
+
+    if args.status:
+        aplicadas = {versao: (descricao, quando) for versao, descricao, quando in versoes_aplicadas()}
+        for numero, descricao, _ in MIGRACOES:
+            situacao = f"aplicada em {aplicadas[numero][1]}" if numero in aplicadas else "pendente"
+            print(f"{numero:>3}  {descricao:<60} {situacao}")
+    else:
+        aplicar_migracoes()
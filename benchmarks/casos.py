@@ -0,0 +1,102 @@
+"""Casos dos micro-benchmarks: funções puras dos caminhos quentes com entradas representativas.
+
+Cada caso é uma função sem argumentos que executa UMA operação típica (um
+texto de simulação, uma proposta de 500 itens, uma tabela de valores); as
+entradas são montadas uma vez, fora da medição, e são determinísticas.
+"""
+
+from __future__ import annotations
+
+import random
+
+from models import Produto, Proposta, PropostaProduto
+from services.bling_import_service import BlingImportService
+from templates import format_money, format_money_no_symbol, format_percent
+from utils.medidas import format_dimensoes_m
+from utils.simulacao_manual_parser import extrair_peso_total_kg, extrair_volume_total_cm3, parse_float_ptbr
+
+_rng = random.Random(44)
+
+# ============================================================================
+# ENTRADAS
+# ============================================================================
+
+SIMULACAO_CURTA = "(4x) 95x95x1,20 - 52,18kg"
+
+_FORMATOS_VOLUME = (
+    "({q}) {a}x{b}x{c} - {p}kg",
+    "{q}x{a}x{b}x{c}",
+    "{q}x {a} x {b} x {c} cm",
+    "({q}x){a}x{b}x1,{c}",
+    "{a}x{b}x{c}",
+    "Volume conferido pela expedição, palete {q} de {c}: {a}x{b}x{c}cm, peso {p} kg",
+)
+
+
+def _simulacao_longa(linhas: int) -> str:
+    """Texto colado de uma cotação grande: volumes em vários formatos, totais e ruído."""
+    partes = []
+    for _ in range(linhas):
+        formato = _rng.choice(_FORMATOS_VOLUME)
+        partes.append(formato.format(
+            q=_rng.randint(1, 40), a=_rng.randint(10, 120), b=_rng.randint(10, 120),
+            c=_rng.randint(10, 99), p=f"{_rng.randint(1, 900)},{_rng.randint(0, 99):02d}",
+        ))
+    partes.append("Peso real total: 12.358 kg")
+    return "\n".join(partes)
+
+
+SIMULACAO_LONGA = _simulacao_longa(400)
+
+NUMEROS_PTBR = ["1,20", "1.358", "  150 ", "2.500,75", "0,5", "12.345.678,90", "abc", "", "95", "1.20"] * 10
+
+
+def _proposta(itens: int) -> Proposta:
+    """Proposta transiente (sem banco) com itens e produtos, 80% com medidas."""
+    proposta = Proposta()
+    for i in range(itens):
+        produto = Produto(sku=f"SKU{i:05d}", nome=f"Produto de teste {i}")
+        if _rng.random() < 0.8:
+            produto.comprimento_cm = _rng.uniform(5, 120)
+            produto.largura_cm = _rng.uniform(5, 80)
+            produto.altura_cm = _rng.uniform(2, 60)
+            produto.peso_unitario_kg = _rng.uniform(0.1, 35)
+        proposta.itens.append(PropostaProduto(produto=produto, quantidade=_rng.randint(1, 50)))
+    return proposta
+
+
+PROPOSTA_500_ITENS = _proposta(500)
+
+DIMENSOES = [
+    (_rng.uniform(1, 300), _rng.uniform(1, 300), None if i % 25 == 0 else _rng.uniform(1, 300))
+    for i in range(500)
+]
+
+VALORES_MONETARIOS = [
+    None if i % 50 == 0 else ("1234.5" if i % 33 == 0 else _rng.uniform(0, 2_000_000))
+    for i in range(500)
+]
+
+
+# ============================================================================
+# CASOS
+# ============================================================================
+
+def _tabela_money():
+    for valor in VALORES_MONETARIOS:
+        format_money(valor)
+        format_money_no_symbol(valor)
+        format_percent(valor)
+
+
+CASOS = {
+    "volume.simulacao_curta": lambda: extrair_volume_total_cm3(SIMULACAO_CURTA),
+    "volume.simulacao_longa_400_linhas": lambda: extrair_volume_total_cm3(SIMULACAO_LONGA),
+    "peso.simulacao_curta": lambda: extrair_peso_total_kg(SIMULACAO_CURTA),
+    "peso.simulacao_longa_400_linhas": lambda: extrair_peso_total_kg(SIMULACAO_LONGA),
+    "parse_float_ptbr.100_valores": lambda: [parse_float_ptbr(valor) for valor in NUMEROS_PTBR],
+    "importacao.mapear_itens_por_sku_500": lambda: BlingImportService._mapear_itens_por_sku(PROPOSTA_500_ITENS.itens),
+    "importacao.calcular_volumes_500": lambda: BlingImportService._calcular_automatico_volumes(PROPOSTA_500_ITENS),
+    "format_dimensoes_m.500": lambda: [format_dimensoes_m(c, l, a) for c, l, a in DIMENSOES],
+    "filtros.money_percent_500": _tabela_money,
+}
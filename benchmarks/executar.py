@@ -0,0 +1,134 @@
+"""Micro-benchmarks das funções puras dos caminhos quentes.
+
+Uso:
+    python benchmarks/executar.py                                   # tabela no terminal
+    python benchmarks/executar.py --saida base.json                 # grava o resultado (JSON)
+    python benchmarks/executar.py --comparar base.json              # falha se algo regrediu > 25%
+    python benchmarks/executar.py --comparar base.json --tolerancia 0.1 --filtro volume
+
+Metodologia: cada caso roda algumas vezes para aquecer; depois o número de
+chamadas por repetição é calibrado para durar pelo menos --tempo-alvo
+segundos e são feitas --repeticoes repetições com o GC desligado (timeit). A
+comparação usa o mínimo das repetições, a estatística menos sensível a ruído
+da máquina; mediana e desvio vão no JSON para avaliar a estabilidade.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# Os models importam database.py, que exige uma URL; nenhuma consulta é feita
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from casos import CASOS  # noqa: E402
+
+
+def _commit_atual() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def medir(funcao, repeticoes: int, tempo_alvo: float) -> dict:
+    """Tempos por chamada (µs) de `funcao`."""
+    for _ in range(3):
+        funcao()
+
+    timer = timeit.Timer(funcao)
+    numero = 1
+    while True:
+        if timer.timeit(numero) >= tempo_alvo:
+            break
+        numero *= 2
+
+    por_chamada = [tempo / numero * 1e6 for tempo in timer.repeat(repeat=repeticoes, number=numero)]
+    return {
+        "min_us": min(por_chamada),
+        "mediana_us": statistics.median(por_chamada),
+        "desvio_us": statistics.stdev(por_chamada) if len(por_chamada) > 1 else 0.0,
+        "chamadas_por_repeticao": numero,
+        "repeticoes": repeticoes,
+    }
+
+
+def comparar(resultados: dict, base: dict, tolerancia: float) -> list[str]:
+    """Imprime atual x base e devolve os casos que regrediram além da tolerância."""
+    regressoes = []
+    print(f"\nComparação com {base['meta'].get('commit') or 'base'} (tolerância {tolerancia:.0%}):")
+    for nome, atual in resultados.items():
+        anterior = base["resultados"].get(nome)
+        if not anterior:
+            print(f"  {nome:<40} (novo)")
+            continue
+        razao = atual["min_us"] / anterior["min_us"]
+        regrediu = razao > 1 + tolerancia
+        if regrediu:
+            regressoes.append(nome)
+        print(
+            f"  {nome:<40} {anterior['min_us']:>11.2f} → {atual['min_us']:>11.2f} µs  "
+            f"{razao - 1:+7.1%}{'  REGRESSÃO' if regrediu else ''}"
+        )
+    return regressoes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--saida", help="grava os resultados neste arquivo JSON")
+    parser.add_argument("--comparar", help="JSON de referência (gerado com --saida)")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="piora relativa aceita no modo --comparar")
+    parser.add_argument("--filtro", help="roda só os casos cujo nome contém o texto")
+    parser.add_argument("--repeticoes", type=int, default=7, help="repetições por caso")
+    parser.add_argument("--tempo-alvo", type=float, default=0.1, help="segundos mínimos por repetição")
+    args = parser.parse_args()
+
+    casos = {nome: funcao for nome, funcao in CASOS.items() if not args.filtro or args.filtro in nome}
+    resultados = {}
+    print(f"{'caso':<40} {'mínimo':>11}  {'mediana':>11}  {'desvio':>8}")
+    for nome, funcao in casos.items():
+        resultados[nome] = medir(funcao, args.repeticoes, args.tempo_alvo)
+        r = resultados[nome]
+        print(f"{nome:<40} {r['min_us']:>8.2f} µs  {r['mediana_us']:>8.2f} µs  {r['desvio_us']:>5.2f} µs")
+
+    if args.saida:
+        documento = {
+            "meta": {
+                "commit": _commit_atual(),
+                "data": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "plataforma": platform.platform(),
+                "repeticoes": args.repeticoes,
+                "tempo_alvo_s": args.tempo_alvo,
+            },
+            "resultados": resultados,
+        }
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(documento, arquivo, indent=2, ensure_ascii=False)
+        print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        regressoes = comparar(resultados, base, args.tolerancia)
+        if regressoes:
+            raise SystemExit(f"\n{len(regressoes)} caso(s) regrediram: {', '.join(regressoes)}")
+        print("\nSem regressões.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Cenários do teste de carga: o que um usuário virtual faz a cada iteração.
+
+Cada cenário é uma corrotina `cenario(sessao)` que faz uma sequência de
+requisições pelo `SessaoCarga`, que mede cada uma sob um nome de rota estável
+(ex.: "GET /propostas/{id}") para o relatório agregar por rota, não por URL.
+"""
+
+from __future__ import annotations
+
+import itertools
+import random
+import re
+import time
+from collections import defaultdict
+from urllib.parse import quote
+
+import httpx
+
+_RE_CARD = re.compile(r'href="/propostas/(\d+)" class="kanban-card')
+_RE_CARREGAR_MAIS = re.compile(r'class="kanban-mais" data-status="(\w+)" data-cursor="([^"]+)"')
+# Opções do formulário de cotação do detalhe (visível para qualquer perfil, não só líderes)
+_RE_SELECT_TRANSPORTADORA = re.compile(r'<select name="transportadora_id\[0\]"[^>]*>(.*?)</select>', re.S)
+_RE_OPCAO = re.compile(r'<option value="(\d+)"')
+
+SIMULACAO_TEXTO = "(2x) 60x40x50 cm - 25kg\n(1x) 120x80x90 cm - 140kg"
+
+# Ids do Bling únicos entre usuários e execuções (o stub gera a proposta a partir do id)
+_ids_bling = itertools.count(int(time.time()) * 1000)
+
+
+class Medicoes:
+    """Latências (s) e erros por rota, compartilhados por todos os usuários virtuais.
+
+    Só entram as requisições iniciadas a partir de `medir_a_partir`
+    (time.monotonic): as da rampa, com o servidor ainda frio e pouca
+    concorrência, ficam fora do relatório.
+    """
+
+    def __init__(self, medir_a_partir: float = 0.0):
+        self.medir_a_partir = medir_a_partir
+        self.latencias: dict[str, list[float]] = defaultdict(list)
+        self.erros: dict[str, int] = defaultdict(int)
+
+    def registrar(self, rota: str, duracao_s: float, erro: bool, iniciada_em: float | None = None) -> None:
+        if iniciada_em is not None and iniciada_em < self.medir_a_partir:
+            return
+        self.latencias[rota].append(duracao_s)
+        if erro:
+            self.erros[rota] += 1
+
+
+class FalhaCenario(Exception):
+    """O cenário não pode continuar (resposta inesperada ou dado ausente); vai para as falhas do relatório."""
+
+
+class SessaoCarga:
+    """Um usuário virtual: cliente HTTP com o cookie de sessão e o estado visto até agora."""
+
+    def __init__(self, cliente: httpx.AsyncClient, medicoes: Medicoes, rng: random.Random, stub: str):
+        self.cliente = cliente
+        self.medicoes = medicoes
+        self.rng = rng
+        self.stub = stub.rstrip("/")
+        self.propostas_vistas: list[int] = []
+        self.cursores: list[tuple[str, str]] = []
+        self.transportadoras: list[int] = []
+
+    async def requisitar(self, rota: str, metodo: str, caminho: str, esperado: tuple[int, ...] = (200,), **kwargs):
+        """Faz a requisição e registra a latência sob `rota`; status fora de `esperado` conta como erro."""
+        iniciada_em = time.monotonic()
+        inicio = time.perf_counter()
+        try:
+            resposta = await self.cliente.request(metodo, caminho, **kwargs)
+        except httpx.HTTPError as exc:
+            self.medicoes.registrar(rota, time.perf_counter() - inicio, erro=True, iniciada_em=iniciada_em)
+            raise FalhaCenario(f"{rota}: {exc.__class__.__name__}") from exc
+        self.medicoes.registrar(
+            rota, time.perf_counter() - inicio, erro=resposta.status_code not in esperado, iniciada_em=iniciada_em
+        )
+        if resposta.status_code not in esperado:
+            raise FalhaCenario(f"{rota}: HTTP {resposta.status_code}")
+        return resposta
+
+    async def login(self, email: str, senha: str) -> None:
+        resposta = await self.requisitar(
+            "POST /login", "POST", "/login", esperado=(302, 303), data={"email": email, "senha": senha}
+        )
+        if "/login" in resposta.headers.get("location", ""):
+            raise FalhaCenario("login recusado")
+
+    def link_bling(self) -> str:
+        return f"{self.stub}/doc.view.php?id={next(_ids_bling)}"
+
+
+# ============================================================================
+# CENÁRIOS
+# ============================================================================
+
+async def navegar_kanban(sessao: SessaoCarga) -> None:
+    """Abre o kanban e carrega mais cards de uma coluna."""
+    resposta = await sessao.requisitar("GET /propostas/", "GET", "/propostas/")
+    sessao.propostas_vistas = [int(i) for i in _RE_CARD.findall(resposta.text)] or sessao.propostas_vistas
+    sessao.cursores = _RE_CARREGAR_MAIS.findall(resposta.text)
+    if sessao.cursores:
+        status, cursor = sessao.rng.choice(sessao.cursores)
+        await sessao.requisitar(
+            "GET /propostas/kanban/{status}", "GET", f"/propostas/kanban/{status}", params={"cursor": cursor}
+        )
+
+
+async def abrir_proposta(sessao: SessaoCarga) -> None:
+    """Abre o detalhe de uma proposta vista no kanban."""
+    if not sessao.propostas_vistas:
+        await navegar_kanban(sessao)
+    if sessao.propostas_vistas:
+        proposta_id = sessao.rng.choice(sessao.propostas_vistas)
+        await sessao.requisitar("GET /propostas/{id}", "GET", f"/propostas/{proposta_id}")
+
+
+async def dashboard(sessao: SessaoCarga) -> None:
+    await sessao.requisitar("GET /dashboard/", "GET", "/dashboard/")
+
+
+async def historico(sessao: SessaoCarga) -> None:
+    await sessao.requisitar("GET /propostas/historico", "GET", "/propostas/historico")
+
+
+async def importar_link(sessao: SessaoCarga) -> str:
+    """Importa uma proposta do Bling (stub) e devolve o id do Bling usado."""
+    link = sessao.link_bling()
+    await sessao.requisitar(
+        "POST /propostas/nova", "POST", "/propostas/nova", esperado=(303,), data={"link_bling": link}
+    )
+    return link.rsplit("=", 1)[1]
+
+
+async def fluxo_completo(sessao: SessaoCarga) -> None:
+    """Importa, simula, cota e envia: a proposta percorre todos os status até concluída."""
+    id_bling = await importar_link(sessao)
+
+    # O stub nomeia o cliente com o id do Bling: o filtro do kanban acha a proposta recém-importada
+    resposta = await sessao.requisitar(
+        "GET /propostas/?cliente=", "GET", f"/propostas/?cliente={quote(f'Cliente Carga {id_bling}')}"
+    )
+    encontrados = _RE_CARD.findall(resposta.text)
+    if not encontrados:
+        raise FalhaCenario(f"proposta importada (Bling {id_bling}) não apareceu no kanban")
+    proposta_id = int(encontrados[0])
+    base = f"/propostas/{proposta_id}"
+
+    resposta = await sessao.requisitar("GET /propostas/{id}", "GET", base)
+    if not sessao.transportadoras:
+        select = _RE_SELECT_TRANSPORTADORA.search(resposta.text)
+        sessao.transportadoras = [int(i) for i in _RE_OPCAO.findall(select.group(1))] if select else []
+    if not sessao.transportadoras:
+        raise FalhaCenario("nenhuma transportadora no formulário de cotação (base sem transportadoras?)")
+
+    await sessao.requisitar(
+        "POST /propostas/{id}/simulacao-manual", "POST", f"{base}/simulacao-manual", esperado=(303,),
+        data={"simulacao_texto": SIMULACAO_TEXTO, "action": "concluir"},
+    )
+
+    cotacao = {"action": "concluir"}
+    for indice, transportadora_id in enumerate(sessao.transportadoras[:3]):
+        cotacao[f"transportadora_id[{indice}]"] = str(transportadora_id)
+        cotacao[f"preco[{indice}]"] = f"{sessao.rng.uniform(80, 900):.2f}"
+        cotacao[f"prazo_dias[{indice}]"] = str(sessao.rng.randint(1, 10))
+    resposta = await sessao.requisitar(
+        "POST /propostas/{id}/cotacao", "POST", f"{base}/cotacao", esperado=(303,), data=cotacao
+    )
+    if "erro" in resposta.headers.get("location", ""):
+        raise FalhaCenario(f"cotação recusada: {resposta.headers['location']}")
+
+    await sessao.requisitar("POST /propostas/{id}/envio", "POST", f"{base}/envio", esperado=(303,))
+
+
+CENARIOS = {
+    "navegar": navegar_kanban,
+    "abrir": abrir_proposta,
+    "dashboard": dashboard,
+    "historico": historico,
+    "importar": importar_link,
+    "fluxo": fluxo_completo,
+}
@@ -0,0 +1,172 @@
+"""Teste de carga com cenários de uso contra o app rodando localmente.
+
+Uso:
+    python carga/stub_servicos.py &                                  # Bling e BotConversa simulados
+    python carga/executar.py                                         # 10 usuários por 60 s
+    python carga/executar.py --usuarios 50 --duracao 300 --rampa 30 \\
+        --cenarios navegar=5,abrir=4,dashboard=1,historico=1,importar=1,fluxo=1
+    python carga/executar.py --saida carga.json                      # grava o relatório (JSON)
+
+Cada usuário virtual faz login e repete, até o fim da duração, um cenário
+sorteado pelos pesos de --cenarios (ver carga/cenarios.py). Os usuários
+entram aos poucos ao longo de --rampa segundos. O relatório traz, por rota,
+requisições, erros, p50/p95/p99/máximo e vazão (req/s) na janela medida: as
+--duracao segundos após a rampa (requisições da rampa são descartadas).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from cenarios import CENARIOS, FalhaCenario, Medicoes, SessaoCarga  # noqa: E402
+
+
+def _pesos(texto: str) -> dict[str, float]:
+    pesos = {}
+    for parte in texto.split(","):
+        nome, _, peso = parte.partition("=")
+        nome = nome.strip()
+        if nome not in CENARIOS:
+            raise argparse.ArgumentTypeError(f"cenário desconhecido: {nome} (opções: {', '.join(CENARIOS)})")
+        pesos[nome] = float(peso or 1)
+    return pesos
+
+
+def percentil(valores_ordenados: list[float], p: float) -> float:
+    """Percentil por posição mais próxima (valores já ordenados)."""
+    if not valores_ordenados:
+        return 0.0
+    indice = max(0, min(len(valores_ordenados) - 1, round(p / 100 * len(valores_ordenados) + 0.5) - 1))
+    return valores_ordenados[indice]
+
+
+async def usuario_virtual(numero: int, args, medicoes: Medicoes, fim: float, falhas: dict[str, int]) -> None:
+    await asyncio.sleep(args.rampa * numero / max(1, args.usuarios))
+    rng = random.Random(f"{args.seed}-{numero}")
+    nomes, pesos = zip(*args.cenarios.items())
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, follow_redirects=False) as cliente:
+        sessao = SessaoCarga(cliente, medicoes, rng, args.stub)
+        try:
+            await sessao.login(args.email, args.senha)
+        except FalhaCenario as exc:
+            falhas[str(exc)] = falhas.get(str(exc), 0) + 1
+            return
+        while time.monotonic() < fim:
+            nome = rng.choices(nomes, weights=pesos)[0]
+            try:
+                await CENARIOS[nome](sessao)
+            except FalhaCenario as exc:
+                falhas[f"{nome}: {exc}"] = falhas.get(f"{nome}: {exc}", 0) + 1
+            if args.pausa:
+                await asyncio.sleep(rng.uniform(0, 2 * args.pausa))
+
+
+def relatorio(medicoes: Medicoes, duracao_s: float) -> dict:
+    rotas = {}
+    todas = []
+    for rota, latencias in sorted(medicoes.latencias.items()):
+        ordenadas = sorted(latencias)
+        todas.extend(ordenadas)
+        rotas[rota] = _estatisticas(ordenadas, medicoes.erros.get(rota, 0), duracao_s)
+    todas.sort()
+    return {"rotas": rotas, "total": _estatisticas(todas, sum(medicoes.erros.values()), duracao_s)}
+
+
+def _estatisticas(ordenadas: list[float], erros: int, duracao_s: float) -> dict:
+    return {
+        "requisicoes": len(ordenadas),
+        "erros": erros,
+        "p50_ms": percentil(ordenadas, 50) * 1000,
+        "p95_ms": percentil(ordenadas, 95) * 1000,
+        "p99_ms": percentil(ordenadas, 99) * 1000,
+        "max_ms": (ordenadas[-1] if ordenadas else 0.0) * 1000,
+        "req_s": len(ordenadas) / duracao_s if duracao_s else 0.0,
+    }
+
+
+def imprimir(resultado: dict) -> None:
+    cabecalho = f"{'rota':<40} {'req':>7} {'erros':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'máx':>8} {'req/s':>7}"
+    print(cabecalho)
+    print("-" * len(cabecalho))
+    linhas = list(resultado["rotas"].items()) + [("TOTAL", resultado["total"])]
+    for rota, r in linhas:
+        if rota == "TOTAL":
+            print("-" * len(cabecalho))
+        print(
+            f"{rota:<40} {r['requisicoes']:>7} {r['erros']:>6} {r['p50_ms']:>6.0f}ms {r['p95_ms']:>6.0f}ms "
+            f"{r['p99_ms']:>6.0f}ms {r['max_ms']:>6.0f}ms {r['req_s']:>7.1f}"
+        )
+
+
+async def executar(args) -> tuple[dict, dict[str, int]]:
+    # Janela medida: do fim da rampa até o fim da duração. A vazão é dividida
+    # só pela duração; as latências da rampa não entram no relatório.
+    inicio_medicao = time.monotonic() + args.rampa
+    medicoes = Medicoes(medir_a_partir=inicio_medicao)
+    falhas: dict[str, int] = {}
+    fim = inicio_medicao + args.duracao
+    await asyncio.gather(*(usuario_virtual(n, args, medicoes, fim, falhas) for n in range(args.usuarios)))
+    return relatorio(medicoes, args.duracao), falhas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="endereço do app")
+    parser.add_argument("--stub", default="http://127.0.0.1:8090", help="endereço do carga/stub_servicos.py")
+    parser.add_argument("--usuarios", type=int, default=10, help="usuários virtuais simultâneos")
+    parser.add_argument("--duracao", type=float, default=60, help="segundos de carga após a rampa")
+    parser.add_argument("--rampa", type=float, default=10, help="segundos para todos os usuários entrarem")
+    parser.add_argument("--pausa", type=float, default=0.5, help="pausa média (s) entre cenários; 0 = sem pausa")
+    parser.add_argument(
+        "--cenarios", type=_pesos, default=_pesos("navegar=5,abrir=4,dashboard=1,historico=1,importar=1,fluxo=1"),
+        help="pesos dos cenários, ex.: navegar=5,abrir=4,fluxo=1",
+    )
+    parser.add_argument("--email", default=os.getenv("CARGA_EMAIL", "sac@amferramentas.com.br"))
+    parser.add_argument("--senha", default=os.getenv("CARGA_SENHA", "AmF123"))
+    parser.add_argument("--timeout", type=float, default=30, help="timeout por requisição (s)")
+    parser.add_argument("--seed", type=int, default=45)
+    parser.add_argument("--saida", help="grava o relatório neste arquivo JSON")
+    args = parser.parse_args()
+
+    print(f"{args.usuarios} usuários, rampa {args.rampa:.0f}s + {args.duracao:.0f}s contra {args.url}\n")
+    resultado, falhas = asyncio.run(executar(args))
+    imprimir(resultado)
+
+    if falhas:
+        print("\nCenários interrompidos:")
+        for motivo, quantidade in sorted(falhas.items(), key=lambda item: -item[1]):
+            print(f"  {quantidade:>5}x {motivo}")
+
+    if args.saida:
+        documento = {
+            "meta": {
+                "data": datetime.now().isoformat(timespec="seconds"),
+                "url": args.url,
+                "usuarios": args.usuarios,
+                "duracao_s": args.duracao,
+                "rampa_s": args.rampa,
+                "cenarios": args.cenarios,
+            },
+            **resultado,
+            "falhas": falhas,
+        }
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(documento, arquivo, indent=2, ensure_ascii=False)
+        print(f"\nRelatório gravado em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
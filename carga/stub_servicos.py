@@ -0,0 +1,182 @@
+"""Stub local do Bling (doc.view.php) e do webhook do BotConversa para testes de carga.
+
+Uso:
+    python carga/stub_servicos.py                                    # porta 8090, sem latência
+    python carga/stub_servicos.py --bling-latencia-ms 400 --bling-falhas 0.02 \\
+        --botconversa-latencia-ms 150 --botconversa-falhas 0.05
+
+App apontando para o stub:
+    BOTCONVERSA_WEBHOOK_URL=http://127.0.0.1:8090/api/v1/webhooks-automation/catch/{token}/ \\
+    WHATSAPP_BOT_CONVERSA_TOKEN=carga uvicorn main:app
+
+Rotas:
+    GET  /doc.view.php?id=X                    proposta do Bling gerada a partir do id (sempre a mesma para o mesmo id)
+    POST /api/v1/webhooks-automation/catch/T/  aceita a mensagem do WhatsApp
+    GET  /estatisticas                         requisições e falhas por serviço (JSON)
+
+A latência de cada resposta é sorteada entre 50% e 150% do valor configurado;
+uma fração --*-falhas das respostas volta com HTTP 503.
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# SKUs dos produtos da base sintética (scripts/gerar_dados_sinteticos.py): parte dos itens já existe
+SKUS_CONHECIDOS = 3000
+VENDEDORES = ("Vendedor Carga 1", "Vendedor Carga 2", "Vendedor Carga 3")
+
+
+def documento_bling(id_bling: str) -> str:
+    """HTML no formato que o BlingParserService lê (bloco "Para:", tabela de itens e de totais)."""
+    rng = random.Random(id_bling)
+    itens = []
+    for posicao in range(min(60, 1 + int(rng.expovariate(1 / 5)))):
+        if rng.random() < 0.8:
+            codigo = f"SIN{rng.randint(1, SKUS_CONHECIDOS):07d}"
+        else:
+            codigo = f"CARGA-{id_bling}-{posicao}"
+        quantidade = rng.choice((1, 1, 2, 3, 5, 10, 20))
+        preco = round(rng.uniform(5, 800), 2)
+        itens.append((codigo, f"Produto {codigo}", quantidade, preco))
+
+    total = sum(quantidade * preco for _, _, quantidade, preco in itens)
+    valor = lambda v: f"{v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")  # noqa: E731
+
+    linhas_itens = "\n".join(
+        f"<tr><td>{html.escape(codigo)}</td><td>{html.escape(nome)}</td><td>{quantidade}</td>"
+        f"<td>{valor(preco)}</td><td>{valor(preco * quantidade)}</td></tr>"
+        for codigo, nome, quantidade, preco in itens
+    )
+    totais = (len(itens), sum(i[2] for i in itens), 0, 0, total, 0, 0, total)
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Proposta comercial</title></head>
+<body>
+<h1>Proposta Nº {rng.randint(10000, 99999)}</h1>
+<p>Data 01/10/2026</p>
+<p>Vendedor: {rng.choice(VENDEDORES)}</p>
+<div><p>De:</p><p>AM Ferramentas</p><p>CNPJ: 23.224.473/0001-78</p></div>
+<div>
+<p>Para:</p>
+<p>Cliente Carga {html.escape(id_bling)}</p>
+<p>CNPJ: {rng.randint(10, 99)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}/0001-{rng.randint(10, 99)}</p>
+<p>Rua das Indústrias, {rng.randint(1, 2000)}</p>
+<p>Joinville - SC 89200-000</p>
+<p>Fone: (47) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}</p>
+</div>
+<table>
+<tr><th>Código</th><th>Descrição</th><th>Qtde</th><th>Preço un.</th><th>Total</th></tr>
+{linhas_itens}
+</table>
+<table>
+<tr><th>Nº itens</th><th>Soma Qtdes</th><th>Total outros</th><th>Desconto total itens</th>
+<th>Total itens</th><th>Desconto</th><th>Frete</th><th>Total da proposta</th></tr>
+<tr>{"".join(f"<td>{valor(v)}</td>" for v in totais)}</tr>
+</table>
+</body></html>"""
+
+
+class Servico:
+    """Latência, taxa de falhas e contadores de um serviço simulado."""
+
+    def __init__(self, latencia_ms: float, falhas: float):
+        self.latencia_ms = latencia_ms
+        self.falhas = falhas
+        self.requisicoes = 0
+        self.falhadas = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+
+    def atender(self) -> bool:
+        """Espera a latência sorteada; False = responder com falha."""
+        with self._lock:
+            self.requisicoes += 1
+            espera = self.latencia_ms * self._rng.uniform(0.5, 1.5) / 1000
+            falhou = self._rng.random() < self.falhas
+            if falhou:
+                self.falhadas += 1
+        if espera:
+            time.sleep(espera)
+        return not falhou
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    servicos: dict[str, Servico] = {}
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato, *args):  # sem uma linha de log por requisição
+        pass
+
+    def _responder(self, status: int, corpo: str, tipo: str) -> None:
+        dados = corpo.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{tipo}; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/doc.view.php":
+            id_bling = (parse_qs(url.query).get("id") or [""])[0]
+            if not self.servicos["bling"].atender():
+                return self._responder(503, "Serviço indisponível", "text/plain")
+            if not id_bling:
+                return self._responder(200, "Este link para documento não é válido!", "text/html")
+            return self._responder(200, documento_bling(id_bling), "text/html")
+
+        if url.path == "/estatisticas":
+            estatisticas = {
+                nome: {"requisicoes": s.requisicoes, "falhas": s.falhadas}
+                for nome, s in self.servicos.items()
+            }
+            return self._responder(200, json.dumps(estatisticas), "application/json")
+
+        self._responder(404, "Não encontrado", "text/plain")
+
+    def do_POST(self):
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(tamanho)
+        if urlparse(self.path).path.startswith("/api/v1/webhooks-automation/catch/"):
+            if not self.servicos["botconversa"].atender():
+                return self._responder(503, '{"erro": "indisponível"}', "application/json")
+            return self._responder(200, '{"status": "ok"}', "application/json")
+        self._responder(404, "Não encontrado", "text/plain")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8090)
+    parser.add_argument("--bling-latencia-ms", type=float, default=0, help="latência média do doc.view")
+    parser.add_argument("--bling-falhas", type=float, default=0, help="fração de respostas 503 do Bling")
+    parser.add_argument("--botconversa-latencia-ms", type=float, default=0, help="latência média do webhook")
+    parser.add_argument("--botconversa-falhas", type=float, default=0, help="fração de respostas 503 do webhook")
+    args = parser.parse_args()
+
+    StubHandler.servicos = {
+        "bling": Servico(args.bling_latencia_ms, args.bling_falhas),
+        "botconversa": Servico(args.botconversa_latencia_ms, args.botconversa_falhas),
+    }
+    servidor = ThreadingHTTPServer((args.host, args.porta), StubHandler)
+    servidor.daemon_threads = True
+    print(f"Stub Bling/BotConversa em http://{args.host}:{args.porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        for nome, servico in StubHandler.servicos.items():
+            print(f"{nome}: {servico.requisicoes} requisições, {servico.falhadas} falhas")
+
+
+if __name__ == "__main__":
+    main()
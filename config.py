@@ -50,6 +50,65 @@ class Settings:
         # Padrão rodoviário comum: 1 m³ = 300 kg
         self.peso_cubado_fator: float = float(os.getenv("PESO_CUBADO_FATOR", "300"))
 
+        # Dashboard: segundos que o painel fica em cache (invalidado antes em mudanças de status)
+        self.dashboard_cache_ttl: float = float(os.getenv("DASHBOARD_CACHE_TTL", "30"))
+
+        # SLA (horas) de permanência em cada etapa pendente
+        self.sla_horas: dict[str, float] = {
+            "pendente_simulacao": float(os.getenv("SLA_HORAS_SIMULACAO", "24")),
+            "pendente_cotacao": float(os.getenv("SLA_HORAS_COTACAO", "24")),
+            "pendente_envio": float(os.getenv("SLA_HORAS_ENVIO", "8")),
+        }
+
+        # Alerta de propostas paradas: horas sem atualização por status (padrão = SLA)
+        self.alerta_envelhecimento_horas: dict[str, float] = {
+            "pendente_simulacao": float(os.getenv("ALERTA_HORAS_SIMULACAO", self.sla_horas["pendente_simulacao"])),
+            "pendente_cotacao": float(os.getenv("ALERTA_HORAS_COTACAO", self.sla_horas["pendente_cotacao"])),
+            "pendente_envio": float(os.getenv("ALERTA_HORAS_ENVIO", self.sla_horas["pendente_envio"])),
+        }
+        # Intervalo da verificação dentro do app (0 = desligado; use scripts/verificar_envelhecimento.py no cron)
+        self.alerta_envelhecimento_intervalo_min: float = float(
+            os.getenv("ALERTA_ENVELHECIMENTO_INTERVALO_MIN", "0")
+        )
+        # Tempo mínimo entre dois alertas para o mesmo grupo
+        self.alerta_envelhecimento_cooldown_horas: float = float(
+            os.getenv("ALERTA_ENVELHECIMENTO_COOLDOWN_HORAS", "4")
+        )
+
+        # Webhook do BotConversa; {token} vira o WHATSAPP_BOT_CONVERSA_TOKEN (testes de carga apontam para o stub local)
+        self.botconversa_webhook_url: str = os.getenv(
+            "BOTCONVERSA_WEBHOOK_URL",
+            "https://new-backend.botconversa.com.br/api/v1/webhooks-automation/catch/{token}/",
+        )
+
+        # Monitor de SQL por requisição: acima destes limites a rota gera um warning no log
+        self.sql_orcamento_consultas: int = int(os.getenv("SQL_ORCAMENTO_CONSULTAS", "25"))
+        self.sql_orcamento_ms: float = float(os.getenv("SQL_ORCAMENTO_MS", "500"))
+        # Mesma consulta (com parâmetros diferentes) repetida N vezes = provável N+1
+        self.sql_limite_repeticoes: int = int(os.getenv("SQL_LIMITE_REPETICOES", "5"))
+
+        # Métricas (Prometheus): /metrics com token e/ou porta interna sem autenticação (0 = desligada)
+        self.metricas_token: str = os.getenv("METRICAS_TOKEN", "")
+        self.metricas_host: str = os.getenv("METRICAS_HOST", "127.0.0.1")
+        self.metricas_porta: int = int(os.getenv("METRICAS_PORTA", "0"))
+
+        # Rastreamento: exportadores dos rastros ("console", "arquivo" ou ambos; vazio = nenhum)
+        self.rastreamento_exportador: str = os.getenv("RASTREAMENTO_EXPORTADOR", "")
+        self.rastreamento_arquivo: str = os.getenv("RASTREAMENTO_ARQUIVO", "rastros.jsonl")
+        # Importação acima deste tempo vai para o log com a árvore de etapas
+        self.importacao_lenta_ms: float = float(os.getenv("IMPORTACAO_LENTA_MS", "5000"))
+
+        # Event loop: callback que segura o loop acima disto vai para o log com a pilha (0 = monitor desligado)
+        self.loop_lento_ms: float = float(os.getenv("LOOP_LENTO_MS", "100"))
+
+        # Memória: fração das requisições medidas com tracemalloc (0 = desligado; 0.01 = 1%)
+        self.memoria_amostragem: float = float(os.getenv("MEMORIA_AMOSTRAGEM", "0"))
+        self.memoria_quadros: int = int(os.getenv("MEMORIA_QUADROS", "25"))
+        # Requisição amostrada com pico acima disto vai para o log com as maiores origens
+        self.memoria_alerta_mb: float = float(os.getenv("MEMORIA_ALERTA_MB", "64"))
+        # Limite de memória da instância (Render free = 512 MB), referência da página /admin/memoria
+        self.memoria_limite_mb: float = float(os.getenv("MEMORIA_LIMITE_MB", "512"))
+
 
 @lru_cache()
 def get_settings() -> Settings:
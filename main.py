@@ -4,31 +4,44 @@ FastAPI application for managing commercial proposals,
 freight calculations, and Bling integration.
 """
 
+import asyncio
 import logging
 import os
-from contextlib import asynccontextmanager
+import time
+from contextlib import asynccontextmanager, contextmanager
 from typing import AsyncGenerator
 
-import uvicorn
+_inicio_imports = time.perf_counter()
+
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
 from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.sessions import SessionMiddleware
 from sqlalchemy import text
 
 from auth import get_password_hash, router as auth_router
-from database import Base, SessionLocal, engine
+from config import settings
+from database import SessionLocal, engine
 from models import User
-from routers import bling_import, caixas, propostas, simulacoes, transportadoras, contatos_notificacao, dashboard
+from routers import admin, bling_import, caixas, propostas, simulacoes, transportadoras, contatos_notificacao, dashboard, metricas
 from templates import templates
-from auto_migrate import verificar_e_executar_migrations
+from utils.memoria import MemoriaMiddleware, memoria
+from utils.metricas import MetricasMiddleware, iniciar_servidor_interno, instalar_metricas_pool
+from utils.monitor_loop import MonitorEventLoop
+from utils.monitor_sql import MonitorConsultasMiddleware, instalar_monitor
+from utils.perfilador import PerfiladorMiddleware
+from utils.rastreamento import configurar_exportadores, instalar_trace_id_nos_logs
+from auto_migrate import aplicar_migracoes
 
-# Configure logging
+# Configure logging (trace id do rastro atual em cada linha; "-" fora de um rastro)
+instalar_trace_id_nos_logs()
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - [%(trace_id)s] %(message)s'
 )
+configurar_exportadores(settings.rastreamento_exportador, settings.rastreamento_arquivo)
 logger = logging.getLogger(__name__)
 
 # Evita logs verbosos do SQLAlchemy em produção.
@@ -53,82 +66,100 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """
     # Startup
     logger.info("Starting FluxoLand application...")
+    tempos = {"imports": TEMPO_IMPORTS}
     
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created/verified")
+    # Schema: uma consulta de versão; tabelas/colunas/índices só se houver migrations pendentes
+    with _medir(tempos, "migrations"):
+        aplicar_migracoes()
     
-    # Run auto-migrations (Dashboard + WhatsApp)
-    verificar_e_executar_migrations()
+    # Create default admin user if needed
+    with _medir(tempos, "admin"):
+        _create_default_admin()
     
-    # Run legacy migrations
-    _run_migrations()
+    # Conexão do pool aberta antes da primeira requisição
+    with _medir(tempos, "aquecimento"):
+        _aquecer_banco()
     
-    # Create default admin user if needed
-    _create_default_admin()
+    app.state.tempos_inicializacao = tempos
+    logger.info(
+        "Startup em %.0f ms (%s)",
+        sum(tempos.values()) * 1000,
+        ", ".join(f"{etapa} {segundos * 1000:.0f} ms" for etapa, segundos in tempos.items()),
+    )
+    
+    # Templates compilados em segundo plano: não atrasam o início nem a primeira resposta
+    tarefa_templates = asyncio.create_task(run_in_threadpool(_compilar_templates))
+    
+    # Alerta de propostas paradas (opcional; alternativa: scripts/verificar_envelhecimento.py no cron)
+    tarefa_envelhecimento = None
+    if settings.alerta_envelhecimento_intervalo_min > 0:
+        tarefa_envelhecimento = asyncio.create_task(
+            _loop_alerta_envelhecimento(settings.alerta_envelhecimento_intervalo_min * 60)
+        )
+    
+    # Callbacks que seguram o event loop (código síncrono em rotas async) vão para o log
+    monitor_loop = None
+    if settings.loop_lento_ms > 0:
+        monitor_loop = MonitorEventLoop(settings.loop_lento_ms)
+        monitor_loop.iniciar()
+    
+    # /metrics sem autenticação numa porta interna (opcional)
+    servidor_metricas = None
+    if settings.metricas_porta:
+        servidor_metricas = iniciar_servidor_interno(settings.metricas_host, settings.metricas_porta)
     
     yield
     
     # Shutdown
     logger.info("Shutting down FluxoLand application...")
+    tarefa_templates.cancel()
+    if tarefa_envelhecimento:
+        tarefa_envelhecimento.cancel()
+    if monitor_loop:
+        monitor_loop.parar()
+    if servidor_metricas:
+        servidor_metricas.shutdown()
 
 
-def _run_migrations() -> None:
-    """Run database migrations."""
-    db = SessionLocal()
+@contextmanager
+def _medir(tempos: dict[str, float], etapa: str):
+    """Registra em `tempos` a duração (s) de uma etapa do startup."""
+    inicio = time.perf_counter()
     try:
-        logger.info("Running database migrations...")
-        
-        # Migration 1: Add desconto column to propostas
-        try:
-            db.execute(text(
-                "ALTER TABLE propostas ADD COLUMN IF NOT EXISTS desconto FLOAT;"
-            ))
-            db.commit()
-            logger.info("✓ Migration: desconto column added")
-        except Exception as e:
-            logger.error(f"Migration desconto failed: {e}")
-            db.rollback()
-        
-        # Migration 2: Add atualizado_em column to propostas
-        try:
-            db.execute(text(
-                "ALTER TABLE propostas ADD COLUMN IF NOT EXISTS atualizado_em TIMESTAMP;"
-            ))
-            db.commit()
-            logger.info("✓ Migration: atualizado_em column added")
-        except Exception as e:
-            logger.error(f"Migration atualizado_em failed: {e}")
-            db.rollback()
-        
-        # Migration 3: Populate atualizado_em with criado_em
-        try:
-            db.execute(text(
-                "UPDATE propostas SET atualizado_em = criado_em WHERE atualizado_em IS NULL;"
-            ))
-            db.commit()
-            logger.info("✓ Migration: atualizado_em populated")
-        except Exception as e:
-            logger.error(f"Migration atualizado_em populate failed: {e}")
-            db.rollback()
-        
-        # Migration 4: Add automatica column to simulacoes
+        yield
+    finally:
+        tempos[etapa] = time.perf_counter() - inicio
+
+
+def _aquecer_banco() -> None:
+    """Garante uma conexão aberta no pool (evita o connect na primeira requisição)."""
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning(f"Aquecimento do banco falhou: {e}")
+
+
+def _compilar_templates() -> None:
+    """Compila todos os templates Jinja para o cache do Environment."""
+    inicio = time.perf_counter()
+    nomes = templates.env.list_templates(extensions=["html"])
+    for nome in nomes:
         try:
-            db.execute(text(
-                "ALTER TABLE simulacoes ADD COLUMN IF NOT EXISTS automatica BOOLEAN DEFAULT FALSE;"
-            ))
-            db.commit()
-            logger.info("✓ Migration: simulacoes.automatica column added")
+            templates.env.get_template(nome)
         except Exception as e:
-            logger.error(f"Migration simulacoes.automatica failed: {e}")
-            db.rollback()
-        
-        logger.info("Migrations completed successfully")
-    except Exception as e:
-        logger.error(f"Error running migrations: {e}")
-        db.rollback()
-    finally:
-        db.close()
+            logger.warning(f"Template {nome} não compilou no aquecimento: {e}")
+    logger.info(f"{len(nomes)} templates compilados em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+
+async def _loop_alerta_envelhecimento(intervalo_segundos: float) -> None:
+    """Verifica propostas paradas periodicamente (fora do event loop)."""
+    from services.envelhecimento_service import EnvelhecimentoService
+
+    logger.info(f"Alerta de propostas paradas ativo (a cada {intervalo_segundos / 60:g} min)")
+    while True:
+        await asyncio.sleep(intervalo_segundos)
+        await run_in_threadpool(EnvelhecimentoService.executar_verificacao)
 
 
 def _create_default_admin() -> None:
@@ -168,6 +199,27 @@ app.add_middleware(
     secret_key=os.getenv("SESSION_SECRET_KEY", "dev-secret-key"),
 )
 
+# Perfilador sob demanda (/admin/perfis); sem perfil armado custa um os.stat por requisição
+app.add_middleware(PerfiladorMiddleware)
+
+# Memória por rota (/admin/memoria): tracemalloc numa fração das requisições (MEMORIA_AMOSTRAGEM)
+memoria.configurar(settings.memoria_amostragem, settings.memoria_quadros, settings.memoria_alerta_mb)
+app.add_middleware(MemoriaMiddleware)
+
+# Consultas SQL por requisição (warning no log acima do orçamento; cabeçalhos em debug)
+instalar_monitor(engine)
+app.add_middleware(
+    MonitorConsultasMiddleware,
+    orcamento_consultas=settings.sql_orcamento_consultas,
+    orcamento_ms=settings.sql_orcamento_ms,
+    limite_repeticoes=settings.sql_limite_repeticoes,
+    cabecalho=settings.debug,
+)
+
+# Métricas Prometheus (latência por rota, pool do banco); por último = mede a pilha inteira
+instalar_metricas_pool(engine)
+app.add_middleware(MetricasMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -197,9 +249,17 @@ app.include_router(bling_import.router, tags=["integrations"])
 app.include_router(caixas.router, tags=["caixas"])
 app.include_router(simulacoes.router, tags=["simulacoes"])
 app.include_router(contatos_notificacao.router, tags=["notificacoes"])
+app.include_router(metricas.router)
+app.include_router(admin.router)
+
+
+# Tempo de import do app (routers, services, models); registrado no relatório de startup
+TEMPO_IMPORTS = time.perf_counter() - _inicio_imports
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host="127.0.0.1",
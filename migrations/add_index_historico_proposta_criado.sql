@@ -0,0 +1,12 @@
+-- Migration: índice composto no histórico de propostas
+-- Data: 2026-10-19
+-- Descrição: (proposta_id, criado_em) atende as janelas LAG/LEAD por proposta
+-- usadas no lead time por etapa do dashboard e a listagem do histórico de uma proposta.
+
+CREATE INDEX IF NOT EXISTS ix_propostas_historico_proposta_criado
+    ON propostas_historico (proposta_id, criado_em);
+
+-- ROLLBACK (se necessário)
+/*
+DROP INDEX IF EXISTS ix_propostas_historico_proposta_criado;
+*/
@@ -0,0 +1,12 @@
+-- Migration: índice (status, atualizado_em) em propostas
+-- Data: 2026-10-19
+-- Descrição: atende o alerta de propostas paradas (status = X AND atualizado_em < limite)
+-- e a ordenação das colunas do kanban por atualizado_em.
+
+CREATE INDEX IF NOT EXISTS ix_propostas_status_atualizado
+    ON propostas (status, atualizado_em);
+
+-- ROLLBACK (se necessário)
+/*
+DROP INDEX IF EXISTS ix_propostas_status_atualizado;
+*/
@@ -0,0 +1,40 @@
+-- Migration: índices dos caminhos quentes e unicidade de cotação por transportadora
+-- Data: 2026-10-19
+-- Descrição:
+--   - propostas (criado_em): intervalos do dashboard/resumo diário e ordem por criação
+--   - propostas_produtos (proposta_id): itens de uma proposta
+--   - cotacoes_frete (proposta_id, transportadora_id) ÚNICO: busca do salvar_cotacao
+--     e garantia de uma cotação por transportadora em cada proposta
+-- Os demais caminhos (status + atualizado_em, histórico por proposta) já são
+-- cobertos por add_index_propostas_status_atualizado.sql e
+-- add_index_historico_proposta_criado.sql.
+-- Para ver os planos antes/depois: python scripts/relatorio_planos.py
+
+CREATE INDEX IF NOT EXISTS ix_propostas_criado
+    ON propostas (criado_em);
+
+CREATE INDEX IF NOT EXISTS ix_propostas_produtos_proposta
+    ON propostas_produtos (proposta_id);
+
+-- Remove cotações repetidas antes do índice único:
+-- fica a selecionada ou, sem ela, a mais recente.
+DELETE FROM cotacoes_frete c
+USING (
+    SELECT id,
+           ROW_NUMBER() OVER (
+               PARTITION BY proposta_id, transportadora_id
+               ORDER BY COALESCE(selecionada, FALSE) DESC, id DESC
+           ) AS posicao
+    FROM cotacoes_frete
+) d
+WHERE c.id = d.id AND d.posicao > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_cotacoes_frete_proposta_transportadora
+    ON cotacoes_frete (proposta_id, transportadora_id);
+
+-- ROLLBACK (se necessário; as cotações removidas não voltam)
+/*
+DROP INDEX IF EXISTS ix_propostas_criado;
+DROP INDEX IF EXISTS ix_propostas_produtos_proposta;
+DROP INDEX IF EXISTS uq_cotacoes_frete_proposta_transportadora;
+*/
@@ -0,0 +1,20 @@
+-- Migration: índices da página de histórico paginada
+-- Data: 2026-10-19
+-- Descrição: keyset em (criado_em, id), filtro por status no período e filtro
+-- por vendedor (join com propostas).
+
+CREATE INDEX IF NOT EXISTS ix_propostas_historico_criado
+    ON propostas_historico (criado_em, id);
+
+CREATE INDEX IF NOT EXISTS ix_propostas_historico_status_criado
+    ON propostas_historico (status, criado_em);
+
+CREATE INDEX IF NOT EXISTS ix_propostas_vendedor
+    ON propostas (vendedor_id);
+
+-- ROLLBACK (se necessário)
+/*
+DROP INDEX IF EXISTS ix_propostas_historico_criado;
+DROP INDEX IF EXISTS ix_propostas_historico_status_criado;
+DROP INDEX IF EXISTS ix_propostas_vendedor;
+*/
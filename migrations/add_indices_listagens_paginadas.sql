@@ -0,0 +1,20 @@
+-- Migration: índices das listagens paginadas (keyset)
+-- Data: 2026-10-19
+-- Descrição: ordem das páginas de simulações, caixas e contatos de notificação.
+-- Transportadoras já usam o índice único de nome.
+
+CREATE INDEX IF NOT EXISTS ix_simulacoes_criado
+    ON simulacoes (criado_em, id);
+
+CREATE INDEX IF NOT EXISTS ix_caixas_nome
+    ON caixas (nome, id);
+
+CREATE INDEX IF NOT EXISTS ix_contatos_notificacao_tipo_nome
+    ON contatos_notificacao (tipo, nome, id);
+
+-- ROLLBACK (se necessário)
+/*
+DROP INDEX IF EXISTS ix_simulacoes_criado;
+DROP INDEX IF EXISTS ix_caixas_nome;
+DROP INDEX IF EXISTS ix_contatos_notificacao_tipo_nome;
+*/
@@ -0,0 +1,27 @@
+-- Migration: resumo diário de propostas (analytics do dashboard)
+-- Data: 2026-10-19
+-- Descrição: agregado por dia de criação, status, origem e vendedor.
+-- A tabela também é criada pelo create_all no startup; a carga inicial é feita
+-- pelo auto_migrate (tabela vazia) ou por scripts/reconstruir_resumo_diario.py.
+
+CREATE TABLE IF NOT EXISTS propostas_resumo_diario (
+    id SERIAL PRIMARY KEY,
+    dia DATE NOT NULL,
+    status propostastatus NOT NULL,
+    origem propostaorigem NOT NULL,
+    vendedor_id INTEGER NOT NULL DEFAULT 0,
+    quantidade INTEGER NOT NULL DEFAULT 0,
+    valor_total FLOAT NOT NULL DEFAULT 0,
+    cubagem_total FLOAT NOT NULL DEFAULT 0,
+    atualizado_em TIMESTAMP,
+    CONSTRAINT uq_propostas_resumo_diario_chave UNIQUE (dia, status, origem, vendedor_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_propostas_resumo_diario_dia ON propostas_resumo_diario (dia);
+
+COMMENT ON COLUMN propostas_resumo_diario.vendedor_id IS '0 = proposta sem vendedor';
+
+-- ROLLBACK (se necessário)
+/*
+DROP TABLE IF EXISTS propostas_resumo_diario;
+*/
@@ -0,0 +1,28 @@
+-- Migration: valor_total materializado em propostas
+-- Data: 2026-10-19
+-- Descrição: grava a soma dos itens menos o desconto em propostas.valor_total
+-- (antes calculado em Python a cada leitura), permitindo somas e ordenação no banco.
+-- O app mantém o valor em PropostaService.recalcular_valor_total.
+
+ALTER TABLE propostas
+ADD COLUMN IF NOT EXISTS valor_total FLOAT;
+
+COMMENT ON COLUMN propostas.valor_total IS 'Soma dos itens (preco_total ou preco_unitario * quantidade) menos desconto';
+
+-- Backfill
+UPDATE propostas
+SET valor_total = COALESCE((
+        SELECT SUM(COALESCE(i.preco_total, i.preco_unitario * i.quantidade))
+        FROM propostas_produtos i
+        WHERE i.proposta_id = propostas.id
+    ), 0)
+    - CASE WHEN propostas.desconto > 0 THEN propostas.desconto ELSE 0 END
+WHERE valor_total IS NULL;
+
+CREATE INDEX IF NOT EXISTS ix_propostas_valor_total ON propostas (valor_total);
+
+-- ROLLBACK (se necessário)
+/*
+DROP INDEX IF EXISTS ix_propostas_valor_total;
+ALTER TABLE propostas DROP COLUMN IF EXISTS valor_total;
+*/
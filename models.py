@@ -5,12 +5,15 @@ from sqlalchemy import (
     Column,
     Integer,
     String,
+    Date,
     DateTime,
     Float,
     ForeignKey,
     Boolean,
     Text,
     Enum,
+    Index,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
@@ -127,8 +130,27 @@ class Produto(Base):
 # PROPOSTA
 # ======================================================
 
+def extrair_campo_importacao(observacao: str | None, chave: str) -> str | None:
+    """Lê um campo 'chave:valor;' gravado em observacao_importacao pela importação do Bling."""
+    marcador = f"{chave}:"
+    if not observacao or marcador not in observacao:
+        return None
+    try:
+        return observacao.split(marcador)[1].split(";")[0].strip()
+    except IndexError:
+        return None
+
+
 class Proposta(Base):
     __tablename__ = "propostas"
+    __table_args__ = (
+        # Colunas do kanban e alerta de propostas paradas (status + tempo sem atualização)
+        Index("ix_propostas_status_atualizado", "status", "atualizado_em"),
+        # Filtro por vendedor (kanban, histórico, dashboard)
+        Index("ix_propostas_vendedor", "vendedor_id"),
+        # Intervalos e ordem por data de criação (dashboard, resumo diário, importação)
+        Index("ix_propostas_criado", "criado_em"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -142,7 +164,8 @@ class Proposta(Base):
     )
 
     criado_em = Column(DateTime, default=datetime.utcnow)
-    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # NOT NULL: ordem e cursor do kanban usam a coluna pura (índice status, atualizado_em)
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     # CLIENTE
     cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False)
@@ -168,6 +191,9 @@ class Proposta(Base):
 
     # VALORES FINANCEIROS
     desconto = Column(Float)  # desconto aplicado
+    # Soma dos itens menos desconto, materializada para somas/ordenação no banco.
+    # Mantida por PropostaService.recalcular_valor_total (importação, itens, desconto).
+    valor_total_armazenado = Column("valor_total", Float, index=True)
 
     observacao_importacao = Column(Text)
 
@@ -213,8 +239,8 @@ class Proposta(Base):
             return self.cubagem_manual_m3
         return self.cubagem_m3
 
-    @hybrid_property
-    def valor_total(self) -> float:
+    def calcular_valor_total(self) -> float:
+        """Calcula o valor a partir dos itens carregados (não usa o valor armazenado)."""
         total = 0.0
         for item in self.itens:
             if item.preco_total is not None:
@@ -229,28 +255,32 @@ class Proposta(Base):
             total -= self.desconto
         
         return total
+
+    @hybrid_property
+    def valor_total(self) -> float:
+        # Usa o valor materializado; só recalcula pelos itens em linhas ainda não preenchidas.
+        if self.valor_total_armazenado is not None:
+            return self.valor_total_armazenado
+        return self.calcular_valor_total()
+
+    @valor_total.setter
+    def valor_total(self, valor: float) -> None:
+        self.valor_total_armazenado = valor
+
+    @valor_total.expression
+    def valor_total(cls):
+        # Coluna pura (sem COALESCE) para que ordenações usem o índice.
+        return cls.valor_total_armazenado
     
     @property
     def display_numero(self) -> str:
         """Retorna o número da proposta para exibição (número do Bling se disponível, senão ID interno)"""
-        if self.observacao_importacao and "bling_numero:" in self.observacao_importacao:
-            try:
-                numero_parte = self.observacao_importacao.split("bling_numero:")[1].split(";")[0].strip()
-                return numero_parte
-            except IndexError:
-                return str(self.id)
-        return str(self.id)
+        return extrair_campo_importacao(self.observacao_importacao, "bling_numero") or str(self.id)
     
     @property
     def vendedor_bling(self) -> str | None:
         """Retorna o nome do vendedor do Bling (se disponível na observação)"""
-        if self.observacao_importacao and "bling_vendedor:" in self.observacao_importacao:
-            try:
-                vendedor_parte = self.observacao_importacao.split("bling_vendedor:")[1].split(";")[0].strip()
-                return vendedor_parte
-            except IndexError:
-                return None
-        return None
+        return extrair_campo_importacao(self.observacao_importacao, "bling_vendedor")
     
     @property
     def tempo_atualizado(self) -> str:
@@ -265,6 +295,10 @@ class Proposta(Base):
 
 class PropostaProduto(Base):
     __tablename__ = "propostas_produtos"
+    __table_args__ = (
+        # Itens de uma proposta (detalhe, contagem do kanban, recálculo do valor)
+        Index("ix_propostas_produtos_proposta", "proposta_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -289,6 +323,13 @@ class PropostaProduto(Base):
 
 class PropostaHistorico(Base):
     __tablename__ = "propostas_historico"
+    __table_args__ = (
+        # Transições de uma proposta em ordem (janelas LAG/LEAD do lead time por etapa)
+        Index("ix_propostas_historico_proposta_criado", "proposta_id", "criado_em"),
+        # Página de histórico: ordem (criado_em, id) e filtro por status no período
+        Index("ix_propostas_historico_criado", "criado_em", "id"),
+        Index("ix_propostas_historico_status_criado", "status", "criado_em"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     proposta_id = Column(Integer, ForeignKey("propostas.id"), nullable=False)
@@ -301,12 +342,49 @@ class PropostaHistorico(Base):
     proposta = relationship("Proposta", back_populates="historico")
 
 
+# ======================================================
+# RESUMO DIÁRIO (ANALYTICS)
+# ======================================================
+
+class PropostaResumoDiario(Base):
+    """
+    Agregado das propostas por dia de criação, status atual, origem e vendedor.
+
+    Mantido por ResumoDiarioService a cada mudança de status (o dia da
+    proposta é recalculado inteiro) e reconstruído por
+    scripts/reconstruir_resumo_diario.py. Alimenta os gráficos de longo prazo
+    do dashboard sem varrer a tabela de propostas.
+    """
+
+    __tablename__ = "propostas_resumo_diario"
+    __table_args__ = (
+        UniqueConstraint("dia", "status", "origem", "vendedor_id", name="uq_propostas_resumo_diario_chave"),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    dia = Column(Date, nullable=False, index=True)
+    status = Column(Enum(PropostaStatus), nullable=False)
+    origem = Column(Enum(PropostaOrigem), nullable=False)
+    vendedor_id = Column(Integer, nullable=False, default=0)  # 0 = sem vendedor
+
+    quantidade = Column(Integer, nullable=False, default=0)
+    valor_total = Column(Float, nullable=False, default=0)
+    cubagem_total = Column(Float, nullable=False, default=0)
+
+    atualizado_em = Column(DateTime, default=datetime.utcnow)
+
+
 # ======================================================
 # SIMULAÇÃO
 # ======================================================
 
 class Simulacao(Base):
     __tablename__ = "simulacoes"
+    __table_args__ = (
+        # Listagem paginada: mais recentes primeiro (keyset em criado_em, id)
+        Index("ix_simulacoes_criado", "criado_em", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     proposta_id = Column(Integer, ForeignKey("propostas.id"), unique=True)
@@ -326,6 +404,15 @@ class Simulacao(Base):
 
 class CotacaoFrete(Base):
     __tablename__ = "cotacoes_frete"
+    __table_args__ = (
+        # Uma cotação por transportadora em cada proposta; também atende a busca por proposta
+        Index(
+            "uq_cotacoes_frete_proposta_transportadora",
+            "proposta_id",
+            "transportadora_id",
+            unique=True,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -362,6 +449,9 @@ class Transportadora(Base):
 
 class Caixa(Base):
     __tablename__ = "caixas"
+    __table_args__ = (
+        Index("ix_caixas_nome", "nome", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(150), nullable=False)
@@ -411,6 +501,9 @@ class ContatoNotificacao(Base):
     Contatos que recebem notificações WhatsApp.
     """
     __tablename__ = "contatos_notificacao"
+    __table_args__ = (
+        Index("ix_contatos_notificacao_tipo_nome", "tipo", "nome", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(100), nullable=False)
@@ -0,0 +1,152 @@
+import os
+
+from fastapi import APIRouter, Depends, Form, Request
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse
+from fastapi.routing import APIRoute
+from starlette.status import HTTP_303_SEE_OTHER
+
+from config import settings
+from dependencies import require_lider_html
+from templates import templates
+from utils.memoria import memoria, rss_bytes, rss_pico_bytes
+from utils.perfilador import caminho_pilhas, listar_perfis, perfilador, resumir_pilhas
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+MAX_REQUISICOES_PERFIL = 500
+
+
+def _rotas_perfilaveis(app) -> list[str]:
+    """"METODO /caminho" das rotas da aplicação (exceto as de administração)."""
+    rotas = {
+        f"{metodo} {rota.path}"
+        for rota in app.routes
+        if isinstance(rota, APIRoute) and not rota.path.startswith("/admin")
+        for metodo in rota.methods
+    }
+    return sorted(rotas, key=lambda rota: (rota.split(" ", 1)[1], rota))
+
+
+# ======================================================
+# PERFILADOR
+# ======================================================
+@router.get("/perfis")
+def listar_perfis_view(request: Request, user=Depends(require_lider_html)):
+    if isinstance(user, RedirectResponse):
+        return user
+
+    return templates.TemplateResponse(
+        "admin_perfis.html",
+        {
+            "request": request,
+            "user": user,
+            "rotas": _rotas_perfilaveis(request.app),
+            "pedido": perfilador.pedido_atual(),
+            "perfis": listar_perfis(),
+        },
+    )
+
+
+@router.post("/perfis")
+def armar_perfil(
+    request: Request,
+    rota: str = Form(...),
+    requisicoes: int = Form(20),
+    intervalo_ms: float = Form(5),
+    user=Depends(require_lider_html),
+):
+    if isinstance(user, RedirectResponse):
+        return user
+
+    if rota in _rotas_perfilaveis(request.app):
+        metodo, caminho = rota.split(" ", 1)
+        perfilador.armar(
+            metodo,
+            caminho,
+            requisicoes=max(1, min(requisicoes, MAX_REQUISICOES_PERFIL)),
+            intervalo_ms=max(1.0, min(intervalo_ms, 100.0)),
+        )
+
+    return RedirectResponse("/admin/perfis", status_code=HTTP_303_SEE_OTHER)
+
+
+@router.post("/perfis/cancelar")
+def cancelar_perfil(user=Depends(require_lider_html)):
+    if isinstance(user, RedirectResponse):
+        return user
+
+    perfilador.cancelar()
+    return RedirectResponse("/admin/perfis", status_code=HTTP_303_SEE_OTHER)
+
+
+@router.get("/perfis/{perfil_id}")
+def detalhe_perfil(perfil_id: str, request: Request, user=Depends(require_lider_html)):
+    if isinstance(user, RedirectResponse):
+        return user
+
+    perfil = next((p for p in listar_perfis() if p["id"] == perfil_id), None)
+    caminho = caminho_pilhas(perfil_id)
+    if perfil is None or caminho is None:
+        return HTMLResponse("Perfil não encontrado", status_code=404)
+
+    total, funcoes = resumir_pilhas(caminho)
+    return templates.TemplateResponse(
+        "admin_perfil.html",
+        {
+            "request": request,
+            "user": user,
+            "perfil": perfil,
+            "total_amostras": total,
+            "funcoes": funcoes,
+        },
+    )
+
+
+@router.get("/perfis/{perfil_id}/pilhas.txt")
+def baixar_pilhas(perfil_id: str, user=Depends(require_lider_html)):
+    """Pilhas colapsadas (flamegraph.pl, speedscope.app)."""
+    if isinstance(user, RedirectResponse):
+        return user
+
+    caminho = caminho_pilhas(perfil_id)
+    if caminho is None:
+        return HTMLResponse("Perfil não encontrado", status_code=404)
+    return FileResponse(caminho, media_type="text/plain; charset=utf-8", filename=f"perfil-{perfil_id}.txt")
+
+
+# ======================================================
+# MEMÓRIA
+# ======================================================
+@router.get("/memoria")
+def memoria_view(request: Request, user=Depends(require_lider_html)):
+    if isinstance(user, RedirectResponse):
+        return user
+
+    try:
+        rss, rss_pico = rss_bytes(), rss_pico_bytes()
+    except OSError:
+        rss = rss_pico = None
+
+    return templates.TemplateResponse(
+        "admin_memoria.html",
+        {
+            "request": request,
+            "user": user,
+            "rss": rss,
+            "rss_pico": rss_pico,
+            "limite": settings.memoria_limite_mb * 1024 * 1024,
+            "amostragem": memoria.amostragem,
+            "rotas": memoria.rotas(),
+            "recentes": memoria.recentes(),
+            "pid": os.getpid(),
+        },
+    )
+
+
+@router.post("/memoria/limpar")
+def limpar_memoria(user=Depends(require_lider_html)):
+    if isinstance(user, RedirectResponse):
+        return user
+
+    memoria.limpar()
+    return RedirectResponse("/admin/memoria", status_code=HTTP_303_SEE_OTHER)
@@ -4,10 +4,12 @@ from starlette.status import HTTP_303_SEE_OTHER
 from sqlalchemy.orm import Session
 from urllib.parse import urlparse, parse_qs
 
+from config import settings
 from database import get_db
 from dependencies import get_current_user_api
 from services.bling_import_service import BlingImportService
 from services.bling_parser_service import BlingParserService
+from utils.rastreamento import span
 
 router = APIRouter(
     prefix="/integracoes/bling/importar",
@@ -37,24 +39,25 @@ def importar_proposta_por_link(
             status_code=HTTP_303_SEE_OTHER,
         )
 
-    # tentar parsear o documento público do Bling e importar
-    try:
-        dados = BlingParserService.parse_doc_view(link_bling)
-    except ValueError:
-        return RedirectResponse(
-            "/propostas?erro=bling_link_invalido",
-            status_code=HTTP_303_SEE_OTHER,
-        )
+    with span("importacao", lento_ms=settings.importacao_lenta_ms, link=link_bling):
+        # tentar parsear o documento público do Bling e importar
+        try:
+            dados = BlingParserService.parse_doc_view(link_bling)
+        except ValueError:
+            return RedirectResponse(
+                "/propostas?erro=bling_link_invalido",
+                status_code=HTTP_303_SEE_OTHER,
+            )
 
-    BlingImportService.importar_proposta_bling(
-        db=db,
-        id_bling=dados.get("id_bling") or id_bling,
-        cliente=dados.get("cliente", {"nome": "Cliente Bling"}),
-        itens=dados.get("itens", []),
-        vendedor_id=user.id,
-        observacao="Importado via Bling",
-        pedido=dados.get("pedido"),
-    )
+        BlingImportService.importar_proposta_bling(
+            db=db,
+            id_bling=dados.get("id_bling") or id_bling,
+            cliente=dados.get("cliente", {"nome": "Cliente Bling"}),
+            itens=dados.get("itens", []),
+            vendedor_id=user.id,
+            observacao="Importado via Bling",
+            pedido=dados.get("pedido"),
+        )
 
     return RedirectResponse(
         "/propostas",
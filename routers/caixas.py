@@ -7,6 +7,7 @@ from database import get_db
 from dependencies import get_current_user_html, require_lider_html
 from templates import templates
 from models import Caixa
+from utils.paginacao import filtro_busca, paginar
 
 router = APIRouter(prefix="/caixas", tags=["caixas"])
 
@@ -17,24 +18,28 @@ router = APIRouter(prefix="/caixas", tags=["caixas"])
 @router.get("/")
 def listar_caixas(
     request: Request,
+    q: str | None = None,
+    pagina: str | None = None,
     db: Session = Depends(get_db),
     user=Depends(get_current_user_html),
 ):
     if isinstance(user, RedirectResponse):
         return user
 
-    caixas = (
-        db.query(Caixa)
-        .order_by(Caixa.nome)
-        .all()
-    )
+    query = db.query(Caixa)
+    busca = filtro_busca(q, Caixa.nome)
+    if busca is not None:
+        query = query.filter(busca)
+
+    resultado = paginar(query, (Caixa.nome, Caixa.id), pagina)
 
     return templates.TemplateResponse(
         "caixas_list.html",
         {
             "request": request,
             "user": user,
-            "caixas": caixas,
+            "caixas": resultado.itens,
+            "pagina": resultado,
         },
     )
 
@@ -7,6 +7,8 @@ from database import get_db
 from dependencies import get_current_user_html, require_lider_html
 from templates import templates
 from models import ContatoNotificacao, TipoNotificacao
+from services.whatsapp_service import WhatsAppService
+from utils.paginacao import filtro_busca, paginar
 
 router = APIRouter(prefix="/contatos-notificacao", tags=["contatos-notificacao"])
 
@@ -17,16 +19,23 @@ router = APIRouter(prefix="/contatos-notificacao", tags=["contatos-notificacao"]
 @router.get("/")
 def listar_contatos(
     request: Request,
+    q: str | None = None,
+    pagina: str | None = None,
     db: Session = Depends(get_db),
     user=Depends(get_current_user_html),
 ):
     if isinstance(user, RedirectResponse):
         return user
 
-    contatos = (
-        db.query(ContatoNotificacao)
-        .order_by(ContatoNotificacao.tipo, ContatoNotificacao.nome)
-        .all()
+    query = db.query(ContatoNotificacao)
+    busca = filtro_busca(q, ContatoNotificacao.nome, ContatoNotificacao.telefone)
+    if busca is not None:
+        query = query.filter(busca)
+
+    resultado = paginar(
+        query,
+        (ContatoNotificacao.tipo, ContatoNotificacao.nome, ContatoNotificacao.id),
+        pagina,
     )
 
     return templates.TemplateResponse(
@@ -34,7 +43,8 @@ def listar_contatos(
         {
             "request": request,
             "user": user,
-            "contatos": contatos,
+            "contatos": resultado.itens,
+            "pagina": resultado,
         },
     )
 
@@ -65,6 +75,7 @@ def criar_contato(
         )
         db.add(contato)
         db.commit()
+        WhatsAppService.invalidar_cache()
 
     return RedirectResponse(
         "/contatos-notificacao",
@@ -94,6 +105,7 @@ def editar_contato(
         contato.telefone = telefone.strip().replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
         contato.tipo = TipoNotificacao(tipo)
         db.commit()
+        WhatsAppService.invalidar_cache()
 
     return RedirectResponse(
         "/contatos-notificacao",
@@ -118,6 +130,7 @@ def excluir_contato(
     if contato:
         db.delete(contato)
         db.commit()
+        WhatsAppService.invalidar_cache()
 
     return RedirectResponse(
         "/contatos-notificacao",
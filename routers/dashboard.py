@@ -1,128 +1,29 @@
-from datetime import datetime, timedelta
-from typing import Dict, Any
+import hashlib
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import RedirectResponse
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, RedirectResponse
 from sqlalchemy.orm import Session
 
+from config import settings
 from database import get_db
-from dependencies import get_current_user_html
+from dependencies import get_current_user_api, get_current_user_html
 from templates import templates
-from models import Proposta, PropostaStatus, Cliente, User
-
-router = APIRouter(prefix="/dashboard", tags=["dashboard"])
-
-
-def _get_dashboard_stats(db: Session) -> Dict[str, Any]:
-    today = datetime.now().date()
-    
-    # Propostas de hoje
-    propostas_hoje = db.query(func.count(Proposta.id)).filter(
-        func.date(Proposta.criado_em) == today
-    ).scalar() or 0
-    
-    # Propostas por status
-    em_simulacao = db.query(func.count(Proposta.id)).filter(
-        Proposta.status == PropostaStatus.pendente_simulacao
-    ).scalar() or 0
-    
-    em_cotacao = db.query(func.count(Proposta.id)).filter(
-        Proposta.status == PropostaStatus.pendente_cotacao
-    ).scalar() or 0
-    
-    em_envio = db.query(func.count(Proposta.id)).filter(
-        Proposta.status == PropostaStatus.pendente_envio
-    ).scalar() or 0
-    
-    # Valor total do dia - calculado manualmente pois valor_total é uma property
-    propostas_dia = db.query(Proposta).filter(
-        func.date(Proposta.criado_em) == today
-    ).all()
-    
-    valor_dia = sum(proposta.valor_total for proposta in propostas_dia)
-    
-    return {
-        "propostas_hoje": propostas_hoje,
-        "em_simulacao": em_simulacao,
-        "em_cotacao": em_cotacao,
-        "em_envio": em_envio,
-        "valor_dia": float(valor_dia) if valor_dia else 0,
-    }
-
-
-def _get_recent_activities(db: Session, limit: int = 5) -> list:
-    propostas = (
-        db.query(Proposta)
-        .join(Cliente)
-        .order_by(Proposta.criado_em.desc())
-        .limit(limit)
-        .all()
-    )
-    
-    activities = []
-    for proposta in propostas:
-        # Calculate time difference
-        now = datetime.now()
-        diff = now - proposta.criado_em
-        
-        if diff.days > 0:
-            tempo_relativo = f"{diff.days}d atrás"
-        elif diff.seconds // 3600 > 0:
-            tempo_relativo = f"{diff.seconds // 3600}h atrás"
-        else:
-            tempo_relativo = f"{diff.seconds // 60} min atrás"
-        
-        activities.append({
-            "id": proposta.id,
-            "numero": f"#{proposta.id}",
-            "cliente": proposta.cliente.nome,
-            "status": proposta.status.value,
-            "valor": proposta.valor_total,
-            "tempo_relativo": tempo_relativo,
-        })
-    
-    return activities
+from services.dashboard_service import DashboardService
+from services.lead_time_service import LeadTimeService
+from utils.cache import estatisticas_caches
 
+logger = logging.getLogger(__name__)
 
-def _get_chart_data_status(db: Session) -> Dict[str, int]:
-    em_simulacao = db.query(func.count(Proposta.id)).filter(
-        Proposta.status == PropostaStatus.pendente_simulacao
-    ).scalar() or 0
-    
-    em_cotacao = db.query(func.count(Proposta.id)).filter(
-        Proposta.status == PropostaStatus.pendente_cotacao
-    ).scalar() or 0
-    
-    em_envio = db.query(func.count(Proposta.id)).filter(
-        Proposta.status == PropostaStatus.pendente_envio
-    ).scalar() or 0
-    
-    return {
-        "simulacao": em_simulacao,
-        "cotacao": em_cotacao,
-        "envio": em_envio,
-    }
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
+Granularidade = Literal["dia", "semana", "mes"]
 
-def _get_chart_data_evolution(db: Session, days: int = 7) -> Dict[str, list]:
-    today = datetime.now().date()
-    dates = []
-    counts = []
-    
-    for i in range(days - 1, -1, -1):
-        date = today - timedelta(days=i)
-        count = db.query(func.count(Proposta.id)).filter(
-            func.date(Proposta.criado_em) == date
-        ).scalar() or 0
-        
-        dates.append(date.strftime("%d/%m"))
-        counts.append(count)
-    
-    return {
-        "dates": dates,
-        "counts": counts,
-    }
+# Máximo de pontos por série (ex.: ~13 meses por dia, 10 anos por mês)
+LIMITE_PONTOS_GRAFICO = 400
 
 
 @router.get("/")
@@ -145,20 +46,17 @@ def dashboard(
         return user
     
     try:
-        # Get all dashboard data
-        stats = _get_dashboard_stats(db)
-        activities = _get_recent_activities(db)
-        chart_status = _get_chart_data_status(db)
-        chart_evolution = _get_chart_data_evolution(db)
+        # Só métricas e atividades (em cache); os gráficos são buscados pelo dashboard.js na API
+        dados = DashboardService.carregar_painel(db)
         
         return templates.TemplateResponse(
             "dashboard.html",
             {
                 "request": request,
-                "stats": stats,
-                "activities": activities,
-                "chart_status": chart_status,
-                "chart_evolution": chart_evolution,
+                "stats": dados["stats"],
+                "activities": dados["activities"],
+                "chart_status": dados["chart_status"],
+                "vendedores": dados["vendedores"],
             },
         )
     except Exception as e:
@@ -171,3 +69,143 @@ def dashboard(
             },
             status_code=500,
         )
+
+
+@router.get("/cache")
+def dashboard_cache_stats(user=Depends(get_current_user_api)):
+    """Acertos/erros dos caches em memória deste worker."""
+    return JSONResponse({"caches": estatisticas_caches()})
+
+
+# ======================================================
+# API DOS GRÁFICOS (JSON)
+# ======================================================
+
+def _resolver_periodo(
+    inicio: Optional[date],
+    fim: Optional[date],
+    granularidade: str,
+) -> tuple[date, date]:
+    """Aplica o período padrão de cada granularidade e valida o intervalo."""
+    fim = fim or datetime.now().date()
+    if inicio is None:
+        if granularidade == "mes":
+            inicio = fim.replace(day=1)
+            for _ in range(11):
+                inicio = (inicio - timedelta(days=1)).replace(day=1)
+        elif granularidade == "semana":
+            inicio = fim - timedelta(weeks=11)
+        else:
+            inicio = fim - timedelta(days=6)
+
+    if inicio > fim:
+        raise HTTPException(status_code=400, detail="inicio deve ser anterior ou igual a fim")
+
+    dias = (fim - inicio).days + 1
+    pontos = {"dia": dias, "semana": dias // 7 + 1, "mes": dias // 28 + 1}[granularidade]
+    if pontos > LIMITE_PONTOS_GRAFICO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Período grande demais para granularidade '{granularidade}' (máx. {LIMITE_PONTOS_GRAFICO} pontos)",
+        )
+    return inicio, fim
+
+
+def _responder_com_etag(request: Request, chave: tuple, carregar) -> Response:
+    """
+    JSON com ETag derivado dos parâmetros e da versão dos dados do dashboard.
+
+    O ETag muda quando uma proposta muda de status (invalidação do cache) e, no
+    máximo, a cada TTL do cache; um If-None-Match igual responde 304 sem
+    consultar o banco.
+    """
+    janela = int(time.time() // max(settings.dashboard_cache_ttl, 1))
+    assinatura = repr((chave, DashboardService.versao_dados(), janela)).encode("utf-8")
+    etag = f'"{hashlib.sha1(assinatura).hexdigest()[:20]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(DashboardService.obter_grafico(chave, carregar), headers=headers)
+
+
+@router.get("/api/status")
+def api_status(
+    request: Request,
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    vendedor: Optional[int] = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user_api),
+):
+    """Propostas por status atual (criadas no período, se informado)."""
+    if inicio and fim and inicio > fim:
+        raise HTTPException(status_code=400, detail="inicio deve ser anterior ou igual a fim")
+
+    chave = ("status", inicio, fim, vendedor)
+    return _responder_com_etag(
+        request,
+        chave,
+        lambda: DashboardService.distribuicao_status(db, inicio, fim, vendedor),
+    )
+
+
+@router.get("/api/serie")
+def api_serie(
+    request: Request,
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    granularidade: Granularidade = "dia",
+    vendedor: Optional[int] = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user_api),
+):
+    """Quantidade e valor das propostas criadas, por dia, semana ou mês."""
+    inicio, fim = _resolver_periodo(inicio, fim, granularidade)
+
+    chave = ("serie", inicio, fim, granularidade, vendedor)
+    return _responder_com_etag(
+        request,
+        chave,
+        lambda: DashboardService.serie(db, inicio, fim, granularidade, vendedor),
+    )
+
+
+@router.get("/api/vendedores")
+def api_vendedores(
+    request: Request,
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user_api),
+):
+    """Quantidade e valor por vendedor no período (padrão: últimos 12 meses)."""
+    inicio, fim = _resolver_periodo(inicio, fim, "mes")
+
+    chave = ("vendedores", inicio, fim)
+    return _responder_com_etag(
+        request,
+        chave,
+        lambda: DashboardService.por_vendedor(db, inicio, fim),
+    )
+
+
+@router.get("/api/lead-time")
+def api_lead_time(
+    request: Request,
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    vendedor: Optional[int] = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user_api),
+):
+    """Tempo em cada etapa (mediana, p90, % no SLA) por semana e por vendedor (padrão: 12 semanas)."""
+    inicio, fim = _resolver_periodo(inicio, fim, "semana")
+
+    chave = ("lead-time", inicio, fim, vendedor)
+    return _responder_com_etag(
+        request,
+        chave,
+        lambda: LeadTimeService.tempos_por_etapa(db, inicio, fim, vendedor),
+    )
@@ -0,0 +1,32 @@
+import hmac
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse, Response
+
+from config import settings
+from utils.metricas import REGISTRO, TIPO_CONTEUDO
+
+router = APIRouter(tags=["metricas"])
+
+
+# ======================================================
+# PROMETHEUS
+# ======================================================
+@router.get("/metrics", include_in_schema=False)
+def metricas(request: Request):
+    """Métricas do processo; exige `Authorization: Bearer <METRICAS_TOKEN>`.
+
+    Sem token configurado a rota não existe para fora (404): use a porta
+    interna (METRICAS_PORTA), que responde sem autenticação.
+    """
+    token = settings.metricas_token
+    if not token:
+        return PlainTextResponse("Not Found", status_code=404)
+
+    autorizacao = request.headers.get("authorization", "")
+    esquema, _, recebido = autorizacao.partition(" ")
+    # Em bytes: compare_digest recusa (TypeError) strings com caracteres não ASCII
+    if esquema.lower() != "bearer" or not hmac.compare_digest(recebido.strip().encode(), token.encode()):
+        return PlainTextResponse("Unauthorized", status_code=401, headers={"WWW-Authenticate": "Bearer"})
+
+    return Response(REGISTRO.exportar(), media_type=TIPO_CONTEUDO)
@@ -1,11 +1,14 @@
 import re
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 from fastapi import APIRouter, Depends, Request, Form
-from fastapi.responses import RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import FormData
 from starlette.status import HTTP_303_SEE_OTHER
 
+from config import settings
 from database import get_db
 from dependencies import get_current_user_html
 from templates import templates
@@ -21,14 +24,19 @@ from models import (
     User,
     Cliente,
     CotacaoFrete,
-    PropostaHistorico,
     EnvioProposta,
 )
 from services.galpao_service import GalpaoService
 from services.bling_parser_service import BlingParserService
 from services.bling_import_service import BlingImportService
+from services.dashboard_service import DashboardService
+from services.historico_service import HistoricoService
+from services.kanban_service import KANBAN_COLUNAS, KanbanService
 from services.proposta_service import PropostaService
+from services.resumo_diario_service import ResumoDiarioService
 from utils.medidas import format_dimensoes_m
+from utils.perfilador import perfilar_com
+from utils.rastreamento import span
 from utils.simulacao_manual_parser import (
     extrair_peso_total_kg,
     extrair_volume_total_cm3,
@@ -52,48 +60,12 @@ def kanban_propostas(
     if isinstance(user, RedirectResponse):
         return user
 
-    def aplicar_filtros(query):
-        if cliente:
-            query = query.filter(
-                Proposta.cliente.has(Cliente.nome.ilike(f"%{cliente}%"))
-            )
-        if vendedor:
-            query = query.filter(Proposta.vendedor_id == vendedor)
-        return query
+    colunas, totais = KanbanService.carregar_quadro(db, cliente=cliente, vendedor=vendedor)
 
-    pend_sim = aplicar_filtros(
-        db.query(Proposta)
-        .options(
-            joinedload(Proposta.cliente),
-            joinedload(Proposta.vendedor),
-            joinedload(Proposta.itens).joinedload(PropostaProduto.produto)
-        )
-        .filter(Proposta.status == PropostaStatus.pendente_simulacao)
-    ).all()
-
-    pend_cot = aplicar_filtros(
-        db.query(Proposta)
-        .options(
-            joinedload(Proposta.cliente),
-            joinedload(Proposta.vendedor),
-            joinedload(Proposta.itens).joinedload(PropostaProduto.produto)
-        )
-        .filter(Proposta.status == PropostaStatus.pendente_cotacao)
-    ).all()
-
-    pend_env = aplicar_filtros(
-        db.query(Proposta)
-        .options(
-            joinedload(Proposta.cliente),
-            joinedload(Proposta.vendedor),
-            joinedload(Proposta.itens).joinedload(PropostaProduto.produto)
-        )
-        .filter(Proposta.status == PropostaStatus.pendente_envio)
-    ).all()
-
-    for p in pend_sim + pend_cot + pend_env:
-        # nome do cliente para facilitar templates
-        p.cliente_nome = p.cliente.nome if p.cliente else ""
+    cursores = {
+        status.value: (cards[-1].cursor if len(cards) < totais[status] else None)
+        for status, cards in colunas.items()
+    }
 
     vendedores = db.query(User).order_by(User.nome).all()
 
@@ -102,14 +74,55 @@ def kanban_propostas(
         {
             "request": request,
             "user": user,
-            "pendentes_simulacao": pend_sim,
-            "pendentes_cotacao": pend_cot,
-            "pendentes_envio": pend_env,
+            "pendentes_simulacao": colunas[PropostaStatus.pendente_simulacao],
+            "pendentes_cotacao": colunas[PropostaStatus.pendente_cotacao],
+            "pendentes_envio": colunas[PropostaStatus.pendente_envio],
+            "totais": {status.value: total for status, total in totais.items()},
+            "cursores": cursores,
             "vendedores": vendedores,
         },
     )
 
 
+@router.get("/kanban/{status}")
+def kanban_carregar_mais(
+    status: PropostaStatus,
+    request: Request,
+    cursor: str | None = None,
+    cliente: str | None = None,
+    vendedor: int | None = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user_html),
+):
+    """Próxima página de cards de uma coluna (fragmento HTML)."""
+    if isinstance(user, RedirectResponse):
+        return user
+
+    if status not in KANBAN_COLUNAS:
+        return HTMLResponse("", status_code=404)
+
+    try:
+        cards, proximo_cursor = KanbanService.carregar_pagina(
+            db,
+            status,
+            cursor=cursor,
+            cliente=cliente,
+            vendedor=vendedor,
+        )
+    except ValueError:
+        return HTMLResponse("Cursor inválido", status_code=400)
+
+    return templates.TemplateResponse(
+        "propostas_kanban_cards.html",
+        {
+            "request": request,
+            "status": status.value,
+            "cards": cards,
+            "proximo_cursor": proximo_cursor,
+        },
+    )
+
+
 # ======================================================
 # NOVA PROPOSTA (IMPORTAÇÃO BLING)
 # ======================================================
@@ -133,34 +146,36 @@ def importar_proposta_bling(
     if isinstance(user, RedirectResponse):
         return user
 
-    try:
-        dados = BlingParserService.parse_doc_view(link_bling)
-    except ValueError:
-        return RedirectResponse("/propostas?erro=bling_link_invalido", status_code=HTTP_303_SEE_OTHER)
-
-    cliente = dados.get("cliente")
-    if not cliente or not cliente.get("nome"):
-        raise ValueError("Cliente não encontrado no documento do Bling")
-
-    # Busca ou cria vendedor baseado no nome do Bling
-    vendedor_id = user.id  # Padrão: usuário logado
-    pedido = dados.get("pedido", {})
-    nome_vendedor_bling = pedido.get("vendedor")
+    # Rastro da importação inteira; acima de IMPORTACAO_LENTA_MS o log traz o tempo de cada etapa
+    with span("importacao", lento_ms=settings.importacao_lenta_ms, link=link_bling):
+        try:
+            dados = BlingParserService.parse_doc_view(link_bling)
+        except ValueError:
+            return RedirectResponse("/propostas?erro=bling_link_invalido", status_code=HTTP_303_SEE_OTHER)
+
+        cliente = dados.get("cliente")
+        if not cliente or not cliente.get("nome"):
+            raise ValueError("Cliente não encontrado no documento do Bling")
+
+        # Busca ou cria vendedor baseado no nome do Bling
+        vendedor_id = user.id  # Padrão: usuário logado
+        pedido = dados.get("pedido", {})
+        nome_vendedor_bling = pedido.get("vendedor")
     
-    if nome_vendedor_bling:
-        vendedor = db.query(User).filter(User.nome == nome_vendedor_bling).first()
-        if vendedor:
-            vendedor_id = vendedor.id
+        if nome_vendedor_bling:
+            vendedor = db.query(User).filter(User.nome == nome_vendedor_bling).first()
+            if vendedor:
+                vendedor_id = vendedor.id
 
-    BlingImportService.importar_proposta_bling(
-        db=db,
-        id_bling=dados["id_bling"],
-        cliente=cliente,
-        itens=dados.get("itens", []),
-        vendedor_id=vendedor_id,
-        observacao="Importado via Bling",
-        pedido=pedido,
-    )
+        BlingImportService.importar_proposta_bling(
+            db=db,
+            id_bling=dados["id_bling"],
+            cliente=cliente,
+            itens=dados.get("itens", []),
+            vendedor_id=vendedor_id,
+            observacao="Importado via Bling",
+            pedido=pedido,
+        )
 
     return RedirectResponse("/propostas", status_code=HTTP_303_SEE_OTHER)
 
@@ -168,20 +183,56 @@ def importar_proposta_bling(
 # ======================================================
 # HISTÓRICO DE PROPOSTAS
 # ======================================================
+def _data_ou_none(valor: str | None) -> date | None:
+    try:
+        return date.fromisoformat(valor) if valor else None
+    except ValueError:
+        return None
+
+
+def _filtros_historico(
+    periodo: str | None,
+    inicio: str | None,
+    fim: str | None,
+    vendedor: str | None,
+    status: str | None,
+) -> dict:
+    """Normaliza os filtros do formulário do histórico (campos vazios ou inválidos = sem filtro)."""
+    hoje = datetime.now().date()
+    inicio = _data_ou_none(inicio)
+    fim = _data_ou_none(fim)
+    if not inicio and periodo == "hoje":
+        inicio = hoje
+    elif not inicio and periodo and periodo.isdigit():
+        inicio = hoje - timedelta(days=int(periodo) - 1)
+
+    return {
+        "inicio": inicio,
+        "fim": fim,
+        "vendedor": int(vendedor) if vendedor and vendedor.isdigit() else None,
+        "status": PropostaStatus(status) if status in PropostaStatus._value2member_map_ else None,
+    }
+
+
 @router.get("/historico")
 def historico_propostas(
     request: Request,
+    cliente: str | None = None,
+    vendedor: str | None = None,
+    status: str | None = None,
+    periodo: str | None = None,
+    inicio: str | None = None,
+    fim: str | None = None,
     db: Session = Depends(get_db),
     user=Depends(get_current_user_html),
 ):
     if isinstance(user, RedirectResponse):
         return user
 
-    historico = (
-        db.query(PropostaHistorico)
-        .options(joinedload(PropostaHistorico.proposta))
-        .order_by(PropostaHistorico.criado_em.desc())
-        .all()
+    eventos, proximo_cursor = HistoricoService.carregar_pagina(
+        db,
+        cliente=cliente,
+        **_filtros_historico(periodo, inicio, fim, vendedor, status),
     )
 
     vendedores = db.query(User).order_by(User.nome).all()
@@ -191,8 +242,47 @@ def historico_propostas(
         {
             "request": request,
             "user": user,
-            "historico": historico,
+            "historico": eventos,
+            "proximo_cursor": proximo_cursor,
             "vendedores": vendedores,
+            "status_opcoes": list(PropostaStatus),
+        },
+    )
+
+
+@router.get("/historico/linhas")
+def historico_carregar_mais(
+    request: Request,
+    cursor: str | None = None,
+    cliente: str | None = None,
+    vendedor: str | None = None,
+    status: str | None = None,
+    periodo: str | None = None,
+    inicio: str | None = None,
+    fim: str | None = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user_html),
+):
+    """Próxima página do histórico (fragmento HTML com as linhas da tabela)."""
+    if isinstance(user, RedirectResponse):
+        return user
+
+    try:
+        eventos, proximo_cursor = HistoricoService.carregar_pagina(
+            db,
+            cursor=cursor,
+            cliente=cliente,
+            **_filtros_historico(periodo, inicio, fim, vendedor, status),
+        )
+    except ValueError:
+        return HTMLResponse("Cursor inválido", status_code=400)
+
+    return templates.TemplateResponse(
+        "propostas_historico_linhas.html",
+        {
+            "request": request,
+            "historico": eventos,
+            "proximo_cursor": proximo_cursor,
         },
     )
 
@@ -291,11 +381,18 @@ async def simular_por_volumes(
     if isinstance(user, RedirectResponse):
         return user
 
+    # Só o formulário é lido no event loop; consultas, commits e o WhatsApp (HTTP síncrono)
+    # rodam no threadpool para não travar as outras requisições do worker
+    form = await request.form()
+    return await run_in_threadpool(_salvar_simulacao_volumes, db, proposta_id, form)
+
+
+@perfilar_com(simular_por_volumes)
+def _salvar_simulacao_volumes(db: Session, proposta_id: int, form: FormData) -> RedirectResponse:
     proposta = db.get(Proposta, proposta_id)
     if not proposta:
         return RedirectResponse("/propostas", HTTP_303_SEE_OTHER)
 
-    form = await request.form()
     action = form.get("action", "").strip()
 
     # 1) Collect selected caixa rows (volume_select[index] and volume_qtd[index])
@@ -463,11 +560,16 @@ async def salvar_simulacao_manual(
     if isinstance(user, RedirectResponse):
         return user
 
+    form = await request.form()
+    return await run_in_threadpool(_salvar_simulacao_manual, db, proposta_id, form)
+
+
+@perfilar_com(salvar_simulacao_manual)
+def _salvar_simulacao_manual(db: Session, proposta_id: int, form: FormData) -> RedirectResponse:
     proposta = db.get(Proposta, proposta_id)
     if not proposta:
         return RedirectResponse("/propostas", HTTP_303_SEE_OTHER)
 
-    form = await request.form()
     descricao = (form.get("simulacao_texto") or "").strip()
     action = form.get("action", "").strip()
     
@@ -711,15 +813,15 @@ def cancelar_proposta(
     proposta.status = PropostaStatus.cancelada
     proposta.atualizado_em = datetime.utcnow()
 
-    db.add(
-        PropostaHistorico(
-            proposta_id=proposta.id,
-            status=PropostaStatus.cancelada,
-            observacao="Proposta cancelada pelo usuário",
-        )
+    PropostaService._registrar_historico(
+        db,
+        proposta,
+        PropostaStatus.cancelada,
+        "Proposta cancelada pelo usuário",
     )
 
     db.commit()
+    DashboardService.invalidar_cache()
     return RedirectResponse("/propostas", HTTP_303_SEE_OTHER)
 
 
@@ -747,8 +849,12 @@ def excluir_proposta(
             status_code=HTTP_303_SEE_OTHER,
         )
 
+    dia_criacao = proposta.criado_em.date() if proposta.criado_em else None
     db.delete(proposta)
+    db.flush()
+    ResumoDiarioService.atualizar_dia(db, dia_criacao)
     db.commit()
+    DashboardService.invalidar_cache()
 
     return RedirectResponse(
         "/propostas?msg=proposta_excluida",
@@ -769,11 +875,16 @@ async def salvar_simulacao_galpao(
     if isinstance(user, RedirectResponse):
         return user
 
+    form = await request.form()
+    return await run_in_threadpool(_salvar_simulacao_galpao, db, proposta_id, form)
+
+
+@perfilar_com(salvar_simulacao_galpao)
+def _salvar_simulacao_galpao(db: Session, proposta_id: int, form: FormData) -> RedirectResponse:
     proposta = db.get(Proposta, proposta_id)
     if not proposta:
         return RedirectResponse("/propostas", HTTP_303_SEE_OTHER)
 
-    form = await request.form()
     produtos_payload = []
     index = 0
 
@@ -797,15 +908,15 @@ async def salvar_simulacao_galpao(
 
     proposta.status = PropostaStatus.pendente_cotacao
     proposta.atualizado_em = datetime.utcnow()
-    db.add(
-        PropostaHistorico(
-            proposta_id=proposta.id,
-            status=PropostaStatus.pendente_cotacao,
-            observacao="Simulação logística realizada",
-        )
+    PropostaService._registrar_historico(
+        db,
+        proposta,
+        PropostaStatus.pendente_cotacao,
+        "Simulação logística realizada",
     )
 
     db.commit()
+    DashboardService.invalidar_cache()
 
     return RedirectResponse(
         f"/propostas/{proposta_id}",
@@ -826,13 +937,24 @@ async def salvar_cotacao(
     if isinstance(user, RedirectResponse):
         return user
 
+    form = await request.form()
+    return await run_in_threadpool(_salvar_cotacao, db, proposta_id, form)
+
+
+@perfilar_com(salvar_cotacao)
+def _salvar_cotacao(db: Session, proposta_id: int, form: FormData) -> RedirectResponse:
     proposta = db.get(Proposta, proposta_id)
     if not proposta:
         return RedirectResponse("/propostas", HTTP_303_SEE_OTHER)
 
-    form = await request.form()
     action = form.get("action", "").strip()
 
+    # Cotações já cadastradas, por transportadora (no máximo uma por transportadora na proposta)
+    cotacoes_por_transportadora = {
+        cotacao.transportadora_id: cotacao
+        for cotacao in db.query(CotacaoFrete).filter(CotacaoFrete.proposta_id == proposta.id)
+    }
+
     # Processar múltiplas cotações
     cotacoes_criadas = 0
     index = 0
@@ -850,10 +972,7 @@ async def salvar_cotacao(
                 prazo_dias = int(prazo_str)
 
                 # Verificar se já existe uma cotação para esta transportadora
-                cotacao_existente = db.query(CotacaoFrete).filter(
-                    CotacaoFrete.proposta_id == proposta.id,
-                    CotacaoFrete.transportadora_id == transportadora_id
-                ).first()
+                cotacao_existente = cotacoes_por_transportadora.get(transportadora_id)
 
                 if cotacao_existente:
                     # Atualizar cotação existente
@@ -862,15 +981,15 @@ async def salvar_cotacao(
                     cotacao_existente.numero_cotacao = numero_cotacao
                 else:
                     # Criar nova cotação
-                    db.add(
-                        CotacaoFrete(
-                            proposta_id=proposta.id,
-                            transportadora_id=transportadora_id,
-                            preco=preco,
-                            prazo_dias=prazo_dias,
-                            numero_cotacao=numero_cotacao,
-                        )
+                    nova_cotacao = CotacaoFrete(
+                        proposta_id=proposta.id,
+                        transportadora_id=transportadora_id,
+                        preco=preco,
+                        prazo_dias=prazo_dias,
+                        numero_cotacao=numero_cotacao,
                     )
+                    db.add(nova_cotacao)
+                    cotacoes_por_transportadora[transportadora_id] = nova_cotacao
                 cotacoes_criadas += 1
             except (TypeError, ValueError):
                 continue
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, Request, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from starlette.status import HTTP_303_SEE_OTHER
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, contains_eager, selectinload
 
 from database import get_db
 from dependencies import get_current_user_html
 from templates import templates
-from models import Simulacao, Proposta
+from models import Cliente, Simulacao, Proposta, PropostaProduto
+from utils.paginacao import filtro_busca, paginar
 
 router = APIRouter(
     prefix="/simulacoes",
@@ -17,26 +19,46 @@ router = APIRouter(
 @router.get("/", response_class=HTMLResponse)
 def listar_simulacoes(
     request: Request,
+    q: str | None = None,
+    pagina: str | None = None,
     db: Session = Depends(get_db),
     user=Depends(get_current_user_html),
 ):
-    """Lista todas as simulações salvas no sistema"""
-    
-    simulacoes = (
+    """Lista as simulações salvas, mais recentes primeiro, paginadas e com busca no servidor"""
+
+    query = (
         db.query(Simulacao)
+        .join(Simulacao.proposta)
+        .join(Proposta.cliente)
         .options(
-            joinedload(Simulacao.proposta).joinedload(Proposta.cliente),
-            joinedload(Simulacao.proposta).joinedload(Proposta.itens)
+            contains_eager(Simulacao.proposta).contains_eager(Proposta.cliente),
+            # selectinload: coleção carregada só para as simulações da página
+            contains_eager(Simulacao.proposta)
+            .selectinload(Proposta.itens)
+            .joinedload(PropostaProduto.produto),
         )
-        .order_by(Simulacao.criado_em.desc())
-        .all()
     )
-    
+
+    busca = filtro_busca(q, Cliente.nome, Simulacao.descricao, Proposta.id_bling)
+    if busca is not None:
+        termo = q.strip().lstrip("#")
+        # Número da proposta: ID interno ou número do Bling gravado na importação
+        if termo.isdigit():
+            busca = or_(
+                busca,
+                Proposta.id == int(termo),
+                Proposta.observacao_importacao.like(f"%bling_numero:{termo};%"),
+            )
+        query = query.filter(busca)
+
+    resultado = paginar(query, (Simulacao.criado_em, Simulacao.id), pagina, desc=True)
+
     return templates.TemplateResponse(
         "simulacoes_list.html",
         {
             "request": request,
-            "simulacoes": simulacoes,
+            "simulacoes": resultado.itens,
+            "pagina": resultado,
             "user": user,
         },
     )
@@ -7,6 +7,7 @@ from database import get_db
 from dependencies import get_current_user_html, require_lider_html
 from templates import templates
 from models import Transportadora, CotacaoFrete
+from utils.paginacao import filtro_busca, paginar
 
 router = APIRouter(prefix="/transportadoras", tags=["transportadoras"])
 
@@ -17,24 +18,28 @@ router = APIRouter(prefix="/transportadoras", tags=["transportadoras"])
 @router.get("/")
 def listar_transportadoras(
     request: Request,
+    q: str | None = None,
+    pagina: str | None = None,
     db: Session = Depends(get_db),
     user=Depends(get_current_user_html),
 ):
     if isinstance(user, RedirectResponse):
         return user
 
-    transportadoras = (
-        db.query(Transportadora)
-        .order_by(Transportadora.nome)
-        .all()
-    )
+    query = db.query(Transportadora)
+    busca = filtro_busca(q, Transportadora.nome)
+    if busca is not None:
+        query = query.filter(busca)
+
+    resultado = paginar(query, (Transportadora.nome, Transportadora.id), pagina)
 
     return templates.TemplateResponse(
         "transportadoras_list.html",
         {
             "request": request,
             "user": user,
-            "transportadoras": transportadoras,
+            "transportadoras": resultado.itens,
+            "pagina": resultado,
         },
     )
 
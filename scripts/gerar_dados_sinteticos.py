@@ -0,0 +1,386 @@
+"""Gera uma base sintética do tamanho da produção para testes de desempenho.
+
+Uso:
+    python scripts/gerar_dados_sinteticos.py                              # 2.000 propostas
+    python scripts/gerar_dados_sinteticos.py --propostas 300000          # ~1 milhão de linhas de histórico
+    python scripts/gerar_dados_sinteticos.py --clientes 20000 --produtos 30000 --seed 7
+    DATABASE_URL=postgresql://... python scripts/gerar_dados_sinteticos.py --propostas 300000
+
+Determinística: a mesma --seed e a mesma --referencia em um banco vazio geram
+exatamente os mesmos dados. Os registros são acrescentados (nada é apagado):
+os ids são atribuídos aqui, a partir do maior id de cada tabela, e as linhas
+vão em lotes (executemany do Core, sem RETURNING por linha), um commit por
+lote de propostas. No PostgreSQL as sequences são ajustadas no final.
+
+Vendedores criados: vendedorN@sintetico.local, senha "sintetico123".
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from auth import get_password_hash
+from auto_migrate import aplicar_migracoes
+from database import engine
+from models import (
+    Caixa,
+    Cliente,
+    CotacaoFrete,
+    EnvioProposta,
+    Produto,
+    Proposta,
+    PropostaHistorico,
+    PropostaOrigem,
+    PropostaProduto,
+    PropostaStatus,
+    Simulacao,
+    TipoSimulacao,
+    Transportadora,
+    User,
+    UserRole,
+)
+from services.resumo_diario_service import ResumoDiarioService
+
+SENHA_VENDEDORES = "sintetico123"
+
+# Linhas por executemany (o driver ainda agrupa em INSERTs de vários VALUES)
+LINHAS_POR_INSERT = 10_000
+
+# Caminho normal de uma proposta; canceladas saem dele em uma etapa qualquer
+FLUXO = (
+    PropostaStatus.pendente_simulacao,
+    PropostaStatus.pendente_cotacao,
+    PropostaStatus.pendente_envio,
+    PropostaStatus.concluida,
+)
+
+# Peso de cada status final pela idade da proposta: recentes ainda estão em andamento
+PESOS_STATUS = (
+    (3, {"pendente_simulacao": 30, "pendente_cotacao": 25, "pendente_envio": 20, "concluida": 20, "cancelada": 5}),
+    (15, {"pendente_simulacao": 8, "pendente_cotacao": 8, "pendente_envio": 10, "concluida": 60, "cancelada": 14}),
+    (None, {"pendente_simulacao": 1, "pendente_cotacao": 1, "pendente_envio": 1, "concluida": 80, "cancelada": 17}),
+)
+
+EMPRESAS = ("Comercial", "Distribuidora", "Ferragens", "Metalúrgica", "Construtora", "Materiais", "Indústria", "Usinagem")
+SOBRENOMES = ("Silva", "Souza", "Oliveira", "Pereira", "Costa", "Schmidt", "Ferreira", "Almeida", "Rocha", "Becker")
+SUFIXOS = ("Ltda", "ME", "EIRELI", "S/A")
+CIDADES = ("Joinville", "Blumenau", "Jaraguá do Sul", "Curitiba", "Itajaí", "Florianópolis", "São Paulo", "Caxias do Sul")
+FERRAMENTAS = (
+    "Parafuso sextavado", "Broca aço rápido", "Chave combinada", "Serra copo", "Disco de corte",
+    "Martelo de borracha", "Alicate universal", "Trena", "Esmerilhadeira", "Furadeira de impacto",
+    "Lixadeira orbital", "Morsa de bancada", "Torquímetro", "Jogo de soquetes", "Macho manual",
+)
+TRANSPORTADORAS = ("Rodonaves", "Jamef", "Braspress", "Alfa", "Patrus", "TNT", "Expresso São Miguel", "Reunidas")
+
+
+class GeradorDados:
+    """Gera e insere as linhas; o rng é consumido sempre na mesma ordem."""
+
+    def __init__(self, conn, seed: int, referencia: date, dias: int):
+        self.conn = conn
+        self.rng = random.Random(seed)
+        self.agora = datetime.combine(referencia, datetime.min.time()) + timedelta(hours=18)
+        self.dias = dias
+        self.proximo_id: dict[str, int] = {}
+        self.contagem: dict[str, int] = {}
+
+        self.vendedores: list[tuple[int, str, str]] = []
+        self.transportadoras: list[int] = []
+        self.clientes: list[int] = []
+        # id -> (preço base, cubagem m³ da unidade ou None, peso kg ou None)
+        self.produtos: dict[int, tuple[float, float | None, float | None]] = {}
+        self.ids_produtos: list[int] = []
+
+    # ----------------------------------------------------------------------
+    # Infra
+    # ----------------------------------------------------------------------
+
+    def _ids(self, modelo, quantidade: int) -> range:
+        tabela = modelo.__table__
+        if tabela.name not in self.proximo_id:
+            maior = self.conn.execute(select(func.max(tabela.c.id))).scalar() or 0
+            self.proximo_id[tabela.name] = maior + 1
+        inicio = self.proximo_id[tabela.name]
+        self.proximo_id[tabela.name] += quantidade
+        return range(inicio, inicio + quantidade)
+
+    def _inserir(self, modelo, linhas: list[dict]) -> None:
+        tabela = modelo.__table__
+        for inicio in range(0, len(linhas), LINHAS_POR_INSERT):
+            self.conn.execute(tabela.insert(), linhas[inicio:inicio + LINHAS_POR_INSERT])
+        self.contagem[tabela.name] = self.contagem.get(tabela.name, 0) + len(linhas)
+
+    def _instante(self, base: datetime, media_horas: float) -> datetime:
+        return min(self.agora, base + timedelta(hours=self.rng.expovariate(1 / media_horas)))
+
+    # ----------------------------------------------------------------------
+    # Cadastros
+    # ----------------------------------------------------------------------
+
+    def cadastros(self, vendedores: int, clientes: int, produtos: int, sem_medidas: float) -> None:
+        senha_hash = get_password_hash(SENHA_VENDEDORES)
+        linhas = []
+        for user_id in self._ids(User, vendedores):
+            nome = f"Vendedor {user_id}"
+            telefone = f"55479{self.rng.randint(10_000_000, 99_999_999)}"
+            self.vendedores.append((user_id, nome, telefone))
+            linhas.append({
+                "id": user_id, "nome": nome, "email": f"vendedor{user_id}@sintetico.local",
+                "senha_hash": senha_hash, "telefone": telefone, "role": UserRole.usuario,
+                "ativo": True, "criado_em": self.agora - timedelta(days=self.dias),
+            })
+        self._inserir(User, linhas)
+
+        linhas = []
+        for transportadora_id in self._ids(Transportadora, len(TRANSPORTADORAS)):
+            nome = f"{TRANSPORTADORAS[len(linhas)]} {transportadora_id}"
+            self.transportadoras.append(transportadora_id)
+            linhas.append({"id": transportadora_id, "nome": nome})
+        self._inserir(Transportadora, linhas)
+
+        self._inserir(Caixa, [
+            {"id": caixa_id, "nome": f"Caixa {medidas[0]}x{medidas[1]}x{medidas[2]}",
+             "altura_cm": medidas[0], "largura_cm": medidas[1], "comprimento_cm": medidas[2],
+             "criado_em": self.agora}
+            for caixa_id, medidas in zip(self._ids(Caixa, 4), ((20, 20, 30), (30, 30, 40), (40, 40, 60), (60, 50, 80)))
+        ])
+
+        linhas = []
+        for cliente_id in self._ids(Cliente, clientes):
+            self.clientes.append(cliente_id)
+            linhas.append({
+                "id": cliente_id,
+                "nome": (
+                    f"{self.rng.choice(EMPRESAS)} {self.rng.choice(SOBRENOMES)} "
+                    f"{self.rng.choice(SUFIXOS)} {cliente_id}"
+                ),
+                "documento": f"{self.rng.randrange(10**13, 10**14)}",
+                "cidade": self.rng.choice(CIDADES),
+                "telefone": f"55{self.rng.randint(11, 99)}9{self.rng.randint(10_000_000, 99_999_999)}",
+                "criado_em": self.agora - timedelta(days=self.rng.uniform(0, self.dias)),
+            })
+        self._inserir(Cliente, linhas)
+
+        linhas = []
+        for produto_id in self._ids(Produto, produtos):
+            preco = round(self.rng.lognormvariate(3.5, 1.0), 2)
+            linha = {
+                "id": produto_id,
+                "sku": f"SIN{produto_id:07d}",
+                "nome": f"{self.rng.choice(FERRAMENTAS)} {self.rng.randint(1, 99)}mm",
+                "comprimento_cm": None, "largura_cm": None, "altura_cm": None, "peso_unitario_kg": None,
+                "data_atualizacao": self.agora,
+            }
+            if self.rng.random() >= sem_medidas:
+                linha["comprimento_cm"] = round(self.rng.uniform(5, 120), 1)
+                linha["largura_cm"] = round(self.rng.uniform(5, 80), 1)
+                linha["altura_cm"] = round(self.rng.uniform(2, 60), 1)
+                linha["peso_unitario_kg"] = round(self.rng.uniform(0.1, 35), 2)
+                cubagem = linha["comprimento_cm"] * linha["largura_cm"] * linha["altura_cm"] / 1_000_000
+                self.produtos[produto_id] = (preco, cubagem, linha["peso_unitario_kg"])
+            else:
+                self.produtos[produto_id] = (preco, None, None)
+            linhas.append(linha)
+        self._inserir(Produto, linhas)
+        self.ids_produtos = list(self.produtos)
+
+    # ----------------------------------------------------------------------
+    # Propostas
+    # ----------------------------------------------------------------------
+
+    def _status_final(self, idade_dias: float) -> PropostaStatus:
+        for limite, pesos in PESOS_STATUS:
+            if limite is None or idade_dias < limite:
+                status, = self.rng.choices(list(pesos), weights=list(pesos.values()))
+                return PropostaStatus(status)
+
+    def _etapas(self, final: PropostaStatus, com_referencia: bool) -> list[PropostaStatus]:
+        inicio = 1 if com_referencia else 0
+        if final == PropostaStatus.cancelada:
+            parada = self.rng.randint(inicio, len(FLUXO) - 2)
+            return list(FLUXO[inicio:parada + 1]) + [PropostaStatus.cancelada]
+        fim = max(FLUXO.index(final), inicio)
+        return list(FLUXO[inicio:fim + 1])
+
+    def propostas(self, quantidade: int, itens_media: float) -> None:
+        ids = self._ids(Proposta, quantidade)
+        propostas, itens, historico, simulacoes, cotacoes, envios = [], [], [], [], [], []
+
+        for proposta_id in ids:
+            idade = self.rng.uniform(0, self.dias)
+            criado_em = self.agora - timedelta(days=idade)
+            final = self._status_final(idade)
+            # Importação que achou proposta de referência: simulação copiada, já entra em cotação
+            com_referencia = final != PropostaStatus.pendente_simulacao and self.rng.random() < 0.4
+            etapas = self._etapas(final, com_referencia)
+            vendedor_id, vendedor_nome, vendedor_telefone = self.rng.choice(self.vendedores)
+
+            # Itens: poucos na maioria, cauda longa de pedidos grandes
+            total = cubagem = peso = 0.0
+            quantidade_itens = min(80, 1 + int(self.rng.expovariate(1 / max(itens_media - 1, 0.1))))
+            for produto_id in self.rng.sample(self.ids_produtos, min(quantidade_itens, len(self.ids_produtos))):
+                preco_base, cubagem_unidade, peso_unidade = self.produtos[produto_id]
+                quantidade_item = self.rng.choice((1, 1, 1, 2, 2, 3, 4, 5, 6, 10, 12, 20, 50))
+                preco = round(preco_base * self.rng.uniform(0.95, 1.05), 2)
+                total += preco * quantidade_item
+                cubagem += (cubagem_unidade or 0) * quantidade_item
+                peso += (peso_unidade or 0) * quantidade_item
+                itens.append({
+                    "proposta_id": proposta_id, "produto_id": produto_id, "quantidade": quantidade_item,
+                    "codigo": f"SIN{produto_id:07d}", "ncm": None, "preco_unitario": preco,
+                    "preco_total": round(preco * quantidade_item, 2), "imagem_url": None,
+                })
+            desconto = round(total * self.rng.choice((0.03, 0.05, 0.1)), 2) if self.rng.random() < 0.2 else None
+
+            # Linha do tempo: uma linha de histórico por etapa
+            instantes = [criado_em]
+            for _ in etapas[1:]:
+                instantes.append(self._instante(instantes[-1], media_horas=14))
+            for passo, (etapa, instante) in enumerate(zip(etapas, instantes)):
+                historico.append({
+                    "proposta_id": proposta_id, "status": etapa,
+                    "observacao": "Dados sintéticos" if passo else "Importado via Bling",
+                    "criado_em": instante,
+                })
+
+            simulada = PropostaStatus.pendente_cotacao in etapas
+            if simulada:
+                quando = instantes[etapas.index(PropostaStatus.pendente_cotacao)]
+                volumes = cubagem > 0 and self.rng.random() < 0.6
+                simulacoes.append({
+                    "proposta_id": proposta_id,
+                    "tipo": TipoSimulacao.volumes if volumes else TipoSimulacao.manual,
+                    "descricao": f"{self.rng.randint(1, 8)} volume(s)",
+                    "automatica": com_referencia,
+                    "criado_em": quando,
+                })
+                if not cubagem:
+                    cubagem = self.rng.uniform(0.02, 2.5)
+                    peso = self.rng.uniform(1, 300)
+
+            if PropostaStatus.pendente_envio in etapas:
+                quando = instantes[etapas.index(PropostaStatus.pendente_envio)]
+                escolhidas = self.rng.sample(self.transportadoras, self.rng.randint(1, min(4, len(self.transportadoras))))
+                for posicao, transportadora_id in enumerate(escolhidas):
+                    cotacoes.append({
+                        "proposta_id": proposta_id, "transportadora_id": transportadora_id,
+                        "numero_cotacao": f"{self.rng.randint(100000, 999999)}",
+                        "preco": round(40 + cubagem * self.rng.uniform(150, 400), 2),
+                        "prazo_dias": self.rng.randint(1, 12),
+                        "selecionada": final == PropostaStatus.concluida and posicao == 0,
+                        "criado_em": quando,
+                    })
+
+            if final == PropostaStatus.concluida:
+                envios.append({
+                    "proposta_id": proposta_id, "resumo_envio": "Proposta enviada ao cliente",
+                    "meio_envio": self.rng.choice(("whatsapp", "email")), "enviado": True,
+                    "enviado_em": instantes[-1],
+                })
+
+            bling = self.rng.random() < 0.9
+            propostas.append({
+                "id": proposta_id,
+                "origem": PropostaOrigem.bling if bling else PropostaOrigem.manual,
+                "id_bling": f"sin{proposta_id}" if bling else None,
+                "status": final,
+                "criado_em": criado_em,
+                "atualizado_em": instantes[-1],
+                "cliente_id": self.rng.choice(self.clientes),
+                "vendedor_id": vendedor_id,
+                "responsavel_vendedor": vendedor_nome,
+                "responsavel_telefone": vendedor_telefone,
+                "peso_total_kg": round(peso, 2) if simulada else None,
+                "comprimento_total_cm": None, "largura_total_cm": None, "altura_total_cm": None,
+                "cubagem_m3": round(cubagem, 4) if simulada else None,
+                "cubagem_manual_m3": None,
+                "cubagem_ajustada": False,
+                "desconto": desconto,
+                "valor_total": round(total - (desconto or 0), 2),
+                "observacao_importacao": (
+                    f"bling_numero:{10000 + proposta_id}; Importado via Bling" if bling else None
+                ),
+            })
+
+        self._inserir(Proposta, propostas)
+        for modelo, linhas in (
+            (PropostaProduto, itens),
+            (PropostaHistorico, historico),
+            (Simulacao, simulacoes),
+            (CotacaoFrete, cotacoes),
+            (EnvioProposta, envios),
+        ):
+            for linha, linha_id in zip(linhas, self._ids(modelo, len(linhas))):
+                linha["id"] = linha_id
+            self._inserir(modelo, linhas)
+
+    def ajustar_sequences(self) -> None:
+        """PostgreSQL: os ids vieram daqui, então as sequences precisam avançar junto."""
+        if self.conn.dialect.name != "postgresql":
+            return
+        for tabela in self.proximo_id:
+            self.conn.exec_driver_sql(
+                f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), (SELECT MAX(id) FROM {tabela}))"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--propostas", type=int, default=2000, help="propostas geradas")
+    parser.add_argument("--clientes", type=int, default=500, help="clientes gerados")
+    parser.add_argument("--produtos", type=int, default=3000, help="produtos gerados")
+    parser.add_argument("--vendedores", type=int, default=8, help="usuários vendedores gerados")
+    parser.add_argument("--sem-medidas", type=float, default=0.25, help="fração de produtos sem medidas")
+    parser.add_argument("--itens-media", type=float, default=6, help="média de itens por proposta")
+    parser.add_argument("--dias", type=int, default=365, help="período coberto pelas propostas")
+    parser.add_argument("--referencia", type=date.fromisoformat, default=date.today(),
+                        help="último dia do período (AAAA-MM-DD); fixe para repetir a mesma base")
+    parser.add_argument("--seed", type=int, default=42, help="semente do gerador")
+    parser.add_argument("--lote", type=int, default=5000, help="propostas por transação")
+    args = parser.parse_args()
+
+    aplicar_migracoes()
+    inicio = time.perf_counter()
+
+    with engine.connect() as conn:
+        gerador = GeradorDados(conn, args.seed, args.referencia, args.dias)
+        gerador.cadastros(args.vendedores, args.clientes, args.produtos, args.sem_medidas)
+        conn.commit()
+
+        for feitas in range(0, args.propostas, args.lote):
+            gerador.propostas(min(args.lote, args.propostas - feitas), args.itens_media)
+            conn.commit()
+            geradas = min(feitas + args.lote, args.propostas)
+            decorrido = time.perf_counter() - inicio
+            print(f"  {geradas}/{args.propostas} propostas ({sum(gerador.contagem.values()) / decorrido:,.0f} linhas/s)")
+
+        print("Reconstruindo o resumo diário ...")
+        with Session(bind=conn) as db:
+            linhas_resumo = ResumoDiarioService.reconstruir(
+                db, args.referencia - timedelta(days=args.dias + 1), args.referencia
+            )
+            db.commit()
+        gerador.ajustar_sequences()
+        conn.commit()
+
+    print(f"\nConcluído em {time.perf_counter() - inicio:.1f}s (seed {args.seed}, referência {args.referencia}):")
+    for tabela, quantidade in gerador.contagem.items():
+        print(f"  {tabela:<22} {quantidade:>10,}")
+    print(f"  {'propostas_resumo_diario':<22} {linhas_resumo:>10,}")
+    print(f"Login dos vendedores: vendedorN@sintetico.local / {SENHA_VENDEDORES}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Perfil do cold start: tempo de import por módulo e tempo até a primeira resposta.
+
+Uso:
+    python scripts/perfil_inicializacao.py                       # imports + primeira resposta
+    python scripts/perfil_inicializacao.py --top 25              # mais linhas na tabela de imports
+    python scripts/perfil_inicializacao.py --repeticoes 5 --caminho /login
+
+A primeira resposta é medida de fora: sobe `uvicorn main:app` em um processo
+novo (como no Render após o app dormir) e cronometra do spawn até a primeira
+resposta HTTP. As etapas do lifespan vêm do log "Startup em ..." do próprio app.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Pacotes do próprio projeto (o resto é dependência externa)
+MODULOS_PROJETO = {
+    "main", "auth", "auto_migrate", "config", "database", "dependencies",
+    "integrations", "models", "routers", "services", "templates", "utils",
+}
+
+_LINHA_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def _tempos_import() -> list[tuple[str, int, int]]:
+    """(módulo, próprio µs, acumulado µs) de `import main` em um interpretador limpo."""
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if processo.returncode != 0:
+        raise SystemExit(f"Falha ao importar main:\n{processo.stderr[-2000:]}")
+
+    tempos = []
+    for linha in processo.stderr.splitlines():
+        encontrado = _LINHA_IMPORTTIME.match(linha)
+        if encontrado:
+            proprio, acumulado, _, modulo = encontrado.groups()
+            tempos.append((modulo, int(proprio), int(acumulado)))
+    return tempos
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _primeira_resposta(caminho: str, limite_s: float = 60) -> tuple[float, str]:
+    """Segundos do spawn do uvicorn até a primeira resposta HTTP e a linha de startup do log."""
+    porta = _porta_livre()
+    inicio = time.perf_counter()
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(porta)],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        while True:
+            if time.perf_counter() - inicio > limite_s:
+                raise SystemExit(f"Sem resposta em {limite_s:.0f}s")
+            if servidor.poll() is not None:
+                raise SystemExit(f"O servidor terminou:\n{servidor.stderr.read()[-2000:]}")
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{porta}{caminho}", timeout=5)
+                break
+            except urllib.error.HTTPError:
+                break  # qualquer resposta HTTP conta
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        decorrido = time.perf_counter() - inicio
+    finally:
+        servidor.terminate()
+        _, log = servidor.communicate(timeout=10)
+
+    startup = next((linha for linha in log.splitlines() if "Startup em" in linha), "")
+    return decorrido, startup.split(" - ")[-1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15, help="linhas por tabela de imports")
+    parser.add_argument("--repeticoes", type=int, default=3, help="medições da primeira resposta")
+    parser.add_argument("--caminho", default="/login", help="rota da primeira requisição")
+    args = parser.parse_args()
+
+    tempos = _tempos_import()
+    total = next(acumulado for modulo, _, acumulado in tempos if modulo == "main")
+    print(f"import main: {total / 1000:.0f} ms")
+
+    projeto = [t for t in tempos if t[0].split(".")[0] in MODULOS_PROJETO]
+    print("\nMódulos do projeto (acumulado inclui as dependências que cada um carregou primeiro):")
+    for modulo, proprio, acumulado in sorted(projeto, key=lambda t: -t[2])[: args.top]:
+        print(f"  {acumulado / 1000:8.1f} ms  {proprio / 1000:7.1f} ms próprio  {modulo}")
+
+    externos = [t for t in tempos if "." not in t[0] and t[0] not in MODULOS_PROJETO]
+    print("\nPacotes externos (acumulado):")
+    for modulo, _, acumulado in sorted(externos, key=lambda t: -t[2])[: args.top]:
+        print(f"  {acumulado / 1000:8.1f} ms  {modulo}")
+
+    medicoes = []
+    print(f"\nPrimeira resposta ({args.caminho}), processo novo:")
+    for i in range(args.repeticoes):
+        segundos, startup = _primeira_resposta(args.caminho)
+        medicoes.append(segundos)
+        print(f"  #{i + 1}: {segundos * 1000:.0f} ms  [{startup}]")
+    print(f"  mediana: {statistics.median(medicoes) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
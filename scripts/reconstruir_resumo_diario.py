@@ -0,0 +1,60 @@
+"""Reconstrói a tabela propostas_resumo_diario a partir de propostas.
+
+Uso:
+    python scripts/reconstruir_resumo_diario.py                 # todo o histórico
+    python scripts/reconstruir_resumo_diario.py --inicio 2026-01-01 --fim 2026-01-31
+
+Seguro para rodar a qualquer momento: cada mês é recalculado e gravado em
+sua própria transação.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from sqlalchemy import func
+
+from database import SessionLocal
+from models import Proposta
+from services.resumo_diario_service import ResumoDiarioService
+
+
+def _proximo_mes(dia: date) -> date:
+    return (dia.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inicio", type=date.fromisoformat, help="primeiro dia (AAAA-MM-DD)")
+    parser.add_argument("--fim", type=date.fromisoformat, help="último dia (AAAA-MM-DD)")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        primeira, ultima = db.query(func.min(Proposta.criado_em), func.max(Proposta.criado_em)).one()
+        inicio = args.inicio or (primeira.date() if primeira else date.today())
+        fim = args.fim or (ultima.date() if ultima else date.today())
+        if fim < inicio:
+            raise SystemExit("--fim deve ser maior ou igual a --inicio")
+
+        total = 0
+        bloco_inicio = inicio
+        while bloco_inicio <= fim:
+            bloco_fim = min(_proximo_mes(bloco_inicio) - timedelta(days=1), fim)
+            linhas = ResumoDiarioService.reconstruir(db, bloco_inicio, bloco_fim)
+            db.commit()
+            total += linhas
+            print(f"{bloco_inicio} → {bloco_fim}: {linhas} linha(s)")
+            bloco_inicio = bloco_fim + timedelta(days=1)
+
+        print(f"Resumo diário reconstruído: {total} linha(s) entre {inicio} e {fim}")
+
+
+if __name__ == "__main__":
+    main()
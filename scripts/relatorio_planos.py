@@ -0,0 +1,145 @@
+"""Mostra o plano de execução das consultas quentes antes e depois dos índices.
+
+Uso:
+    python scripts/relatorio_planos.py                # antes x depois
+    python scripts/relatorio_planos.py --apenas-atual # só o plano com os índices atuais
+    python scripts/relatorio_planos.py --sql          # inclui o SQL de cada consulta
+
+O "antes" remove os índices das migrations dentro de uma transação, lê os
+planos e desfaz tudo (ROLLBACK): nada é alterado no banco. No PostgreSQL o
+DROP INDEX segura um lock exclusivo nas tabelas até o ROLLBACK (alguns
+segundos); prefira rodar fora do horário de pico ou em uma cópia do banco.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from datetime import datetime, time, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from sqlalchemy import func, select
+
+from auto_migrate import INDICES, UNICIDADE_COTACOES
+from database import engine
+from models import (
+    CotacaoFrete,
+    Proposta,
+    PropostaHistorico,
+    PropostaProduto,
+    PropostaStatus,
+    Transportadora,
+)
+
+
+def _consultas(conn) -> list[tuple[str, object]]:
+    """(título, statement) de cada caminho quente, com ids reais do banco quando existirem."""
+    proposta_id = conn.execute(select(func.max(Proposta.id))).scalar() or 1
+    transportadora_id = conn.execute(select(func.min(Transportadora.id))).scalar() or 1
+    agora = datetime.utcnow()
+    hoje = datetime.combine(agora.date(), time.min)
+
+    return [
+        (
+            "Kanban: cards de uma coluna (status, atualizado_em)",
+            select(Proposta.id)
+            .where(Proposta.status == PropostaStatus.pendente_cotacao)
+            .order_by(Proposta.atualizado_em.desc(), Proposta.id.desc())
+            .limit(30),
+        ),
+        (
+            "Alerta: propostas paradas em um status",
+            select(Proposta.id).where(
+                Proposta.status == PropostaStatus.pendente_envio,
+                Proposta.atualizado_em < agora - timedelta(hours=8),
+            ),
+        ),
+        (
+            "Dashboard: propostas criadas hoje",
+            select(func.count(Proposta.id), func.sum(Proposta.valor_total)).where(
+                Proposta.criado_em >= hoje,
+                Proposta.criado_em < hoje + timedelta(days=1),
+            ),
+        ),
+        (
+            "Dashboard: atividades recentes (ordem por criado_em)",
+            select(Proposta.id).order_by(Proposta.criado_em.desc()).limit(5),
+        ),
+        (
+            "Detalhe: itens da proposta",
+            select(PropostaProduto.id).where(PropostaProduto.proposta_id == proposta_id),
+        ),
+        (
+            "salvar_cotacao: cotação da transportadora na proposta",
+            select(CotacaoFrete.id).where(
+                CotacaoFrete.proposta_id == proposta_id,
+                CotacaoFrete.transportadora_id == transportadora_id,
+            ),
+        ),
+        (
+            "Histórico da proposta em ordem",
+            select(PropostaHistorico.status, PropostaHistorico.criado_em)
+            .where(PropostaHistorico.proposta_id == proposta_id)
+            .order_by(PropostaHistorico.criado_em),
+        ),
+    ]
+
+
+def _plano(conn, sql: str) -> list[str]:
+    if conn.dialect.name == "postgresql":
+        return [linha[0] for linha in conn.exec_driver_sql(f"EXPLAIN {sql}")]
+    return [linha[-1] for linha in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def _planos_sem_indices(conn, consultas: list[tuple[str, str]]) -> dict[str, list[str]]:
+    """Planos com os índices das migrations removidos; a transação é sempre desfeita."""
+    transacao = conn.begin()
+    try:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("SET LOCAL lock_timeout = '5s'")
+        else:
+            # O driver sqlite3 não abre transação para DDL: sem o BEGIN o DROP seria definitivo
+            conn.exec_driver_sql("BEGIN")
+        for nome in [nome for nome, _ in INDICES] + [UNICIDADE_COTACOES]:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {nome}")
+        return {titulo: _plano(conn, sql) for titulo, sql in consultas}
+    finally:
+        transacao.rollback()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apenas-atual", action="store_true", help="não calcula o plano sem índices")
+    parser.add_argument("--sql", action="store_true", help="mostra o SQL de cada consulta")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        consultas = [
+            (titulo, str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})))
+            for titulo, stmt in _consultas(conn)
+        ]
+        conn.rollback()
+
+        antes = {} if args.apenas_atual else _planos_sem_indices(conn, consultas)
+        depois = {titulo: _plano(conn, sql) for titulo, sql in consultas}
+        conn.rollback()
+
+    for titulo, sql in consultas:
+        print(f"\n=== {titulo}")
+        if args.sql:
+            print("  " + " ".join(sql.split()))
+        if titulo in antes:
+            print("  Antes:")
+            for linha in antes[titulo]:
+                print(f"    {linha}")
+        print("  Depois:" if antes else "  Plano:")
+        for linha in depois[titulo]:
+            print(f"    {linha}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Verifica propostas paradas e envia os alertas de WhatsApp (para uso em cron).
+
+Uso:
+    python scripts/verificar_envelhecimento.py            # verifica e alerta
+    python scripts/verificar_envelhecimento.py --dry-run  # só lista, não envia
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from database import SessionLocal
+from services.envelhecimento_service import EnvelhecimentoService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="não envia alertas")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.dry_run:
+            for proposta in EnvelhecimentoService.buscar_paradas(db):
+                print(
+                    f"{proposta.status.value:<20} #{proposta.display_numero:<10} "
+                    f"{proposta.horas_paradas:7.1f}h  {proposta.cliente_nome}"
+                )
+            return
+
+        resumo = EnvelhecimentoService.verificar_e_alertar(db)
+
+    if not resumo:
+        print("Nenhuma proposta parada (ou verificação em andamento em outro processo)")
+    for grupo, dados in resumo.items():
+        print(f"{grupo}: {dados}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@ from models import (
 from services.proposta_service import PropostaService
 
 from utils.medidas import format_dimensoes_m
+from utils.metricas import IMPORTACAO_ETAPA
+from utils.rastreamento import span
 
 
 DEBUG_ENV_VAR = "DEBUG_BLING_IMPORT"
@@ -66,6 +68,95 @@ class BlingImportService:
             produtos[sku] = produtos.get(sku, 0) + int(item.quantidade or 0)
         return produtos
 
+    @staticmethod
+    def _carregar_produtos(db: Session, itens: list[dict] | None) -> dict[str, Produto]:
+        """Produtos já cadastrados dos SKUs do documento, em uma única consulta."""
+        skus = {
+            sku
+            for item in itens or []
+            if (sku := (item.get("sku") or item.get("codigo") or "").strip())
+        }
+        if not skus:
+            return {}
+        return {produto.sku: produto for produto in db.query(Produto).filter(Produto.sku.in_(skus))}
+
+    @staticmethod
+    @span("importacao.cliente")
+    def _resolver_cliente(db: Session, cliente: dict, *, overwrite: bool = False) -> Cliente:
+        """Cliente do documento: busca por documento, depois por nome; cria se não existir."""
+        cliente_nome = (cliente.get("nome") or "").strip() or "Cliente Bling"
+        cliente_doc = (cliente.get("documento") or "").strip() or None
+
+        cliente_db = None
+        if cliente_doc:
+            cliente_db = (
+                db.query(Cliente)
+                .filter(Cliente.documento == cliente_doc)
+                .first()
+            )
+
+        if not cliente_db:
+            cliente_db = (
+                db.query(Cliente)
+                .filter(Cliente.nome == cliente_nome)
+                .first()
+            )
+
+        if not cliente_db:
+            cliente_db = Cliente(
+                nome=cliente_nome,
+                documento=cliente.get("documento"),
+                endereco=cliente.get("endereco"),
+                cidade=cliente.get("cidade"),
+                telefone=cliente.get("telefone"),
+                email=cliente.get("email"),
+            )
+            db.add(cliente_db)
+            db.flush()  # garante cliente_db.id
+        else:
+            BlingImportService._merge_cliente_fields(cliente_db, cliente, overwrite=overwrite)
+
+        return cliente_db
+
+    @staticmethod
+    @span("importacao.produtos")
+    def _criar_itens(db: Session, proposta_id: int, itens: list[dict] | None) -> None:
+        """Itens da proposta a partir do documento; SKUs novos viram produtos (um flush no fim)."""
+        produtos = BlingImportService._carregar_produtos(db, itens)
+        for item in itens or []:
+            nome = (item.get("nome") or "").strip()
+            if not nome:
+                continue
+
+            sku = (item.get("sku") or item.get("codigo") or "").strip() or None
+            quantidade = int(item.get("quantidade") or 1)
+            if quantidade <= 0:
+                quantidade = 1
+
+            produto = produtos.get(sku) if sku else None
+            if not produto:
+                # Inserido no flush junto com os itens (SKU repetido no documento reaproveita)
+                produto = Produto(
+                    sku=sku,
+                    nome=nome,
+                )
+                if sku:
+                    produtos[sku] = produto
+
+            proposta_item = PropostaProduto(
+                proposta_id=proposta_id,
+                produto=produto,
+                quantidade=quantidade,
+                codigo=item.get("codigo"),
+                ncm=item.get("ncm"),
+                preco_unitario=item.get("preco_unitario"),
+                preco_total=item.get("preco_total"),
+                imagem_url=item.get("imagem_url"),
+            )
+            db.add(proposta_item)
+
+        db.flush()
+
     @staticmethod
     def _score_referencia(candidata: Proposta) -> tuple:
         tem_peso = 1 if candidata.peso_total_kg else 0
@@ -81,6 +172,7 @@ class BlingImportService:
         )
 
     @staticmethod
+    @span("importacao.referencia")
     def _buscar_proposta_referencia(
         db: Session,
         *,
@@ -167,6 +259,7 @@ class BlingImportService:
                 setattr(cliente_db, field, new_value)
 
     @staticmethod
+    @span("importacao.copiar_simulacao")
     def _aplicar_simulacao_de_referencia(
         db: Session,
         *,
@@ -332,6 +425,8 @@ class BlingImportService:
             return
 
     @staticmethod
+    @IMPORTACAO_ETAPA.medir(etapa="gravacao")
+    @span("importacao.gravacao")
     def importar_proposta_bling(
         db: Session,
         id_bling: str,
@@ -403,39 +498,9 @@ class BlingImportService:
                 # Reimportação: sincroniza (se mudou no Bling, atualiza)
                 BlingImportService._merge_cliente_fields(proposta_existente.cliente, cliente, overwrite=True)
 
-            cliente_doc = (cliente.get("documento") or "").strip() or None
-
             if proposta_existente.cliente.nome != cliente_nome:
-                # Busca por documento (quando existe) antes de cair em nome
-                cliente_db = None
-                if cliente_doc:
-                    cliente_db = (
-                        db.query(Cliente)
-                        .filter(Cliente.documento == cliente_doc)
-                        .first()
-                    )
-
-                if not cliente_db:
-                    cliente_db = (
-                        db.query(Cliente)
-                        .filter(Cliente.nome == cliente_nome)
-                        .first()
-                    )
-
-                if not cliente_db:
-                    cliente_db = Cliente(
-                        nome=cliente_nome,
-                        documento=cliente.get("documento"),
-                        endereco=cliente.get("endereco"),
-                        cidade=cliente.get("cidade"),
-                        telefone=cliente.get("telefone"),
-                        email=cliente.get("email"),
-                    )
-                    db.add(cliente_db)
-                    db.flush()
-                else:
-                    BlingImportService._merge_cliente_fields(cliente_db, cliente, overwrite=True)
-
+                # Outro cliente no Bling: busca por documento, depois por nome (ou cria)
+                cliente_db = BlingImportService._resolver_cliente(db, cliente, overwrite=True)
                 proposta_existente.cliente_id = cliente_db.id
             
             # ==================================================
@@ -466,45 +531,7 @@ class BlingImportService:
             db.flush()
             
             # Recria itens com dados atualizados do Bling
-            for item in itens or []:
-                nome = (item.get("nome") or "").strip()
-                if not nome:
-                    continue
-
-                sku = (item.get("sku") or item.get("codigo") or "").strip() or None
-                quantidade = int(item.get("quantidade") or 1)
-                if quantidade <= 0:
-                    quantidade = 1
-
-                produto = None
-                if sku:
-                    produto = (
-                        db.query(Produto)
-                        .filter(Produto.sku == sku)
-                        .first()
-                    )
-
-                if not produto:
-                    produto = Produto(
-                        sku=sku,
-                        nome=nome,
-                    )
-                    db.add(produto)
-                    db.flush()
-
-                proposta_item = PropostaProduto(
-                    proposta_id=proposta_existente.id,
-                    produto_id=produto.id,
-                    quantidade=quantidade,
-                    codigo=item.get("codigo"),
-                    ncm=item.get("ncm"),
-                    preco_unitario=item.get("preco_unitario"),
-                    preco_total=item.get("preco_total"),
-                    imagem_url=item.get("imagem_url"),
-                )
-                db.add(proposta_item)
-            
-            db.flush()
+            BlingImportService._criar_itens(db, proposta_existente.id, itens)
             
             # Recarrega a proposta com itens e produtos para verificação de medidas
             proposta_existente = (
@@ -514,6 +541,8 @@ class BlingImportService:
                 .populate_existing()
                 .first()
             )
+            # Depois do recarregamento: o populate_existing descartaria o total ainda não gravado
+            PropostaService.recalcular_valor_total(db, proposta_existente)
 
             produtos_importados = BlingImportService._mapear_itens_por_sku(proposta_existente.itens)
             proposta_referencia = BlingImportService._buscar_proposta_referencia(
@@ -538,8 +567,9 @@ class BlingImportService:
                     )
 
                     BlingImportService._sincronizar_calculos_se_automatico_volumes(proposta_existente)
-                    db.commit()
-                    db.refresh(proposta_existente)
+                    with span("importacao.commit"):
+                        db.commit()
+                        db.refresh(proposta_existente)
                     return proposta_existente
 
                 BlingImportService._limpar_calculos(proposta_existente)
@@ -553,8 +583,9 @@ class BlingImportService:
                     ),
                     forcar_notificacao=True,
                 )
-                db.commit()
-                db.refresh(proposta_existente)
+                with span("importacao.commit"):
+                    db.commit()
+                    db.refresh(proposta_existente)
                 return proposta_existente
             
             itens_iguais = produtos_anteriores == produtos_importados
@@ -595,45 +626,15 @@ class BlingImportService:
                 )
             
             BlingImportService._sincronizar_calculos_se_automatico_volumes(proposta_existente)
-            db.commit()
-            db.refresh(proposta_existente)
+            with span("importacao.commit"):
+                db.commit()
+                db.refresh(proposta_existente)
             return proposta_existente
 
         # ==================================================
         # 1. CLIENTE (CRIA OU REAPROVEITA)
         # ==================================================
-        cliente_nome = (cliente.get("nome") or "").strip() or "Cliente Bling"
-
-        cliente_doc = (cliente.get("documento") or "").strip() or None
-
-        cliente_db = None
-        if cliente_doc:
-            cliente_db = (
-                db.query(Cliente)
-                .filter(Cliente.documento == cliente_doc)
-                .first()
-            )
-
-        if not cliente_db:
-            cliente_db = (
-                db.query(Cliente)
-                .filter(Cliente.nome == cliente_nome)
-                .first()
-            )
-
-        if not cliente_db:
-            cliente_db = Cliente(
-                nome=cliente_nome,
-                documento=cliente.get("documento"),
-                endereco=cliente.get("endereco"),
-                cidade=cliente.get("cidade"),
-                telefone=cliente.get("telefone"),
-                email=cliente.get("email"),
-            )
-            db.add(cliente_db)
-            db.flush()  # garante cliente_db.id
-        else:
-            BlingImportService._merge_cliente_fields(cliente_db, cliente)
+        cliente_db = BlingImportService._resolver_cliente(db, cliente)
 
         # ==================================================
         # 2. CRIA PROPOSTA
@@ -663,46 +664,8 @@ class BlingImportService:
         # ==================================================
         # 3. ITENS / PRODUTOS
         # ==================================================
-        for item in itens or []:
-            nome = (item.get("nome") or "").strip()
-            if not nome:
-                continue
-
-            sku = (item.get("sku") or item.get("codigo") or "").strip() or None
-            quantidade = int(item.get("quantidade") or 1)
-            if quantidade <= 0:
-                quantidade = 1
-
-            produto = None
-            if sku:
-                produto = (
-                    db.query(Produto)
-                    .filter(Produto.sku == sku)
-                    .first()
-                )
-
-            if not produto:
-                produto = Produto(
-                    sku=sku,
-                    nome=nome,
-                )
-                db.add(produto)
-                db.flush()
-
-            proposta_item = PropostaProduto(
-                proposta_id=proposta.id,
-                produto_id=produto.id,
-                quantidade=quantidade,
-                codigo=item.get("codigo"),
-                ncm=item.get("ncm"),
-                preco_unitario=item.get("preco_unitario"),
-                preco_total=item.get("preco_total"),
-                imagem_url=item.get("imagem_url"),
-            )
-
-            db.add(proposta_item)
-
-        db.flush()  # Garante que os itens foram criados
+        BlingImportService._criar_itens(db, proposta.id, itens)
+        PropostaService.recalcular_valor_total(db, proposta)
         
         # ==================================================
         # 4. BUSCA PROPOSTA ANTERIOR COM MESMOS PRODUTOS E QUANTIDADES
@@ -753,8 +716,9 @@ class BlingImportService:
                     observacao=obs_sim,
                     forcar_notificacao=True,
                 )
-                db.commit()
-                db.refresh(proposta)
+                with span("importacao.commit"):
+                    db.commit()
+                    db.refresh(proposta)
                 return proposta
             
             # Avança direto para cotação
@@ -776,7 +740,8 @@ class BlingImportService:
                 forcar_notificacao=True,
             )
 
-        db.commit()
-        db.refresh(proposta)
+        with span("importacao.commit"):
+            db.commit()
+            db.refresh(proposta)
 
         return proposta
@@ -1,10 +1,20 @@
-import requests
-from bs4 import BeautifulSoup
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime
 import re
+import time
 import unicodedata
 
+from utils.metricas import BLING_DOWNLOAD, IMPORTACAO_ETAPA
+from utils.rastreamento import span
+
+# requests e bs4 só são importados na primeira importação de proposta (cold start mais rápido)
+if TYPE_CHECKING:
+    import requests
+    from bs4 import BeautifulSoup
+
 
 class BlingParserService:
     """
@@ -17,7 +27,11 @@ class BlingParserService:
     # ENTRYPOINT
     # ======================================================
     @staticmethod
+    @span("bling.doc_view")
     def parse_doc_view(link: str) -> dict:
+        import requests
+        from bs4 import BeautifulSoup
+
         id_bling = BlingParserService._extrair_id_bling(link)
 
         def _norm(text: str) -> str:
@@ -35,9 +49,17 @@ class BlingParserService:
             )
 
         def _fetch(headers: dict[str, str]) -> requests.Response:
-            resp = requests.get(link, timeout=25, headers=headers)
-            resp.raise_for_status()
-            return resp
+            inicio = time.perf_counter()
+            resultado = "erro"
+            try:
+                with span("bling.download") as atual:
+                    resp = requests.get(link, timeout=25, headers=headers)
+                    resultado = atual.atributos["status"] = str(resp.status_code)
+                    atual.atributos["bytes"] = len(resp.content)
+                    resp.raise_for_status()
+                    return resp
+            finally:
+                BLING_DOWNLOAD.observar(time.perf_counter() - inicio, resultado=resultado)
 
         headers_basicos = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
@@ -53,28 +75,33 @@ class BlingParserService:
             "Upgrade-Insecure-Requests": "1",
         }
 
-        response = _fetch(headers_basicos)
+        with IMPORTACAO_ETAPA.medir(etapa="download"):
+            response = _fetch(headers_basicos)
 
-        # Algumas URLs de doc.view.php podem exigir sessão (link não público) ou estarem expiradas.
-        # Nesses casos o Bling retorna um HTML curtíssimo com mensagem de link inválido.
-        texto_bruto = (response.text or "").strip()
-        if _is_invalid_doc_view_html(texto_bruto):
-            # Retry: o Bling às vezes é sensível a headers; tentamos uma segunda vez.
-            response = _fetch(headers_retry)
+            # Algumas URLs de doc.view.php podem exigir sessão (link não público) ou estarem expiradas.
+            # Nesses casos o Bling retorna um HTML curtíssimo com mensagem de link inválido.
             texto_bruto = (response.text or "").strip()
             if _is_invalid_doc_view_html(texto_bruto):
-                raise ValueError("Link do Bling inválido/expirado ou não público")
+                # Retry: o Bling às vezes é sensível a headers; tentamos uma segunda vez.
+                response = _fetch(headers_retry)
+                texto_bruto = (response.text or "").strip()
+                if _is_invalid_doc_view_html(texto_bruto):
+                    raise ValueError("Link do Bling inválido/expirado ou não público")
 
         # Se vier um HTML muito pequeno, só tratamos como inválido se contiver explicitamente a mensagem.
         # (Evita falsos-positivos e permite páginas mínimas, mas válidas.)
         if len(texto_bruto) < 200 and _is_invalid_doc_view_html(texto_bruto):
             raise ValueError("Link do Bling inválido/expirado ou não público")
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        with IMPORTACAO_ETAPA.medir(etapa="parse"):
+            with span("bling.parse_html"):
+                soup = BeautifulSoup(response.text, "html.parser")
 
-        cliente = BlingParserService._extrair_cliente(soup)
-        pedido = BlingParserService._extrair_dados_pedido(soup)
-        itens = BlingParserService._extrair_itens(soup)
+            with span("bling.extracao") as atual:
+                cliente = BlingParserService._extrair_cliente(soup)
+                pedido = BlingParserService._extrair_dados_pedido(soup)
+                itens = BlingParserService._extrair_itens(soup)
+                atual.atributos["itens"] = len(itens)
 
         return {
             "id_bling": id_bling,
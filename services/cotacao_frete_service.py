@@ -50,22 +50,26 @@ class CotacaoFreteService:
         # --------------------------------------------------
         # 3. DESMARCA COTAÇÃO ANTERIOR (SE EXISTIR)
         # --------------------------------------------------
+        cotacao = None
         for c in proposta.cotacoes:
             c.selecionada = False
+            if c.transportadora_id == transportadora.id:
+                cotacao = c
 
         # --------------------------------------------------
-        # 4. CRIA NOVA COTAÇÃO
+        # 4. CRIA NOVA COTAÇÃO (OU ATUALIZA A DA MESMA TRANSPORTADORA)
         # --------------------------------------------------
-        cotacao = CotacaoFrete(
-            proposta_id=proposta.id,
-            transportadora_id=transportadora.id,
-            preco=float(preco),
-            prazo_dias=int(prazo_dias),
-            selecionada=True,
-            criado_em=datetime.utcnow(),
-        )
+        if cotacao is None:
+            cotacao = CotacaoFrete(
+                proposta_id=proposta.id,
+                transportadora_id=transportadora.id,
+                criado_em=datetime.utcnow(),
+            )
+            db.add(cotacao)
 
-        db.add(cotacao)
+        cotacao.preco = float(preco)
+        cotacao.prazo_dias = int(prazo_dias)
+        cotacao.selecionada = True
 
         # --------------------------------------------------
         # 5. ATUALIZA STATUS DA PROPOSTA
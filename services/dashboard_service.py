@@ -0,0 +1,301 @@
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, contains_eager
+
+from config import settings
+from models import Proposta, PropostaResumoDiario, PropostaStatus, User
+from utils.cache import CacheTTL, MarcadorInvalidacao
+
+
+# Painel e gráficos em cache por processo; expiram pelo TTL ou quando uma proposta muda de status.
+_marcador_dashboard = MarcadorInvalidacao("cache-dashboard")
+_cache_painel = CacheTTL("dashboard", ttl=settings.dashboard_cache_ttl, marcador=_marcador_dashboard)
+_cache_graficos = CacheTTL("dashboard-graficos", ttl=settings.dashboard_cache_ttl, marcador=_marcador_dashboard)
+
+
+class DashboardService:
+    """
+    Agregações do dashboard.
+    Cada widget é montado a partir de duas consultas agrupadas (por status e
+    por dia), independentemente do volume de propostas.
+    """
+
+    # ==========================================================
+    # CONSULTAS AGRUPADAS
+    # ==========================================================
+
+    @staticmethod
+    def contar_por_status(db: Session) -> Dict[PropostaStatus, int]:
+        """Quantidade de propostas por status (um único GROUP BY)."""
+        linhas = (
+            db.query(Proposta.status, func.count(Proposta.id))
+            .group_by(Proposta.status)
+            .all()
+        )
+        contagens = {status: 0 for status in PropostaStatus}
+        for status, quantidade in linhas:
+            contagens[status] = quantidade
+        return contagens
+
+    @staticmethod
+    def resumo_por_dia(db: Session, inicio: date, fim: date) -> Dict[date, Dict[str, float]]:
+        """
+        Quantidade e valor das propostas criadas por dia no intervalo [inicio, fim].
+        Dias sem propostas aparecem zerados.
+        """
+        dia = func.date(Proposta.criado_em)
+        linhas = (
+            db.query(
+                dia.label("dia"),
+                func.count(Proposta.id),
+                func.coalesce(func.sum(Proposta.valor_total), 0),
+            )
+            # Intervalo em criado_em (e não em date(criado_em)) para usar o índice.
+            .filter(
+                Proposta.criado_em >= datetime.combine(inicio, time.min),
+                Proposta.criado_em < datetime.combine(fim + timedelta(days=1), time.min),
+            )
+            .group_by(dia)
+            .all()
+        )
+
+        resumo = {
+            inicio + timedelta(days=i): {"quantidade": 0, "valor": 0.0}
+            for i in range((fim - inicio).days + 1)
+        }
+        for valor_dia, quantidade, valor in linhas:
+            # PostgreSQL devolve date; SQLite devolve 'AAAA-MM-DD'
+            if isinstance(valor_dia, str):
+                valor_dia = date.fromisoformat(valor_dia)
+            resumo[valor_dia] = {"quantidade": quantidade, "valor": float(valor or 0)}
+        return resumo
+
+    # ==========================================================
+    # GRÁFICOS (RESUMO DIÁRIO)
+    # ==========================================================
+
+    @staticmethod
+    def inicio_bucket(dia: date, granularidade: str) -> date:
+        if granularidade == "semana":
+            return dia - timedelta(days=dia.weekday())
+        if granularidade == "mes":
+            return dia.replace(day=1)
+        return dia
+
+    @staticmethod
+    def _proximo_bucket(bucket: date, granularidade: str) -> date:
+        if granularidade == "semana":
+            return bucket + timedelta(days=7)
+        if granularidade == "mes":
+            return (bucket + timedelta(days=32)).replace(day=1)
+        return bucket + timedelta(days=1)
+
+    @staticmethod
+    def _filtrar_resumo(query, inicio: date, fim: date, vendedor: int | None):
+        query = query.filter(
+            PropostaResumoDiario.dia >= inicio,
+            PropostaResumoDiario.dia <= fim,
+        )
+        if vendedor is not None:
+            query = query.filter(PropostaResumoDiario.vendedor_id == vendedor)
+        return query
+
+    @staticmethod
+    def serie(
+        db: Session,
+        inicio: date,
+        fim: date,
+        granularidade: str = "dia",
+        vendedor: int | None = None,
+    ) -> Dict[str, list]:
+        """
+        Quantidade e valor das propostas criadas em [inicio, fim], agrupados por
+        dia, semana (segunda a domingo) ou mês. Buckets vazios aparecem zerados.
+        """
+        linhas = DashboardService._filtrar_resumo(
+            db.query(
+                PropostaResumoDiario.dia,
+                func.sum(PropostaResumoDiario.quantidade),
+                func.sum(PropostaResumoDiario.valor_total),
+            ),
+            inicio,
+            fim,
+            vendedor,
+        ).group_by(PropostaResumoDiario.dia).all()
+
+        buckets: Dict[date, Dict[str, float]] = {}
+        bucket = DashboardService.inicio_bucket(inicio, granularidade)
+        while bucket <= fim:
+            buckets[bucket] = {"quantidade": 0, "valor": 0.0}
+            bucket = DashboardService._proximo_bucket(bucket, granularidade)
+
+        for dia, quantidade, valor in linhas:
+            acumulado = buckets[DashboardService.inicio_bucket(dia, granularidade)]
+            acumulado["quantidade"] += quantidade or 0
+            acumulado["valor"] += float(valor or 0)
+
+        formato = "%m/%Y" if granularidade == "mes" else "%d/%m"
+        return {
+            "rotulos": [bucket.strftime(formato) for bucket in buckets],
+            "quantidades": [dados["quantidade"] for dados in buckets.values()],
+            "valores": [round(dados["valor"], 2) for dados in buckets.values()],
+        }
+
+    @staticmethod
+    def distribuicao_status(
+        db: Session,
+        inicio: date | None = None,
+        fim: date | None = None,
+        vendedor: int | None = None,
+    ) -> Dict[str, int]:
+        """
+        Propostas por status atual. Sem período nem vendedor usa a contagem exata
+        da tabela de propostas; com filtros usa o resumo diário.
+        """
+        if inicio is None and fim is None and vendedor is None:
+            contagens = DashboardService.contar_por_status(db)
+        else:
+            linhas = DashboardService._filtrar_resumo(
+                db.query(PropostaResumoDiario.status, func.sum(PropostaResumoDiario.quantidade)),
+                inicio or date.min,
+                fim or date.max,
+                vendedor,
+            ).group_by(PropostaResumoDiario.status).all()
+            contagens = {status: 0 for status in PropostaStatus}
+            for status, quantidade in linhas:
+                contagens[status] = int(quantidade or 0)
+
+        return {
+            "simulacao": contagens[PropostaStatus.pendente_simulacao],
+            "cotacao": contagens[PropostaStatus.pendente_cotacao],
+            "envio": contagens[PropostaStatus.pendente_envio],
+            "concluida": contagens[PropostaStatus.concluida],
+            "cancelada": contagens[PropostaStatus.cancelada],
+        }
+
+    @staticmethod
+    def por_vendedor(db: Session, inicio: date, fim: date) -> Dict[str, list]:
+        """Quantidade e valor por vendedor em [inicio, fim], do maior valor para o menor."""
+        valor = func.sum(PropostaResumoDiario.valor_total)
+        linhas = DashboardService._filtrar_resumo(
+            db.query(
+                PropostaResumoDiario.vendedor_id,
+                func.coalesce(User.nome, "Sem vendedor"),
+                func.sum(PropostaResumoDiario.quantidade),
+                valor,
+            ).outerjoin(User, User.id == PropostaResumoDiario.vendedor_id),
+            inicio,
+            fim,
+            None,
+        ).group_by(PropostaResumoDiario.vendedor_id, User.nome).order_by(valor.desc()).all()
+
+        return {
+            "nomes": [nome for _, nome, _, _ in linhas],
+            "quantidades": [int(quantidade or 0) for _, _, quantidade, _ in linhas],
+            "valores": [round(float(total or 0), 2) for _, _, _, total in linhas],
+        }
+
+    # ==========================================================
+    # CACHE
+    # ==========================================================
+
+    @staticmethod
+    def carregar_painel(db: Session) -> Dict[str, Any]:
+        """Todos os dados do dashboard, servidos do cache enquanto válido."""
+        return _cache_painel.obter("painel", lambda: DashboardService._montar_painel(db))
+
+    @staticmethod
+    def _montar_painel(db: Session) -> Dict[str, Any]:
+        return {
+            **DashboardService.montar_dashboard(db),
+            "activities": DashboardService.atividades_recentes(db),
+            "vendedores": [
+                {"id": vendedor_id, "nome": nome}
+                for vendedor_id, nome in db.query(User.id, User.nome)
+                .filter(User.ativo.is_(True))
+                .order_by(User.nome)
+                .all()
+            ],
+        }
+
+    @staticmethod
+    def obter_grafico(chave: tuple, carregar):
+        """Resultado de um endpoint de gráfico, em cache junto com o painel."""
+        return _cache_graficos.obter(chave, carregar)
+
+    @staticmethod
+    def versao_dados() -> int:
+        """Muda a cada invalidação do dashboard; compõe o ETag dos gráficos."""
+        return _marcador_dashboard.geracao()
+
+    @staticmethod
+    def invalidar_cache() -> None:
+        """Chamado após mudanças de status (em qualquer worker) para o painel refletir na hora."""
+        _cache_painel.invalidar()
+        _cache_graficos.invalidar()
+
+    # ==========================================================
+    # WIDGETS
+    # ==========================================================
+
+    @staticmethod
+    def montar_dashboard(db: Session) -> Dict[str, Any]:
+        """Cards de métricas e legenda de status a partir das consultas agrupadas."""
+        hoje = datetime.now().date()
+        por_status = DashboardService.contar_por_status(db)
+        por_dia = DashboardService.resumo_por_dia(db, hoje, hoje)
+
+        em_simulacao = por_status[PropostaStatus.pendente_simulacao]
+        em_cotacao = por_status[PropostaStatus.pendente_cotacao]
+        em_envio = por_status[PropostaStatus.pendente_envio]
+
+        return {
+            "stats": {
+                "propostas_hoje": por_dia[hoje]["quantidade"],
+                "em_simulacao": em_simulacao,
+                "em_cotacao": em_cotacao,
+                "em_envio": em_envio,
+                "valor_dia": por_dia[hoje]["valor"],
+            },
+            "chart_status": {
+                "simulacao": em_simulacao,
+                "cotacao": em_cotacao,
+                "envio": em_envio,
+            },
+        }
+
+    @staticmethod
+    def atividades_recentes(db: Session, limite: int = 5) -> list:
+        propostas = (
+            db.query(Proposta)
+            .join(Proposta.cliente)
+            .options(contains_eager(Proposta.cliente))
+            .order_by(Proposta.criado_em.desc())
+            .limit(limite)
+            .all()
+        )
+
+        agora = datetime.now()
+        atividades = []
+        for proposta in propostas:
+            diff = agora - proposta.criado_em
+
+            if diff.days > 0:
+                tempo_relativo = f"{diff.days}d atrás"
+            elif diff.seconds // 3600 > 0:
+                tempo_relativo = f"{diff.seconds // 3600}h atrás"
+            else:
+                tempo_relativo = f"{diff.seconds // 60} min atrás"
+
+            atividades.append({
+                "id": proposta.id,
+                "numero": f"#{proposta.id}",
+                "cliente": proposta.cliente.nome,
+                "status": proposta.status.value,
+                "valor": proposta.valor_total,
+                "tempo_relativo": tempo_relativo,
+            })
+
+        return atividades
@@ -0,0 +1,189 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal
+from models import Cliente, Proposta, PropostaStatus, TipoNotificacao, extrair_campo_importacao
+from services.whatsapp_service import WhatsAppService
+from utils.cache import MarcadorInvalidacao, TravaArquivo
+
+
+logger = logging.getLogger(__name__)
+
+# Propostas listadas por mensagem (o total sempre aparece)
+MAX_PROPOSTAS_POR_ALERTA = 15
+
+_trava_verificacao = TravaArquivo("alerta-envelhecimento")
+
+
+class PropostaParada:
+    """Linha enxuta de uma proposta parada (para a mensagem de alerta)."""
+
+    __slots__ = ("id", "status", "display_numero", "cliente_nome", "responsavel_telefone", "horas_paradas")
+
+    def __init__(self, linha, agora: datetime):
+        self.id = linha.id
+        self.status = linha.status
+        self.display_numero = (
+            extrair_campo_importacao(linha.observacao_importacao, "bling_numero") or str(linha.id)
+        )
+        self.cliente_nome = linha.cliente_nome
+        self.responsavel_telefone = linha.responsavel_telefone
+        self.horas_paradas = (agora - linha.atualizado_em).total_seconds() / 3600
+
+
+class EnvelhecimentoService:
+    """
+    Propostas paradas além do limite de horas do seu status.
+
+    A busca filtra `status = X AND atualizado_em < limite` por status, coberta
+    pelo índice (status, atualizado_em): o custo depende das propostas
+    paradas, não do tamanho da tabela.
+
+    Os alertas seguem o mesmo roteamento das notificações de status:
+    simulação e cotação vão para os contatos cadastrados do tipo; envio vai
+    para o vendedor responsável de cada proposta. Cada telefone de um grupo
+    recebe no máximo um alerta por ALERTA_ENVELHECIMENTO_COOLDOWN_HORAS; um
+    envio que falhou é repetido na verificação seguinte só para quem faltou.
+    """
+
+    TIPO_POR_STATUS = {
+        PropostaStatus.pendente_simulacao: TipoNotificacao.simulacao,
+        PropostaStatus.pendente_cotacao: TipoNotificacao.cotacao,
+    }
+
+    @staticmethod
+    def limites(agora: datetime | None = None) -> dict[PropostaStatus, datetime]:
+        """Data de corte por status: atualizado_em anterior a ela = proposta parada."""
+        agora = agora or datetime.utcnow()
+        return {
+            PropostaStatus(status): agora - timedelta(hours=horas)
+            for status, horas in settings.alerta_envelhecimento_horas.items()
+            if horas > 0
+        }
+
+    @staticmethod
+    def buscar_paradas(db: Session, agora: datetime | None = None) -> list[PropostaParada]:
+        """Propostas paradas de todos os status monitorados, das mais antigas para as mais novas."""
+        agora = agora or datetime.utcnow()
+        limites = EnvelhecimentoService.limites(agora)
+        if not limites:
+            return []
+
+        linhas = (
+            db.query(
+                Proposta.id,
+                Proposta.status,
+                Proposta.atualizado_em,
+                Proposta.observacao_importacao,
+                Proposta.responsavel_telefone,
+                Cliente.nome.label("cliente_nome"),
+            )
+            .join(Cliente, Cliente.id == Proposta.cliente_id)
+            .filter(
+                or_(*[
+                    and_(Proposta.status == status, Proposta.atualizado_em < limite)
+                    for status, limite in limites.items()
+                ])
+            )
+            .order_by(Proposta.status, Proposta.atualizado_em)
+            .all()
+        )
+        return [PropostaParada(linha, agora) for linha in linhas]
+
+    @staticmethod
+    def _agrupar(db: Session, paradas: list[PropostaParada]) -> dict[str, tuple]:
+        """{chave do grupo: (status, telefones, propostas)}"""
+        grupos: dict[str, tuple] = {}
+        for proposta in paradas:
+            if proposta.status == PropostaStatus.pendente_envio:
+                if not proposta.responsavel_telefone:
+                    logger.warning(f"Proposta {proposta.id} parada em envio sem vendedor responsável")
+                    continue
+                chave = f"envio-{proposta.responsavel_telefone}"
+                telefones = [proposta.responsavel_telefone]
+            else:
+                tipo = EnvelhecimentoService.TIPO_POR_STATUS[proposta.status]
+                chave = tipo.value
+                telefones = None  # resolvido uma vez por grupo
+
+            if chave not in grupos:
+                if telefones is None:
+                    telefones = [tel for _, tel in WhatsAppService.obter_destinatarios(db, tipo)]
+                grupos[chave] = (proposta.status, telefones, [])
+            grupos[chave][2].append(proposta)
+        return grupos
+
+    @staticmethod
+    def _ultimo_alerta(chave: str, telefone: str) -> MarcadorInvalidacao:
+        """A geração do marcador guarda o instante (mtime) do último alerta entregue ao telefone."""
+        return MarcadorInvalidacao(f"alerta-envelhecimento-{chave}-{''.join(c for c in telefone if c.isdigit())}")
+
+    @staticmethod
+    def verificar_e_alertar(db: Session, enviar: bool = True) -> dict[str, dict]:
+        """
+        Busca propostas paradas e envia um alerta agregado por grupo fora do cooldown.
+
+        Só um processo por máquina executa de cada vez (os demais retornam {}).
+        Retorna um resumo por grupo: quantidade e se o alerta foi enviado.
+        """
+        if not _trava_verificacao.tentar():
+            logger.info("Verificação de envelhecimento já em andamento em outro processo")
+            return {}
+
+        try:
+            paradas = EnvelhecimentoService.buscar_paradas(db)
+            grupos = EnvelhecimentoService._agrupar(db, paradas)
+            cooldown_ns = int(settings.alerta_envelhecimento_cooldown_horas * 3600 * 1e9)
+
+            resumo: dict[str, dict] = {}
+            for chave, (status, telefones, propostas) in grupos.items():
+                # Cooldown por telefone: quem não recebeu (falha no envio) entra na próxima rodada,
+                # quem recebeu não é alertado de novo
+                ultimos_alertas = {tel: EnvelhecimentoService._ultimo_alerta(chave, tel) for tel in telefones}
+                pendentes = [
+                    tel for tel, marcador in ultimos_alertas.items()
+                    if time.time_ns() - marcador.geracao() >= cooldown_ns
+                ]
+                em_cooldown = bool(telefones) and not pendentes
+
+                entregues: list[str] = []
+                if enviar and not em_cooldown:
+                    entregues = WhatsAppService.enviar_alerta_envelhecimento(
+                        pendentes,
+                        status,
+                        propostas[:MAX_PROPOSTAS_POR_ALERTA],
+                        total=len(propostas),
+                        limite_horas=settings.alerta_envelhecimento_horas[status.value],
+                    )
+                    for tel in entregues:
+                        ultimos_alertas[tel].invalidar()
+
+                resumo[chave] = {
+                    "status": status.value,
+                    "quantidade": len(propostas),
+                    "destinatarios": len(telefones),
+                    "em_cooldown": em_cooldown,
+                    "enviado": bool(entregues),
+                    "entregues": len(entregues),
+                }
+                logger.info(f"Envelhecimento [{chave}]: {resumo[chave]}")
+            return resumo
+        finally:
+            _trava_verificacao.liberar()
+
+    @staticmethod
+    def executar_verificacao() -> dict[str, dict]:
+        """Executa a verificação com sessão própria (laço do app e script de cron)."""
+        db = SessionLocal()
+        try:
+            return EnvelhecimentoService.verificar_e_alertar(db)
+        except Exception as e:
+            logger.exception(f"Erro na verificação de propostas paradas: {e}")
+            return {}
+        finally:
+            db.close()
@@ -0,0 +1,119 @@
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy.orm import Session
+
+from models import (
+    Cliente,
+    Proposta,
+    PropostaHistorico,
+    PropostaStatus,
+    extrair_campo_importacao,
+)
+from utils.paginacao import codificar_cursor, decodificar_cursor, filtro_apos
+
+
+# Linhas por página do histórico (primeira carga e cada "carregar mais")
+HISTORICO_POR_PAGINA = 50
+
+# Ordem: eventos mais recentes primeiro (keyset em criado_em, id)
+HISTORICO_ORDEM = (PropostaHistorico.criado_em.desc(), PropostaHistorico.id.desc())
+
+
+class LinhaHistorico:
+    """Projeção de um evento do histórico com os dados da proposta exibidos na tabela."""
+
+    __slots__ = (
+        "id",
+        "proposta_id",
+        "display_numero",
+        "cliente_nome",
+        "valor_total",
+        "status",
+        "criado_em",
+    )
+
+    def __init__(self, linha):
+        self.id = linha.id
+        self.proposta_id = linha.proposta_id
+        self.display_numero = (
+            extrair_campo_importacao(linha.observacao_importacao, "bling_numero")
+            or linha.id_bling
+            or str(linha.proposta_id)
+        )
+        self.cliente_nome = linha.cliente_nome
+        # None = total ainda não materializado (a linha mostra "-"); 0.0 é um total real
+        self.valor_total = float(linha.valor_total) if linha.valor_total is not None else None
+        self.status = linha.status
+        self.criado_em: datetime | None = linha.criado_em
+
+    @property
+    def cursor(self) -> str:
+        return codificar_cursor(self.criado_em, self.id)
+
+
+class HistoricoService:
+    """Consulta paginada (keyset) do histórico de propostas, com filtros no SQL."""
+
+    @staticmethod
+    def carregar_pagina(
+        db: Session,
+        cursor: str | None = None,
+        status: PropostaStatus | None = None,
+        vendedor: int | None = None,
+        cliente: str | None = None,
+        inicio: date | None = None,
+        fim: date | None = None,
+        limite: int = HISTORICO_POR_PAGINA,
+    ) -> tuple[list[LinhaHistorico], str | None]:
+        """Eventos após o cursor (ou a primeira página) e o cursor da página seguinte (ou None).
+
+        Cursor informado mas inválido levanta ValueError: voltar à primeira
+        página duplicaria as linhas que o cliente já mostra.
+        """
+        query = (
+            db.query(
+                PropostaHistorico.id,
+                PropostaHistorico.proposta_id,
+                PropostaHistorico.status,
+                PropostaHistorico.criado_em,
+                Proposta.id_bling,
+                Proposta.observacao_importacao,
+                Proposta.valor_total.label("valor_total"),
+                Cliente.nome.label("cliente_nome"),
+            )
+            .join(Proposta, Proposta.id == PropostaHistorico.proposta_id)
+            .join(Cliente, Cliente.id == Proposta.cliente_id)
+        )
+
+        if status:
+            query = query.filter(PropostaHistorico.status == status)
+        if vendedor:
+            query = query.filter(Proposta.vendedor_id == vendedor)
+        if cliente:
+            query = query.filter(Cliente.nome.ilike(f"%{cliente}%"))
+        if inicio:
+            query = query.filter(PropostaHistorico.criado_em >= datetime.combine(inicio, time.min))
+        if fim:
+            query = query.filter(
+                PropostaHistorico.criado_em < datetime.combine(fim + timedelta(days=1), time.min)
+            )
+
+        if cursor:
+            posicao = decodificar_cursor(cursor)
+            if (
+                not posicao
+                or len(posicao) != 2
+                or not isinstance(posicao[0], datetime)
+                or not isinstance(posicao[1], int)
+            ):
+                raise ValueError("cursor inválido")
+            criado_em, evento_id = posicao
+            query = query.filter(
+                filtro_apos(PropostaHistorico.criado_em, PropostaHistorico.id, criado_em, evento_id)
+            )
+
+        # Uma linha a mais só para saber se existe próxima página.
+        linhas = query.order_by(*HISTORICO_ORDEM).limit(limite + 1).all()
+        eventos = [LinhaHistorico(linha) for linha in linhas[:limite]]
+        proximo = eventos[-1].cursor if len(linhas) > limite and eventos else None
+        return eventos, proximo
@@ -0,0 +1,206 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import (
+    Cliente,
+    Proposta,
+    PropostaProduto,
+    PropostaStatus,
+    User,
+    extrair_campo_importacao,
+)
+from utils.paginacao import codificar_cursor, decodificar_cursor, filtro_apos
+from utils.time import time_ago
+
+
+KANBAN_COLUNAS = (
+    PropostaStatus.pendente_simulacao,
+    PropostaStatus.pendente_cotacao,
+    PropostaStatus.pendente_envio,
+)
+
+# Cards carregados por coluna na abertura do quadro e a cada "carregar mais".
+KANBAN_CARDS_POR_PAGINA = 30
+
+# Ordem dos cards: mais recentemente atualizados primeiro (keyset em atualizado_em, id).
+KANBAN_ORDEM = (Proposta.atualizado_em.desc(), Proposta.id.desc())
+
+
+class CardKanban:
+    """
+    Projeção enxuta de uma proposta para o card do kanban.
+
+    Carrega só as colunas exibidas (sem hidratar Proposta, Cliente, User,
+    itens e produtos): o valor vem da coluna materializada e a contagem de
+    itens é calculada no SQL.
+    """
+
+    __slots__ = (
+        "id",
+        "status",
+        "display_numero",
+        "cliente_nome",
+        "cliente_documento",
+        "vendedor_nome",
+        "valor_total",
+        "quantidade_itens",
+        "atualizado_em",
+        "envelhecido",
+    )
+
+    def __init__(self, linha):
+        self.id = linha.id
+        self.status = linha.status
+        self.display_numero = (
+            extrair_campo_importacao(linha.observacao_importacao, "bling_numero") or str(linha.id)
+        )
+        self.cliente_nome = linha.cliente_nome
+        self.cliente_documento = linha.cliente_documento
+        self.vendedor_nome = (
+            extrair_campo_importacao(linha.observacao_importacao, "bling_vendedor")
+            or linha.vendedor_nome
+        )
+        self.valor_total = float(linha.valor_total or 0)
+        self.quantidade_itens = int(linha.quantidade_itens or 0)
+        self.atualizado_em: datetime = linha.atualizado_em
+
+        # Parada além do limite do alerta de envelhecimento para o status
+        limite_horas = settings.alerta_envelhecimento_horas.get(self.status.value)
+        self.envelhecido = bool(
+            limite_horas
+            and datetime.utcnow() - self.atualizado_em > timedelta(hours=limite_horas)
+        )
+
+    @property
+    def tempo_atualizado(self) -> str:
+        return time_ago(self.atualizado_em)
+
+    @property
+    def cursor(self) -> str:
+        return codificar_cursor(self.atualizado_em, self.id)
+
+
+class KanbanService:
+    """
+    Consultas do quadro kanban.
+    Os cards são projeções (CardKanban), não entidades ORM.
+    """
+
+    @staticmethod
+    def _colunas_card():
+        quantidade_itens = (
+            select(func.count(PropostaProduto.id))
+            .where(PropostaProduto.proposta_id == Proposta.id)
+            .correlate(Proposta)
+            .scalar_subquery()
+        )
+        return (
+            Proposta.id,
+            Proposta.status,
+            Proposta.observacao_importacao,
+            Proposta.atualizado_em,
+            Cliente.nome.label("cliente_nome"),
+            Cliente.documento.label("cliente_documento"),
+            User.nome.label("vendedor_nome"),
+            Proposta.valor_total.label("valor_total"),
+            quantidade_itens.label("quantidade_itens"),
+        )
+
+    @staticmethod
+    def _filtrar(query, cliente: str | None, vendedor: int | None):
+        if cliente:
+            query = query.filter(
+                Proposta.cliente.has(Cliente.nome.ilike(f"%{cliente}%"))
+            )
+        if vendedor:
+            query = query.filter(Proposta.vendedor_id == vendedor)
+        return query
+
+    @staticmethod
+    def carregar_quadro(
+        db: Session,
+        cliente: str | None = None,
+        vendedor: int | None = None,
+        por_coluna: int = KANBAN_CARDS_POR_PAGINA,
+    ) -> tuple[dict[PropostaStatus, list[CardKanban]], dict[PropostaStatus, int]]:
+        """
+        Primeira página de cada coluna e o total de cards por coluna.
+
+        Uma única consulta: a janela numera os cards de cada status e conta o
+        total da coluna; só as primeiras `por_coluna` linhas de cada uma voltam.
+        """
+        ranking = KanbanService._filtrar(
+            db.query(
+                Proposta.id.label("id"),
+                func.row_number()
+                .over(partition_by=Proposta.status, order_by=KANBAN_ORDEM)
+                .label("posicao"),
+                func.count().over(partition_by=Proposta.status).label("total"),
+            ).filter(Proposta.status.in_(KANBAN_COLUNAS)),
+            cliente,
+            vendedor,
+        ).subquery()
+
+        linhas = (
+            db.query(*KanbanService._colunas_card(), ranking.c.total)
+            .join(ranking, ranking.c.id == Proposta.id)
+            .join(Cliente, Cliente.id == Proposta.cliente_id)
+            .outerjoin(User, User.id == Proposta.vendedor_id)
+            .filter(ranking.c.posicao <= por_coluna)
+            .order_by(*KANBAN_ORDEM)
+            .all()
+        )
+
+        colunas: dict[PropostaStatus, list[CardKanban]] = {status: [] for status in KANBAN_COLUNAS}
+        totais: dict[PropostaStatus, int] = {status: 0 for status in KANBAN_COLUNAS}
+        for linha in linhas:
+            colunas[linha.status].append(CardKanban(linha))
+            totais[linha.status] = linha.total
+
+        return colunas, totais
+
+    @staticmethod
+    def carregar_pagina(
+        db: Session,
+        status: PropostaStatus,
+        cursor: str | None = None,
+        cliente: str | None = None,
+        vendedor: int | None = None,
+        limite: int = KANBAN_CARDS_POR_PAGINA,
+    ) -> tuple[list[CardKanban], str | None]:
+        """Cards de uma coluna após o cursor, e o cursor da página seguinte (ou None).
+
+        Cursor informado mas inválido levanta ValueError: voltar à primeira
+        página duplicaria os cards que o cliente já mostra.
+        """
+        query = KanbanService._filtrar(
+            db.query(*KanbanService._colunas_card())
+            .join(Cliente, Cliente.id == Proposta.cliente_id)
+            .outerjoin(User, User.id == Proposta.vendedor_id)
+            .filter(Proposta.status == status),
+            cliente,
+            vendedor,
+        )
+
+        if cursor:
+            posicao = decodificar_cursor(cursor)
+            if (
+                not posicao
+                or len(posicao) != 2
+                or not isinstance(posicao[0], datetime)
+                or not isinstance(posicao[1], int)
+            ):
+                raise ValueError("cursor inválido")
+            atualizado_em, proposta_id = posicao
+            query = query.filter(
+                filtro_apos(Proposta.atualizado_em, Proposta.id, atualizado_em, proposta_id)
+            )
+
+        # Busca uma linha a mais só para saber se existe próxima página.
+        linhas = query.order_by(*KANBAN_ORDEM).limit(limite + 1).all()
+        cards = [CardKanban(linha) for linha in linhas[:limite]]
+        proximo = cards[-1].cursor if len(linhas) > limite and cards else None
+        return cards, proximo
@@ -0,0 +1,177 @@
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict
+
+from sqlalchemy import DateTime, func, or_, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import Proposta, PropostaHistorico, PropostaStatus, User
+
+
+# Etapas medidas (as que dependem de uma equipe: galpão, cotação, envio)
+ETAPAS = (
+    PropostaStatus.pendente_simulacao,
+    PropostaStatus.pendente_cotacao,
+    PropostaStatus.pendente_envio,
+)
+
+
+def _percentil(valores_ordenados: list[float], p: float) -> float | None:
+    """Percentil com interpolação linear (mesmo critério do percentile_cont)."""
+    if not valores_ordenados:
+        return None
+    posicao = (len(valores_ordenados) - 1) * p
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(valores_ordenados) - 1)
+    fracao = posicao - inferior
+    return valores_ordenados[inferior] + (valores_ordenados[superior] - valores_ordenados[inferior]) * fracao
+
+
+class LeadTimeService:
+    """
+    Tempo de permanência das propostas em cada etapa, a partir do histórico.
+
+    Uma passagem pela etapa começa na primeira transição para o status e
+    termina na transição seguinte para outro status. Registros repetidos do
+    mesmo status (reimportações, notificações forçadas) não reiniciam a contagem.
+    Passagens ainda em aberto não entram na conta.
+    """
+
+    @staticmethod
+    def _passagens(db: Session, inicio: date, fim: date, vendedor: int | None):
+        """(status, entrada, saída, vendedor_id, vendedor_nome) das passagens iniciadas em [inicio, fim]."""
+        H = PropostaHistorico
+        janela_inicio = datetime.combine(inicio, time.min)
+        janela_fim = datetime.combine(fim + timedelta(days=1), time.min)
+
+        # 0) só as propostas com registro no período entram nas janelas: uma passagem
+        #    iniciada no período tem o registro de entrada nele (índice em criado_em).
+        #    O histórico dessas propostas vai inteiro, para o LAG ver o status anterior
+        #    e o LEAD a saída, mesmo fora do período.
+        propostas_no_periodo = select(H.proposta_id).where(
+            H.criado_em >= janela_inicio,
+            H.criado_em < janela_fim,
+        )
+
+        # 1) marca as transições que de fato mudam de status
+        transicoes = (
+            select(
+                H.id,
+                H.proposta_id,
+                H.status,
+                H.criado_em,
+                func.lag(H.status)
+                .over(partition_by=H.proposta_id, order_by=(H.criado_em, H.id))
+                .label("status_anterior"),
+            )
+            .where(H.proposta_id.in_(propostas_no_periodo))
+            .subquery()
+        )
+
+        mudancas = (
+            select(transicoes)
+            .where(
+                or_(
+                    transicoes.c.status_anterior.is_(None),
+                    transicoes.c.status_anterior != transicoes.c.status,
+                )
+            )
+            .subquery()
+        )
+
+        # 2) a saída de cada passagem é a próxima mudança da mesma proposta
+        #    (id desempata mudanças no mesmo instante, como no LAG acima)
+        passagens = select(
+            mudancas.c.proposta_id,
+            mudancas.c.status,
+            mudancas.c.criado_em.label("entrada"),
+            func.lead(mudancas.c.criado_em, type_=DateTime)
+            .over(partition_by=mudancas.c.proposta_id, order_by=(mudancas.c.criado_em, mudancas.c.id))
+            .label("saida"),
+        ).subquery()
+
+        query = (
+            db.query(
+                passagens.c.status,
+                passagens.c.entrada,
+                passagens.c.saida,
+                Proposta.vendedor_id,
+                User.nome,
+            )
+            .join(Proposta, Proposta.id == passagens.c.proposta_id)
+            .outerjoin(User, User.id == Proposta.vendedor_id)
+            .filter(
+                passagens.c.status.in_(ETAPAS),
+                passagens.c.saida.isnot(None),
+                # recorta as passagens das propostas acima que começaram fora do período
+                passagens.c.entrada >= janela_inicio,
+                passagens.c.entrada < janela_fim,
+            )
+        )
+        if vendedor is not None:
+            query = query.filter(Proposta.vendedor_id == vendedor)
+        return query.all()
+
+    @staticmethod
+    def _resumir(horas_por_etapa: Dict[PropostaStatus, list[float]]) -> Dict[str, Any]:
+        resumo = {}
+        for etapa in ETAPAS:
+            horas = sorted(horas_por_etapa.get(etapa, []))
+            sla = settings.sla_horas.get(etapa.value)
+            dentro_sla = sum(1 for h in horas if sla is not None and h <= sla)
+            mediana = _percentil(horas, 0.5)
+            p90 = _percentil(horas, 0.9)
+            resumo[etapa.value] = {
+                "quantidade": len(horas),
+                "mediana_horas": round(mediana, 2) if mediana is not None else None,
+                "p90_horas": round(p90, 2) if p90 is not None else None,
+                "sla_horas": sla,
+                "dentro_sla": round(dentro_sla / len(horas), 4) if horas and sla is not None else None,
+            }
+        return resumo
+
+    @staticmethod
+    def tempos_por_etapa(
+        db: Session,
+        inicio: date,
+        fim: date,
+        vendedor: int | None = None,
+    ) -> Dict[str, Any]:
+        """Mediana, p90 e % no SLA por etapa: no período, por semana e por vendedor."""
+        geral: Dict[PropostaStatus, list[float]] = {}
+        por_semana: Dict[date, Dict[PropostaStatus, list[float]]] = {}
+        por_vendedor: Dict[int, Dict[PropostaStatus, list[float]]] = {}
+        nomes: Dict[int, str] = {}
+
+        semana = inicio - timedelta(days=inicio.weekday())
+        while semana <= fim:
+            por_semana[semana] = {}
+            semana += timedelta(days=7)
+
+        for status, entrada, saida, vendedor_id, vendedor_nome in LeadTimeService._passagens(
+            db, inicio, fim, vendedor
+        ):
+            horas = max((saida - entrada).total_seconds(), 0) / 3600
+            semana = entrada.date() - timedelta(days=entrada.weekday())
+            chave_vendedor = vendedor_id or 0
+            nomes[chave_vendedor] = vendedor_nome or "Sem vendedor"
+
+            geral.setdefault(status, []).append(horas)
+            por_semana.setdefault(semana, {}).setdefault(status, []).append(horas)
+            por_vendedor.setdefault(chave_vendedor, {}).setdefault(status, []).append(horas)
+
+        return {
+            "etapas": [etapa.value for etapa in ETAPAS],
+            "geral": LeadTimeService._resumir(geral),
+            "por_semana": [
+                {"semana": semana.strftime("%d/%m"), **LeadTimeService._resumir(horas)}
+                for semana, horas in sorted(por_semana.items())
+            ],
+            "por_vendedor": sorted(
+                (
+                    {"vendedor": nomes[vendedor_id], **LeadTimeService._resumir(horas)}
+                    for vendedor_id, horas in por_vendedor.items()
+                ),
+                key=lambda linha: linha["vendedor"],
+            ),
+        }
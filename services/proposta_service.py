@@ -2,16 +2,21 @@
 
 import os
 from datetime import datetime
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from models import (
     Proposta,
+    PropostaProduto,
     PropostaStatus,
     PropostaHistorico,
     Simulacao,
     TipoSimulacao,
     EnvioProposta,
 )
+from services.dashboard_service import DashboardService
+from services.resumo_diario_service import ResumoDiarioService
+from utils.rastreamento import span
 
 
 class PropostaService:
@@ -146,10 +151,49 @@ class PropostaService:
             f"Enviado via {meio_envio}",
         )
 
+    # ======================================================
+    # VALOR TOTAL (MATERIALIZADO)
+    # ======================================================
+    @staticmethod
+    def recalcular_valor_total(db: Session, proposta: Proposta) -> float:
+        """
+        Recalcula e grava Proposta.valor_total a partir dos itens no banco.
+
+        Deve ser chamado sempre que itens, preços ou desconto mudarem
+        (importação/reimportação do Bling, edição de itens, desconto).
+        Faz flush antes da soma para enxergar itens ainda pendentes na sessão;
+        não faz commit.
+        """
+        db.flush()
+
+        soma_itens = (
+            db.query(
+                func.coalesce(
+                    func.sum(
+                        func.coalesce(
+                            PropostaProduto.preco_total,
+                            PropostaProduto.preco_unitario * PropostaProduto.quantidade,
+                        )
+                    ),
+                    0.0,
+                )
+            )
+            .filter(PropostaProduto.proposta_id == proposta.id)
+            .scalar()
+        )
+
+        total = float(soma_itens or 0)
+        if proposta.desconto is not None and proposta.desconto > 0:
+            total -= proposta.desconto
+
+        proposta.valor_total = total
+        return total
+
     # ======================================================
     # STATUS + HISTÓRICO
     # ======================================================
     @staticmethod
+    @span("proposta.atualizar_status")
     def _atualizar_status(
         db: Session,
         proposta: Proposta,
@@ -164,14 +208,19 @@ class PropostaService:
         proposta.status = novo_status
         proposta.atualizado_em = datetime.utcnow()
 
-        PropostaService._registrar_historico(
-            db,
-            proposta,
-            novo_status,
-            observacao,
-        )
+        with span("status.historico", status=novo_status.value):
+            PropostaService._registrar_historico(
+                db,
+                proposta,
+                novo_status,
+                observacao,
+            )
 
-        db.commit()
+            db.commit()
+
+        # Dashboard em cache passa a refletir a nova situação (todos os workers)
+        with span("status.invalidar_cache"):
+            DashboardService.invalidar_cache()
 
         # Envia notificação WhatsApp após commit (pode ser desabilitado por env var)
         if os.getenv("DISABLE_WHATSAPP_NOTIFICATIONS", "").lower() in {"1", "true", "yes"}:
@@ -181,7 +230,9 @@ class PropostaService:
         try:
             from services.whatsapp_service import WhatsAppService
 
-            resultado = WhatsAppService.enviar_notificacao_mudanca_status(db, proposta, novo_status)
+            with span("status.whatsapp") as atual:
+                resultado = WhatsAppService.enviar_notificacao_mudanca_status(db, proposta, novo_status)
+                atual.atributos["enviado"] = bool(resultado)
             print(f"[INFO] Resultado: {'Sucesso' if resultado else 'Falhou'}")
         except Exception as e:
             print(f"[ERRO] Erro ao enviar notificação WhatsApp: {e}")
@@ -202,3 +253,6 @@ class PropostaService:
             observacao=observacao,
         )
         db.add(historico)
+
+        # Toda transição passa por aqui: mantém o resumo diário do dashboard em dia
+        ResumoDiarioService.atualizar_proposta(db, proposta)
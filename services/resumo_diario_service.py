@@ -0,0 +1,121 @@
+import logging
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import and_, case, func, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from models import Proposta, PropostaResumoDiario
+
+
+logger = logging.getLogger(__name__)
+
+
+class ResumoDiarioService:
+    """
+    Manutenção da tabela propostas_resumo_diario.
+
+    A unidade de atualização é o dia de criação: o dia inteiro é recalculado a
+    partir de `propostas` (delete + insert das linhas do dia). Isso mantém o
+    resumo correto quando a proposta muda de status, de vendedor, de valor ou
+    é excluída, sem precisar saber o estado anterior.
+    """
+
+    @staticmethod
+    def _cubagem_final():
+        # Mesma regra de Proposta.cubagem_final_m3
+        return case(
+            (
+                and_(Proposta.cubagem_ajustada.is_(True), Proposta.cubagem_manual_m3.isnot(None)),
+                Proposta.cubagem_manual_m3,
+            ),
+            else_=Proposta.cubagem_m3,
+        )
+
+    @staticmethod
+    def _agregar(db: Session, inicio: date, fim: date) -> list[dict]:
+        """Linhas do resumo para os dias de criação em [inicio, fim]."""
+        dia = func.date(Proposta.criado_em)
+        vendedor = func.coalesce(Proposta.vendedor_id, 0)
+        linhas = (
+            db.query(
+                dia,
+                Proposta.status,
+                Proposta.origem,
+                vendedor,
+                func.count(Proposta.id),
+                func.coalesce(func.sum(Proposta.valor_total), 0),
+                func.coalesce(func.sum(ResumoDiarioService._cubagem_final()), 0),
+            )
+            .filter(
+                Proposta.criado_em >= datetime.combine(inicio, time.min),
+                Proposta.criado_em < datetime.combine(fim + timedelta(days=1), time.min),
+            )
+            .group_by(dia, Proposta.status, Proposta.origem, vendedor)
+            .all()
+        )
+
+        agora = datetime.utcnow()
+        return [
+            {
+                # PostgreSQL devolve date; SQLite devolve 'AAAA-MM-DD'
+                "dia": date.fromisoformat(d) if isinstance(d, str) else d,
+                "status": status,
+                "origem": origem,
+                "vendedor_id": vendedor_id,
+                "quantidade": quantidade,
+                "valor_total": float(valor or 0),
+                "cubagem_total": float(cubagem or 0),
+                "atualizado_em": agora,
+            }
+            for d, status, origem, vendedor_id, quantidade, valor, cubagem in linhas
+        ]
+
+    @staticmethod
+    def reconstruir(db: Session, inicio: date, fim: date) -> int:
+        """
+        Recalcula o resumo dos dias em [inicio, fim]. Não faz commit.
+        Retorna a quantidade de linhas gravadas.
+        """
+        db.flush()
+        linhas = ResumoDiarioService._agregar(db, inicio, fim)
+
+        db.query(PropostaResumoDiario).filter(
+            PropostaResumoDiario.dia >= inicio,
+            PropostaResumoDiario.dia <= fim,
+        ).delete(synchronize_session=False)
+        if linhas:
+            db.execute(insert(PropostaResumoDiario), linhas)
+        return len(linhas)
+
+    @staticmethod
+    def atualizar_dia(db: Session, dia: date | None) -> None:
+        """
+        Recalcula um dia dentro de um savepoint, com uma nova tentativa.
+
+        A falha típica é a de dois workers recalculando o mesmo dia ao mesmo
+        tempo (o insert de um esbarra na chave única das linhas do outro). O
+        savepoint desfaz só o resumo e a segunda tentativa já enxerga as linhas
+        gravadas pelo outro worker. Se falhar de novo, a transação principal
+        segue e o erro fica no log: o próximo evento do dia, ou
+        scripts/reconstruir_resumo_diario.py, corrige o resumo.
+        """
+        if dia is None:
+            return
+        for tentativa in (1, 2):
+            try:
+                with db.begin_nested():
+                    ResumoDiarioService.reconstruir(db, dia, dia)
+                return
+            except SQLAlchemyError as e:
+                if tentativa == 1:
+                    logger.warning(f"Falha ao atualizar resumo diário de {dia}, tentando de novo: {e}")
+                else:
+                    logger.error(f"Resumo diário de {dia} não atualizado: {e}")
+
+    @staticmethod
+    def atualizar_proposta(db: Session, proposta: Proposta) -> None:
+        """Recalcula o dia de criação da proposta (após mudança de status, valor etc.)."""
+        db.flush()  # garante criado_em/status atuais visíveis para a agregação
+        if proposta.criado_em:
+            ResumoDiarioService.atualizar_dia(db, proposta.criado_em.date())
@@ -1,16 +1,31 @@
 import logging
 import os
+import threading
+import time
 from typing import Optional
 
-import requests
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 
+from config import settings
 from models import ContatoNotificacao, Proposta, PropostaStatus, TipoNotificacao
+from utils.cache import MarcadorInvalidacao
+from utils.metricas import WHATSAPP_ENVIO, WHATSAPP_FALHAS
+from utils.rastreamento import span
 
 logger = logging.getLogger(__name__)
 
 
+# Cache de destinatários e token (por processo). A geração do marcador permite
+# que a edição de contatos em um worker invalide o cache dos demais.
+_marcador_contatos = MarcadorInvalidacao("contatos_notificacao")
+_cache_lock = threading.Lock()
+_cache_destinatarios: dict[TipoNotificacao, list[tuple[str, str]]] | None = None
+_cache_geracao: int | None = None
+_cache_bot_token: str | None = None
+_cache_bot_token_geracao: int | None = None
+
+
 class WhatsAppService:
     """
     Serviço centralizado para notificações via WhatsApp usando BotConversa.
@@ -49,8 +64,7 @@ class WhatsAppService:
         print(f"[WHATSAPP] Proposta ID: {proposta.id}, Status: {novo_status}")
         logger.info(f"Iniciando notificacao para proposta {proposta.id} -> status {novo_status}")
         
-        load_dotenv()
-        bot_token = os.getenv("WHATSAPP_BOT_CONVERSA_TOKEN")
+        bot_token = WhatsAppService._obter_bot_token()
         
         if not bot_token:
             msg = "ERRO CRITICO: WHATSAPP_BOT_CONVERSA_TOKEN nao configurado em .env ou variavel de ambiente"
@@ -80,26 +94,13 @@ class WhatsAppService:
                 print(f"[WHATSAPP] Nenhuma notificacao configurada para status {novo_status}")
                 return False
 
-            contatos = db.query(ContatoNotificacao).filter(
-                ContatoNotificacao.tipo == tipo_notificacao,
-                ContatoNotificacao.ativo == True
-            ).all()
-
-            # Fallback: se não houver contatos para COTAÇÃO, usa os contatos de SIMULAÇÃO.
-            # Isso evita perder alertas do kanban quando o time cadastra apenas um grupo.
-            if (not contatos) and tipo_notificacao == TipoNotificacao.cotacao:
-                contatos = db.query(ContatoNotificacao).filter(
-                    ContatoNotificacao.tipo == TipoNotificacao.simulacao,
-                    ContatoNotificacao.ativo == True
-                ).all()
-                if contatos:
-                    logger.info("Sem contatos de cotacao; usando contatos de simulacao (fallback)")
-                    print("[WHATSAPP] Sem contatos de cotacao; usando simulacao (fallback)")
-
-            telefones = [c.telefone for c in contatos]
-            msg = f"📋 Encontrados {len(contatos)} contatos para tipo {tipo_notificacao}: {[c.nome for c in contatos]}"
+            contatos = WhatsAppService.obter_destinatarios(db, tipo_notificacao)
+
+            telefones = [telefone for _, telefone in contatos]
+            nomes = [nome for nome, _ in contatos]
+            msg = f"📋 Encontrados {len(contatos)} contatos para tipo {tipo_notificacao}: {nomes}"
             logger.info(msg)
-            print(f"[WHATSAPP] Encontrados {len(contatos)} contatos para {tipo_notificacao}: {[c.nome for c in contatos]}")
+            print(f"[WHATSAPP] Encontrados {len(contatos)} contatos para {tipo_notificacao}: {nomes}")
             
             if not telefones:
                 msg = f"⚠️ Nenhum contato ativo para notificação tipo {tipo_notificacao}"
@@ -138,6 +139,144 @@ class WhatsAppService:
         
         return sucesso
     
+    # ======================================================
+    # ALERTA DE PROPOSTAS PARADAS
+    # ======================================================
+    @staticmethod
+    def enviar_alerta_envelhecimento(
+        telefones: list[str],
+        status: PropostaStatus,
+        propostas: list,
+        total: int,
+        limite_horas: float,
+    ) -> list[str]:
+        """
+        Envia UMA mensagem agregada com as propostas paradas de um grupo.
+
+        `propostas` são linhas com display_numero, cliente_nome e horas_paradas
+        (as mais antigas primeiro); `total` pode ser maior que a lista exibida.
+        Retorna os telefones que receberam o alerta.
+        """
+        # Mesmo interruptor das notificações de status (proposta_service)
+        if os.getenv("DISABLE_WHATSAPP_NOTIFICATIONS", "").lower() in {"1", "true", "yes"}:
+            logger.info(f"DISABLE_WHATSAPP_NOTIFICATIONS ativo - alerta de envelhecimento ({status.value}) nao enviado")
+            return []
+        bot_token = WhatsAppService._obter_bot_token()
+        if not bot_token:
+            logger.error("WHATSAPP_BOT_CONVERSA_TOKEN nao configurado - alerta de envelhecimento nao enviado")
+            return []
+        if not telefones:
+            logger.warning(f"Nenhum destinatario para alerta de envelhecimento ({status.value})")
+            return []
+
+        mensagem = WhatsAppService._gerar_mensagem_envelhecimento(status, propostas, total, limite_horas)
+        print(f"[WHATSAPP] Alerta de envelhecimento ({status.value}, {total} proposta(s)) para {len(telefones)} telefone(s)")
+
+        return [
+            tel for tel in telefones
+            if WhatsAppService._enviar_mensagem(bot_token, tel, mensagem)
+        ]
+
+    @staticmethod
+    def _gerar_mensagem_envelhecimento(
+        status: PropostaStatus,
+        propostas: list,
+        total: int,
+        limite_horas: float,
+    ) -> str:
+        etapa = {
+            PropostaStatus.pendente_simulacao: "simulação",
+            PropostaStatus.pendente_cotacao: "cotação",
+            PropostaStatus.pendente_envio: "envio",
+        }.get(status, status.value)
+
+        linhas = [
+            f"⏰ *{total} proposta(s) parada(s) em {etapa}* (mais de {limite_horas:g}h sem atualização)"
+        ]
+        for p in propostas:
+            linhas.append(f"• #{p.display_numero} - {p.cliente_nome} ({p.horas_paradas:.0f}h)")
+        if total > len(propostas):
+            linhas.append(f"… e mais {total - len(propostas)}")
+        return "\n".join(linhas)
+
+    # ======================================================
+    # CACHE DE DESTINATÁRIOS / TOKEN
+    # ======================================================
+    @staticmethod
+    def obter_destinatarios(
+        db: Session,
+        tipo: TipoNotificacao,
+    ) -> list[tuple[str, str]]:
+        """
+        Retorna [(nome, telefone)] dos contatos ativos do tipo informado.
+
+        A lista já vem com o fallback cotação → simulação resolvido: se não
+        houver contatos de COTAÇÃO, usa os de SIMULAÇÃO (evita perder alertas
+        do kanban quando o time cadastra apenas um grupo).
+
+        Em regime estável não consulta o banco; o cache é recarregado (uma
+        única consulta para todos os tipos) após `invalidar_cache()` neste ou
+        em outro worker.
+        """
+        global _cache_destinatarios, _cache_geracao
+
+        geracao = _marcador_contatos.geracao()
+        destinatarios = _cache_destinatarios
+        if destinatarios is None or _cache_geracao != geracao:
+            with _cache_lock:
+                if _cache_destinatarios is None or _cache_geracao != geracao:
+                    _cache_destinatarios = WhatsAppService._carregar_destinatarios(db)
+                    _cache_geracao = geracao
+                destinatarios = _cache_destinatarios
+
+        return list(destinatarios.get(tipo, []))
+
+    @staticmethod
+    def _carregar_destinatarios(db: Session) -> dict[TipoNotificacao, list[tuple[str, str]]]:
+        contatos = (
+            db.query(ContatoNotificacao.tipo, ContatoNotificacao.nome, ContatoNotificacao.telefone)
+            .filter(ContatoNotificacao.ativo == True)
+            .order_by(ContatoNotificacao.id)
+            .all()
+        )
+
+        por_tipo: dict[TipoNotificacao, list[tuple[str, str]]] = {tipo: [] for tipo in TipoNotificacao}
+        for tipo, nome, telefone in contatos:
+            por_tipo[tipo].append((nome, telefone))
+
+        if not por_tipo[TipoNotificacao.cotacao] and por_tipo[TipoNotificacao.simulacao]:
+            logger.info("Sem contatos de cotacao; usando contatos de simulacao (fallback)")
+            por_tipo[TipoNotificacao.cotacao] = list(por_tipo[TipoNotificacao.simulacao])
+
+        return por_tipo
+
+    @staticmethod
+    def _obter_bot_token() -> Optional[str]:
+        global _cache_bot_token, _cache_bot_token_geracao
+
+        geracao = _marcador_contatos.geracao()
+        if _cache_bot_token is None or _cache_bot_token_geracao != geracao:
+            load_dotenv()
+            _cache_bot_token = os.getenv("WHATSAPP_BOT_CONVERSA_TOKEN") or ""
+            _cache_bot_token_geracao = geracao
+        return _cache_bot_token or None
+
+    @staticmethod
+    def invalidar_cache() -> None:
+        """
+        Descarta destinatários e token em cache.
+
+        Deve ser chamado sempre que contatos forem criados, editados ou
+        excluídos. Os demais workers recarregam na próxima notificação.
+        """
+        global _cache_destinatarios, _cache_geracao, _cache_bot_token
+
+        with _cache_lock:
+            _cache_destinatarios = None
+            _cache_geracao = None
+            _cache_bot_token = None
+        _marcador_contatos.invalidar()
+
     @staticmethod
     def _gerar_mensagem(status: PropostaStatus, proposta: Proposta) -> Optional[str]:
         """Gera mensagem formatada baseada no status."""
@@ -174,6 +313,7 @@ class WhatsAppService:
         return None
     
     @staticmethod
+    @span("whatsapp.mensagem")
     def _enviar_mensagem(bot_token: str, telefone: str, mensagem: str) -> bool:
         """
         Envia mensagem via webhook BotConversa.
@@ -186,8 +326,11 @@ class WhatsAppService:
         Returns:
             True se enviado com sucesso, False caso contrário
         """
+        import requests  # importado no primeiro envio (cold start mais rápido)
+
+        inicio = time.perf_counter()
         try:
-            url = f"https://new-backend.botconversa.com.br/api/v1/webhooks-automation/catch/{bot_token}/"
+            url = settings.botconversa_webhook_url.format(token=bot_token)
             payload = {"phone": telefone, "text": mensagem}
             
             msg = f"🔄 Enviando para BotConversa: {telefone}"
@@ -195,6 +338,7 @@ class WhatsAppService:
             print(f"[WHATSAPP] >> Enviando para {telefone}")
             
             response = requests.post(url, json=payload, timeout=10)
+            WHATSAPP_ENVIO.observar(time.perf_counter() - inicio, resultado=str(response.status_code))
             
             if response.status_code in [200, 201, 204]:
                 msg = f"✅ WhatsApp enviado com sucesso para {telefone} (status {response.status_code})"
@@ -205,9 +349,12 @@ class WhatsAppService:
             msg = f"❌ Falha ao enviar WhatsApp para {telefone}: HTTP {response.status_code} - {response.text}"
             logger.error(msg)
             print(f"[WHATSAPP] >> FALHA {telefone}: HTTP {response.status_code}")
+            WHATSAPP_FALHAS.inc(motivo="http")
             return False
                 
         except Exception as e:
+            WHATSAPP_ENVIO.observar(time.perf_counter() - inicio, resultado="erro")
+            WHATSAPP_FALHAS.inc(motivo="excecao")
             msg = f"❌ Erro ao enviar WhatsApp para {telefone}: {e}"
             logger.exception(msg)
             print(f"[WHATSAPP] >> ERRO {telefone}: {e}")
@@ -1,17 +1,96 @@
+// Gráficos carregados de /dashboard/api/* depois da página (o navegador revalida via ETag).
+const graficos = {};
+
 document.addEventListener('DOMContentLoaded', () => {
-    if (typeof Chart === 'undefined' || !window.dashboardData) return;
-    initStatusChart();
-    initEvolutionChart();
+    if (typeof Chart === 'undefined') return;
+
+    const filtro = document.getElementById('graficosFiltro');
+    if (filtro) {
+        filtro.addEventListener('submit', (event) => {
+            event.preventDefault();
+            carregarGraficosFiltrados();
+        });
+    }
+
+    carregarGraficosFiltrados();
+    buscarJson('/dashboard/api/serie', { granularidade: 'mes' }).then(initMonthlyChart);
+    buscarJson('/dashboard/api/vendedores').then(initVendedorChart);
 });
 
-function initStatusChart() {
-    const canvas = document.getElementById('statusChart');
+function parametrosFiltro() {
+    const filtro = document.getElementById('graficosFiltro');
+    if (!filtro) return {};
+    return Object.fromEntries(new FormData(filtro).entries());
+}
+
+function buscarJson(url, parametros = {}) {
+    const query = new URLSearchParams();
+    Object.entries(parametros).forEach(([chave, valor]) => {
+        if (valor !== '' && valor !== null && valor !== undefined) query.set(chave, valor);
+    });
+    const destino = query.toString() ? `${url}?${query}` : url;
+
+    return fetch(destino, { credentials: 'same-origin' })
+        .then((resposta) => {
+            if (!resposta.ok) throw new Error(`${destino}: HTTP ${resposta.status}`);
+            return resposta.json();
+        })
+        .catch((erro) => {
+            console.error('Erro ao carregar gráfico', erro);
+            return null;
+        });
+}
+
+function carregarGraficosFiltrados() {
+    const parametros = parametrosFiltro();
+    const { granularidade, ...semGranularidade } = parametros;
+
+    buscarJson('/dashboard/api/serie', parametros).then(initEvolutionChart);
+    buscarJson('/dashboard/api/status', semGranularidade).then(initStatusChart);
+    buscarJson('/dashboard/api/lead-time', semGranularidade).then(initLeadTime);
+}
+
+function desenharGrafico(id, config) {
+    const canvas = document.getElementById(id);
     if (!canvas) return;
+    if (graficos[id]) graficos[id].destroy();
+    graficos[id] = new Chart(canvas.getContext('2d'), config);
+}
+
+const TOOLTIP_PADRAO = {
+    backgroundColor: '#1a1a1a',
+    padding: 12,
+    cornerRadius: 8,
+    titleFont: {
+        size: 13,
+        weight: '600'
+    },
+    bodyFont: {
+        size: 14,
+        weight: '700'
+    }
+};
+
+const TICKS_PADRAO = {
+    color: '#6b7280',
+    font: {
+        size: 12,
+        weight: '500'
+    }
+};
 
-    const ctx = canvas.getContext('2d');
-    const data = window.dashboardData.chartStatus;
+function formatarMoeda(valor) {
+    return (valor || 0).toLocaleString('pt-BR', { style: 'currency', currency: 'BRL' });
+}
+
+function initStatusChart(data) {
+    if (!data) return;
 
-    new Chart(ctx, {
+    document.querySelectorAll('[data-status-count]').forEach((el) => {
+        el.textContent = data[el.dataset.statusCount] || 0;
+    });
+
+    desenharGrafico('statusChart', {
         type: 'doughnut',
         data: {
             labels: ['Simulação', 'Cotação', 'Envio'],
@@ -61,20 +140,16 @@ function initStatusChart() {
     });
 }
 
-function initEvolutionChart() {
-    const canvas = document.getElementById('evolutionChart');
-    if (!canvas) return;
-
-    const ctx = canvas.getContext('2d');
-    const data = window.dashboardData.chartEvolution;
+function initEvolutionChart(data) {
+    if (!data) return;
 
-    new Chart(ctx, {
+    desenharGrafico('evolutionChart', {
         type: 'line',
         data: {
-            labels: data.dates || [],
+            labels: data.rotulos || [],
             datasets: [{
                 label: 'Propostas',
-                data: data.counts || [],
+                data: data.quantidades || [],
                 borderColor: '#FF8C00',
                 backgroundColor: 'rgba(255, 140, 0, 0.1)',
                 borderWidth: 3,
@@ -111,7 +186,8 @@ function initEvolutionChart() {
                     },
                     callbacks: {
                         label: function (context) {
-                            return `Propostas: ${context.parsed.y}`;
+                            const valor = (data.valores || [])[context.dataIndex] || 0;
+                            return `Propostas: ${context.parsed.y} (${formatarMoeda(valor)})`;
                         }
                     }
                 }
@@ -153,3 +229,251 @@ function initEvolutionChart() {
         }
     });
 }
+
+function initMonthlyChart(data) {
+    if (!data) return;
+
+    desenharGrafico('monthlyChart', {
+        type: 'bar',
+        data: {
+            labels: data.rotulos || [],
+            datasets: [
+                {
+                    type: 'bar',
+                    label: 'Propostas',
+                    data: data.quantidades || [],
+                    backgroundColor: 'rgba(255, 140, 0, 0.75)',
+                    borderRadius: 6,
+                    yAxisID: 'y'
+                },
+                {
+                    type: 'line',
+                    label: 'Valor',
+                    data: data.valores || [],
+                    borderColor: '#3B82F6',
+                    backgroundColor: '#3B82F6',
+                    borderWidth: 3,
+                    tension: 0.4,
+                    pointRadius: 3,
+                    yAxisID: 'valor'
+                }
+            ]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    display: false
+                },
+                tooltip: {
+                    ...TOOLTIP_PADRAO,
+                    callbacks: {
+                        label: function (context) {
+                            if (context.dataset.yAxisID === 'valor') {
+                                return `Valor: ${formatarMoeda(context.parsed.y)}`;
+                            }
+                            return `Propostas: ${context.parsed.y}`;
+                        }
+                    }
+                }
+            },
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    ticks: TICKS_PADRAO,
+                    grid: {
+                        color: '#e5e7eb',
+                        drawBorder: false
+                    }
+                },
+                valor: {
+                    beginAtZero: true,
+                    position: 'right',
+                    ticks: {
+                        ...TICKS_PADRAO,
+                        callback: (valor) => formatarMoeda(valor)
+                    },
+                    grid: {
+                        display: false
+                    }
+                },
+                x: {
+                    ticks: TICKS_PADRAO,
+                    grid: {
+                        display: false,
+                        drawBorder: false
+                    }
+                }
+            },
+            interaction: {
+                intersect: false,
+                mode: 'index'
+            }
+        }
+    });
+}
+
+function initVendedorChart(data) {
+    if (!data) return;
+
+    desenharGrafico('vendedorChart', {
+        type: 'bar',
+        data: {
+            labels: data.nomes || [],
+            datasets: [{
+                label: 'Valor',
+                data: data.valores || [],
+                backgroundColor: 'rgba(16, 185, 129, 0.8)',
+                borderRadius: 6
+            }]
+        },
+        options: {
+            indexAxis: 'y',
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    display: false
+                },
+                tooltip: {
+                    ...TOOLTIP_PADRAO,
+                    callbacks: {
+                        label: function (context) {
+                            const quantidade = (data.quantidades || [])[context.dataIndex] || 0;
+                            return `${formatarMoeda(context.parsed.x)} (${quantidade} propostas)`;
+                        }
+                    }
+                }
+            },
+            scales: {
+                x: {
+                    beginAtZero: true,
+                    ticks: {
+                        ...TICKS_PADRAO,
+                        callback: (valor) => formatarMoeda(valor)
+                    },
+                    grid: {
+                        color: '#e5e7eb',
+                        drawBorder: false
+                    }
+                },
+                y: {
+                    ticks: TICKS_PADRAO,
+                    grid: {
+                        display: false,
+                        drawBorder: false
+                    }
+                }
+            }
+        }
+    });
+}
+
+const NOMES_ETAPAS = {
+    pendente_simulacao: 'Simulação',
+    pendente_cotacao: 'Cotação',
+    pendente_envio: 'Envio'
+};
+
+const CORES_ETAPAS = {
+    pendente_simulacao: '#FF8C00',
+    pendente_cotacao: '#3B82F6',
+    pendente_envio: '#10B981'
+};
+
+function formatarHoras(horas) {
+    if (horas === null || horas === undefined) return '—';
+    if (horas >= 48) return `${(horas / 24).toFixed(1).replace('.', ',')} d`;
+    return `${horas.toFixed(1).replace('.', ',')} h`;
+}
+
+function escaparHtml(texto) {
+    const div = document.createElement('div');
+    div.textContent = texto;
+    return div.innerHTML;
+}
+
+function initLeadTime(data) {
+    if (!data) return;
+
+    const geral = document.getElementById('leadTimeGeral');
+    if (geral) {
+        geral.innerHTML = data.etapas.map((etapa) => {
+            const r = data.geral[etapa];
+            const foraSla = r.sla_horas !== null && r.mediana_horas !== null && r.mediana_horas > r.sla_horas;
+            const dentro = r.dentro_sla === null ? '—' : `${(r.dentro_sla * 100).toFixed(0)}%`;
+            return `<tr>
+                <td>${NOMES_ETAPAS[etapa]}</td>
+                <td>${r.quantidade}</td>
+                <td class="${foraSla ? 'fora-sla' : ''}">${formatarHoras(r.mediana_horas)}</td>
+                <td>${formatarHoras(r.p90_horas)}</td>
+                <td>${formatarHoras(r.sla_horas)}</td>
+                <td>${dentro}</td>
+            </tr>`;
+        }).join('');
+    }
+
+    const vendedores = document.getElementById('leadTimeVendedores');
+    if (vendedores) {
+        vendedores.innerHTML = data.por_vendedor.map((linha) => `<tr>
+                <td>${escaparHtml(linha.vendedor)}</td>
+                ${data.etapas.map((etapa) => `<td>${formatarHoras(linha[etapa].mediana_horas)} / ${formatarHoras(linha[etapa].p90_horas)}</td>`).join('')}
+            </tr>`).join('') || '<tr><td colspan="4">Sem passagens concluídas no período</td></tr>';
+    }
+
+    desenharGrafico('leadTimeChart', {
+        type: 'line',
+        data: {
+            labels: data.por_semana.map((linha) => linha.semana),
+            datasets: data.etapas.map((etapa) => ({
+                label: `${NOMES_ETAPAS[etapa]} (mediana)`,
+                data: data.por_semana.map((linha) => linha[etapa].mediana_horas),
+                borderColor: CORES_ETAPAS[etapa],
+                backgroundColor: CORES_ETAPAS[etapa],
+                borderWidth: 3,
+                tension: 0.3,
+                spanGaps: true,
+                pointRadius: 3
+            }))
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                tooltip: {
+                    ...TOOLTIP_PADRAO,
+                    callbacks: {
+                        label: function (context) {
+                            return `${context.dataset.label}: ${formatarHoras(context.parsed.y)}`;
+                        }
+                    }
+                }
+            },
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    ticks: {
+                        ...TICKS_PADRAO,
+                        callback: (horas) => formatarHoras(horas)
+                    },
+                    grid: {
+                        color: '#e5e7eb',
+                        drawBorder: false
+                    }
+                },
+                x: {
+                    ticks: TICKS_PADRAO,
+                    grid: {
+                        display: false,
+                        drawBorder: false
+                    }
+                }
+            },
+            interaction: {
+                intersect: false,
+                mode: 'index'
+            }
+        }
+    });
+}
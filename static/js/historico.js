@@ -0,0 +1,26 @@
+// Histórico: "Carregar mais" busca a próxima página de linhas (fragmento HTML
+// paginado por cursor, com os mesmos filtros da URL) e substitui a linha do botão.
+document.addEventListener('click', async (event) => {
+    const botao = event.target.closest('.historico-mais');
+    if (!botao || botao.disabled) return;
+
+    const linhaBotao = botao.closest('tr');
+    const params = new URLSearchParams(window.location.search);
+    params.set('cursor', botao.dataset.cursor);
+
+    botao.disabled = true;
+    botao.textContent = 'Carregando...';
+
+    try {
+        const resp = await fetch(`/propostas/historico/linhas?${params}`, {
+            headers: { 'Accept': 'text/html' },
+        });
+        if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+        linhaBotao.insertAdjacentHTML('beforebegin', await resp.text());
+        linhaBotao.remove();
+    } catch (err) {
+        console.error('Erro ao carregar mais histórico:', err);
+        botao.disabled = false;
+        botao.textContent = 'Carregar mais';
+    }
+});
@@ -0,0 +1,25 @@
+// Kanban: "Carregar mais" busca a próxima página de cards da coluna
+// (fragmento HTML paginado por cursor) e substitui o botão pelo resultado.
+document.addEventListener('click', async (event) => {
+    const botao = event.target.closest('.kanban-mais');
+    if (!botao || botao.disabled) return;
+
+    const params = new URLSearchParams(window.location.search);
+    params.set('cursor', botao.dataset.cursor);
+
+    botao.disabled = true;
+    botao.textContent = 'Carregando...';
+
+    try {
+        const resp = await fetch(`/propostas/kanban/${botao.dataset.status}?${params}`, {
+            headers: { 'Accept': 'text/html' },
+        });
+        if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+        botao.insertAdjacentHTML('beforebegin', await resp.text());
+        botao.remove();
+    } catch (err) {
+        console.error('Erro ao carregar mais propostas:', err);
+        botao.disabled = false;
+        botao.textContent = 'Carregar mais';
+    }
+});
@@ -0,0 +1,224 @@
+"""Fixtures da suíte: banco SQLite temporário semeado e cliente HTTP autenticado.
+
+O ambiente é configurado antes de importar o app: `database.py` lê o
+DATABASE_URL na importação. Se um `.env` local sobrescrever a URL (ele é
+carregado com override), a suíte aborta em vez de escrever no banco errado.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+_DIRETORIO = tempfile.mkdtemp(prefix="fluxoland-testes-")
+_BANCO = os.path.join(_DIRETORIO, "testes.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_BANCO}"
+os.environ["DEBUG"] = "false"
+os.environ["DISABLE_WHATSAPP_NOTIFICATIONS"] = "1"
+os.environ["FLUXOLAND_CACHE_DIR"] = _DIRETORIO  # marcadores e travas isolados dos workers locais
+os.environ["ALERTA_ENVELHECIMENTO_INTERVALO_MIN"] = "0"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import main
+from database import SessionLocal, engine
+from models import (
+    Caixa,
+    Cliente,
+    ContatoNotificacao,
+    CotacaoFrete,
+    Produto,
+    Proposta,
+    PropostaHistorico,
+    PropostaOrigem,
+    PropostaProduto,
+    PropostaStatus,
+    Simulacao,
+    TipoNotificacao,
+    TipoSimulacao,
+    Transportadora,
+    User,
+    UserRole,
+)
+from utils.monitor_sql import ContadorConsultas
+
+if engine.url.database != _BANCO:
+    pytest.exit(f"DATABASE_URL sobrescrito pelo .env ({engine.url}); a suíte só roda no SQLite temporário")
+
+ADMIN_EMAIL = "sac@amferramentas.com.br"
+ADMIN_SENHA = "AmF123"
+
+# Tamanho da base semeada: o bastante para que um lazy load por card/linha estoure o orçamento
+QTD_CLIENTES = 25
+QTD_PRODUTOS = 40
+QTD_PROPOSTAS_POR_STATUS = 12
+QTD_TRANSPORTADORAS = 4
+
+
+# ============================================================================
+# DADOS
+# ============================================================================
+
+def _semear(db) -> dict:
+    """Base determinística com todas as etapas do fluxo; retorna ids usados pelos testes."""
+    rng = random.Random(2024)
+    agora = datetime.utcnow()
+
+    vendedores = [
+        User(nome=f"Vendedor {i}", email=f"vendedor{i}@teste.com", senha_hash="-",
+             telefone=f"554799990000{i}", role=UserRole.usuario)
+        for i in range(1, 4)
+    ]
+    clientes = [Cliente(nome=f"Cliente {i:03d}", documento=f"{i:014d}") for i in range(1, QTD_CLIENTES + 1)]
+    produtos = []
+    for i in range(1, QTD_PRODUTOS + 1):
+        produto = Produto(sku=f"SKU{i:04d}", nome=f"Produto {i}")
+        if i % 3:  # um terço sem medidas (cai em pendente_simulacao na importação)
+            produto.comprimento_cm = rng.randint(10, 120)
+            produto.largura_cm = rng.randint(10, 80)
+            produto.altura_cm = rng.randint(5, 60)
+            produto.peso_unitario_kg = round(rng.uniform(0.5, 40), 2)
+        produtos.append(produto)
+    transportadoras = [Transportadora(nome=f"Transportadora {i}") for i in range(1, QTD_TRANSPORTADORAS + 1)]
+    db.add_all(vendedores + clientes + produtos + transportadoras)
+    db.add_all([
+        Caixa(nome="Caixa P", altura_cm=20, largura_cm=20, comprimento_cm=30),
+        Caixa(nome="Caixa M", altura_cm=40, largura_cm=40, comprimento_cm=50),
+        ContatoNotificacao(nome="Expedição", telefone="5547988887777", tipo=TipoNotificacao.simulacao),
+        ContatoNotificacao(nome="Logística", telefone="5547988886666", tipo=TipoNotificacao.cotacao),
+    ])
+    db.flush()
+
+    ids: dict = {}
+    ordem = list(PropostaStatus)
+    for n in range(QTD_PROPOSTAS_POR_STATUS * len(ordem)):
+        status = ordem[n % len(ordem)]
+        vendedor = vendedores[n % len(vendedores)]
+        criado_em = agora - timedelta(days=rng.randint(0, 60), minutes=rng.randint(0, 600))
+        proposta = Proposta(
+            origem=PropostaOrigem.bling,
+            id_bling=f"bling-{n}",
+            cliente_id=rng.choice(clientes).id,
+            vendedor_id=vendedor.id,
+            responsavel_vendedor=vendedor.nome,
+            responsavel_telefone=vendedor.telefone,
+            status=status,
+            criado_em=criado_em,
+            atualizado_em=criado_em + timedelta(hours=rng.randint(0, 48)),
+            observacao_importacao=f"bling_numero:{5000 + n}; Importado via Bling",
+        )
+        db.add(proposta)
+        db.flush()
+
+        total = 0.0
+        for produto in rng.sample(produtos, rng.randint(1, 6)):
+            quantidade = rng.randint(1, 10)
+            preco = round(rng.uniform(5, 500), 2)
+            total += quantidade * preco
+            db.add(PropostaProduto(
+                proposta_id=proposta.id, produto_id=produto.id, codigo=produto.sku,
+                quantidade=quantidade, preco_unitario=preco, preco_total=quantidade * preco,
+            ))
+        proposta.valor_total = round(total, 2)
+
+        etapas = ordem[: ordem.index(status) + 1] if status != PropostaStatus.cancelada else [ordem[0], status]
+        for passo, etapa in enumerate(etapas):
+            db.add(PropostaHistorico(
+                proposta_id=proposta.id, status=etapa, observacao="semeado",
+                criado_em=criado_em + timedelta(hours=passo * 6),
+            ))
+
+        if status != PropostaStatus.pendente_simulacao:
+            proposta.cubagem_m3 = round(rng.uniform(0.05, 3), 4)
+            proposta.peso_total_kg = round(rng.uniform(1, 400), 2)
+            db.add(Simulacao(proposta_id=proposta.id, tipo=TipoSimulacao.manual, descricao="2 volumes"))
+        if status in (PropostaStatus.pendente_envio, PropostaStatus.concluida):
+            for posicao, transportadora in enumerate(rng.sample(transportadoras, 3)):
+                db.add(CotacaoFrete(
+                    proposta_id=proposta.id, transportadora_id=transportadora.id,
+                    preco=round(rng.uniform(80, 900), 2), prazo_dias=rng.randint(1, 12),
+                    selecionada=posicao == 0,
+                ))
+
+        ids.setdefault(status.value, proposta.id)
+
+    db.commit()
+    ids["transportadoras"] = [t.id for t in transportadoras]
+    return ids
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture(scope="session")
+def app_cliente():
+    """TestClient logado como o admin padrão, com o lifespan (migrations) executado."""
+    with TestClient(main.app) as cliente:
+        resposta = cliente.post("/login", data={"email": ADMIN_EMAIL, "senha": ADMIN_SENHA}, follow_redirects=False)
+        assert resposta.status_code == 302, resposta.text
+        yield cliente
+
+
+@pytest.fixture(scope="session")
+def dados(app_cliente) -> dict:
+    db = SessionLocal()
+    try:
+        return _semear(db)
+    finally:
+        db.close()
+
+
+def _relatorio(contador: ContadorConsultas, rota: str, limite: int) -> str:
+    linhas = [f"{rota}: {contador.quantidade} consultas SQL (orçamento {limite})"]
+    repetidas = contador.repetidas(2)
+    if repetidas:
+        linhas.append("Repetidas:")
+        linhas += [f"  {vezes}x {forma}" for forma, vezes in repetidas]
+    linhas.append("Statements:")
+    linhas += [f"  {i:3d}. {' '.join(sql.split())}" for i, (sql, _) in enumerate(contador.instrucoes, 1)]
+    return "\n".join(linhas)
+
+
+@pytest.fixture
+def orcamento_sql():
+    """`with orcamento_sql("rota", limite):` falha se o bloco executar mais statements que o limite.
+
+    O TestClient processa a requisição em outra thread (o ContextVar do
+    middleware não chega aqui); como as chamadas são síncronas, um listener
+    no engine durante o bloco vê exatamente os statements da requisição.
+    """
+
+    @contextmanager
+    def medir(rota: str, limite: int):
+        contador = ContadorConsultas()
+        inicios: list[float] = []
+
+        def antes(*_):
+            inicios.append(time.perf_counter())
+
+        def depois(conn, cursor, statement, *_):
+            contador.registrar(statement, time.perf_counter() - inicios.pop())
+
+        event.listen(engine, "before_cursor_execute", antes)
+        event.listen(engine, "after_cursor_execute", depois)
+        try:
+            yield contador
+        finally:
+            event.remove(engine, "before_cursor_execute", antes)
+            event.remove(engine, "after_cursor_execute", depois)
+
+        if contador.quantidade > limite:
+            pytest.fail(_relatorio(contador, rota, limite), pytrace=False)
+
+    return medir
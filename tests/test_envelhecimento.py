@@ -0,0 +1,63 @@
+"""Alertas de propostas paradas: interruptor do WhatsApp e cooldown por telefone."""
+
+import uuid
+
+import pytest
+
+from models import PropostaStatus
+from services.envelhecimento_service import EnvelhecimentoService
+from services.whatsapp_service import WhatsAppService
+
+TELEFONES = ["5511900000001", "5511900000002"]
+
+
+@pytest.fixture
+def grupo(monkeypatch):
+    """Um grupo de cotação com dois telefones, chave nova a cada teste (marcadores isolados)."""
+    chave = f"teste-{uuid.uuid4().hex}"
+    monkeypatch.setattr(EnvelhecimentoService, "buscar_paradas", staticmethod(lambda db: []))
+    monkeypatch.setattr(
+        EnvelhecimentoService, "_agrupar",
+        staticmethod(lambda db, paradas: {chave: (PropostaStatus.pendente_cotacao, TELEFONES, [])}),
+    )
+    monkeypatch.setattr(WhatsAppService, "_obter_bot_token", staticmethod(lambda: "token"))
+    return chave
+
+
+def _registrar_envios(monkeypatch, falham=()):
+    envios = []
+
+    def enviar(bot_token, telefone, mensagem):
+        envios.append(telefone)
+        return telefone not in falham
+
+    monkeypatch.setattr(WhatsAppService, "_enviar_mensagem", staticmethod(enviar))
+    return envios
+
+
+def test_notificacoes_desativadas_nao_enviam_alerta(grupo, monkeypatch):
+    envios = _registrar_envios(monkeypatch)
+
+    resumo = EnvelhecimentoService.verificar_e_alertar(None)
+
+    assert envios == []
+    assert resumo[grupo]["enviado"] is False
+
+
+def test_falha_em_um_telefone_repete_so_para_ele(grupo, monkeypatch):
+    monkeypatch.setenv("DISABLE_WHATSAPP_NOTIFICATIONS", "0")
+    envios = _registrar_envios(monkeypatch, falham={TELEFONES[1]})
+
+    primeira = EnvelhecimentoService.verificar_e_alertar(None)
+    assert envios == TELEFONES
+    assert primeira[grupo]["entregues"] == 1
+
+    envios.clear()
+    segunda = EnvelhecimentoService.verificar_e_alertar(None)
+    assert envios == [TELEFONES[1]]
+    assert segunda[grupo]["entregues"] == 0
+
+    # Reenvio com sucesso: o grupo inteiro entra em cooldown
+    monkeypatch.setattr(WhatsAppService, "_enviar_mensagem", staticmethod(lambda *args: True))
+    EnvelhecimentoService.verificar_e_alertar(None)
+    assert EnvelhecimentoService.verificar_e_alertar(None)[grupo]["em_cooldown"] is True
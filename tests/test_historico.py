@@ -0,0 +1,35 @@
+"""Linha do histórico (total zero é exibido, total ausente vira "-") e cursor do "carregar mais"."""
+
+import re
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from models import PropostaStatus
+from services.historico_service import LinhaHistorico
+from templates import templates
+
+
+def _celula_valor(valor_total) -> str:
+    linha = LinhaHistorico(SimpleNamespace(
+        id=1, proposta_id=1, observacao_importacao=None, id_bling="123", cliente_nome="Cliente",
+        valor_total=valor_total, status=PropostaStatus.concluida, criado_em=datetime(2024, 1, 2, 3, 4),
+    ))
+    macro = templates.env.get_template("propostas_historico_linha.html").module.historico_linha
+    return re.findall(r"<td[^>]*>(.*?)</td>", str(macro(linha)), re.S)[2].strip()
+
+
+def test_total_zero_aparece_como_valor():
+    assert _celula_valor(0.0) == templates.env.filters["money"](0.0)
+
+
+def test_total_ausente_aparece_como_traco():
+    assert _celula_valor(None) == "-"
+
+
+@pytest.mark.parametrize("cursor", ["nao-e-base64!", "bm9wZQ", "WzEsMl0", "WyJ4IiwxXQ"])
+def test_cursor_invalido_responde_400(app_cliente, cursor):
+    resposta = app_cliente.get("/propostas/historico/linhas", params={"cursor": cursor})
+
+    assert resposta.status_code == 400
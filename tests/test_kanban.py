@@ -0,0 +1,26 @@
+"""Carregar mais do kanban: cursor válido pagina, cursor adulterado é recusado."""
+
+import pytest
+
+from database import SessionLocal
+from models import PropostaStatus
+from services.kanban_service import KanbanService
+
+
+def test_cursor_valido_traz_a_proxima_pagina(app_cliente, dados):
+    with SessionLocal() as db:
+        primeira, cursor = KanbanService.carregar_pagina(db, PropostaStatus.pendente_envio, limite=5)
+    assert cursor
+
+    resposta = app_cliente.get("/propostas/kanban/pendente_envio", params={"cursor": cursor})
+
+    assert resposta.status_code == 200
+    assert resposta.text.count('class="kanban-card') > 0
+    assert f'href="/propostas/{primeira[0].id}"' not in resposta.text
+
+
+@pytest.mark.parametrize("cursor", ["nao-e-base64!", "bm9wZQ", "WzEsMl0", "WyJ4IiwxXQ"])
+def test_cursor_invalido_responde_400(app_cliente, cursor):
+    resposta = app_cliente.get("/propostas/kanban/pendente_envio", params={"cursor": cursor})
+
+    assert resposta.status_code == 400
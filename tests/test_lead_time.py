@@ -0,0 +1,39 @@
+"""Lead time por etapa: passagens com mudanças de status no mesmo instante."""
+
+from datetime import date, datetime
+
+from database import SessionLocal
+from models import Proposta, PropostaHistorico, PropostaOrigem, PropostaStatus
+from services.lead_time_service import LeadTimeService
+
+
+def test_mudancas_no_mesmo_instante_seguem_a_ordem_de_gravacao(dados):
+    t0, t1, t2 = datetime(2020, 3, 2, 8), datetime(2020, 3, 2, 10), datetime(2020, 3, 2, 15)
+    with SessionLocal() as db:
+        proposta = Proposta(
+            origem=PropostaOrigem.bling, id_bling="lead-time-empate", cliente_id=1,
+            status=PropostaStatus.concluida, criado_em=t0, atualizado_em=t2,
+        )
+        db.add(proposta)
+        db.flush()
+        # Cotação concluída e envio registrado no mesmo commit (mesmo criado_em)
+        for status, instante in (
+            (PropostaStatus.pendente_simulacao, t0),
+            (PropostaStatus.pendente_cotacao, t1),
+            (PropostaStatus.pendente_envio, t1),
+            (PropostaStatus.concluida, t2),
+        ):
+            db.add(PropostaHistorico(proposta_id=proposta.id, status=status, criado_em=instante))
+        db.flush()
+
+        try:
+            passagens = {
+                status: (entrada, saida)
+                for status, entrada, saida, _, _ in LeadTimeService._passagens(db, date(2020, 3, 2), date(2020, 3, 2), None)
+            }
+        finally:
+            db.rollback()
+
+    assert passagens[PropostaStatus.pendente_simulacao] == (t0, t1)
+    assert passagens[PropostaStatus.pendente_cotacao] == (t1, t1)
+    assert passagens[PropostaStatus.pendente_envio] == (t1, t2)
@@ -0,0 +1,65 @@
+"""Memória por rota: amostragem com tracemalloc, página de admin e RSS no /metrics."""
+
+import threading
+import tracemalloc
+
+import pytest
+
+from config import settings
+from utils import memoria as modulo_memoria
+from utils.memoria import memoria
+
+
+@pytest.fixture
+def amostrar_tudo(monkeypatch):
+    monkeypatch.setattr(memoria, "amostragem", 1.0)
+    memoria.limpar()
+    yield
+    memoria.limpar()
+
+
+def test_registra_pico_e_origem_por_rota(app_cliente, dados, amostrar_tudo):
+    assert app_cliente.get(f"/propostas/{dados['pendente_envio']}").status_code == 200
+
+    assert not tracemalloc.is_tracing()
+    rota = next(r for r in memoria.rotas() if r["rota"] == "/propostas/{proposta_id}")
+    assert rota["amostras"] == 1 and rota["pico_max"] > 0
+    assert any(local["origem"].startswith(("routers", "services", "templates")) for local in rota["pior"]["locais"])
+
+    pagina = app_cliente.get("/admin/memoria")
+    assert pagina.status_code == 200
+    assert "GET /propostas/{proposta_id}" in pagina.text
+
+
+def test_agrupa_os_locais_fora_do_event_loop(app_cliente, dados, amostrar_tudo, monkeypatch):
+    threads = []
+    original = modulo_memoria._locais_de_alocacao
+
+    def _locais_de_alocacao(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(modulo_memoria, "_locais_de_alocacao", _locais_de_alocacao)
+
+    assert app_cliente.get(f"/propostas/{dados['pendente_envio']}").status_code == 200
+
+    thread_do_loop = app_cliente.portal.call(threading.get_ident)
+    assert threads and threads[0] != thread_do_loop
+
+
+def test_sem_amostragem_nao_liga_tracemalloc(app_cliente, monkeypatch):
+    monkeypatch.setattr(memoria, "amostragem", 0.0)
+    memoria.limpar()
+
+    app_cliente.get("/propostas/")
+
+    assert memoria.rotas() == []
+
+
+def test_metrics_expoe_rss(app_cliente, monkeypatch):
+    monkeypatch.setattr(settings, "metricas_token", "segredo")
+
+    texto = app_cliente.get("/metrics", headers={"Authorization": "Bearer segredo"}).text
+
+    rss = next(linha for linha in texto.splitlines() if linha.startswith("fluxoland_processo_rss_bytes "))
+    assert int(rss.split()[1]) > 0
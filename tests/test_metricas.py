@@ -0,0 +1,46 @@
+"""Endpoint /metrics: proteção por token e formato de exposição do Prometheus."""
+
+from config import settings
+from utils.metricas import Histograma
+
+
+def test_metrics_sem_token_configurado_nao_existe(app_cliente, monkeypatch):
+    monkeypatch.setattr(settings, "metricas_token", "")
+    assert app_cliente.get("/metrics").status_code == 404
+
+
+def test_metrics_exige_token(app_cliente, monkeypatch):
+    monkeypatch.setattr(settings, "metricas_token", "segredo")
+    assert app_cliente.get("/metrics").status_code == 401
+    assert app_cliente.get("/metrics", headers={"Authorization": "Bearer errado"}).status_code == 401
+    assert app_cliente.get("/metrics", headers={"Authorization": "Bearer \xe9".encode("latin-1")}).status_code == 401
+
+
+def test_metrics_expoe_latencia_por_rota(app_cliente, dados, monkeypatch):
+    monkeypatch.setattr(settings, "metricas_token", "segredo")
+    app_cliente.get(f"/propostas/{dados['pendente_envio']}")
+
+    resposta = app_cliente.get("/metrics", headers={"Authorization": "Bearer segredo"})
+
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'fluxoland_http_requisicao_segundos_count{metodo="GET",rota="/propostas/{proposta_id}",status="200"}' in resposta.text
+    assert "fluxoland_http_requisicoes_em_andamento 0" in resposta.text
+    assert "fluxoland_db_pool_espera_segundos_count" in resposta.text
+
+
+def test_histograma_acumula_faixas():
+    histograma = Histograma("teste_segundos", "Teste.", ("etapa",), limites=(0.1, 1))
+    for valor in (0.05, 0.5, 0.5, 3):
+        histograma.observar(valor, etapa='a"b')
+
+    linhas = histograma.linhas()
+
+    assert linhas[:2] == ["# HELP teste_segundos Teste.", "# TYPE teste_segundos histogram"]
+    assert linhas[2:] == [
+        'teste_segundos_bucket{etapa="a\\"b",le="0.1"} 1',
+        'teste_segundos_bucket{etapa="a\\"b",le="1"} 3',
+        'teste_segundos_bucket{etapa="a\\"b",le="+Inf"} 4',
+        'teste_segundos_sum{etapa="a\\"b"} 4.05',
+        'teste_segundos_count{etapa="a\\"b"} 4',
+    ]
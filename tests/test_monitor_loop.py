@@ -0,0 +1,80 @@
+"""Monitor do event loop e rotas async com o trabalho síncrono no threadpool."""
+
+import asyncio
+import logging
+import threading
+import time
+
+from routers import propostas
+from utils.monitor_loop import MonitorEventLoop
+from utils.perfilador import SessaoPerfil
+
+
+def _segurar_o_loop():
+    time.sleep(0.3)
+
+
+def test_bloqueio_vai_para_o_log_com_a_pilha(caplog):
+    async def cenario():
+        monitor = MonitorEventLoop(limite_ms=100, intervalo_ms=20)
+        monitor.iniciar()
+        await asyncio.sleep(0.05)
+        _segurar_o_loop()
+        await asyncio.sleep(0.05)
+        monitor.parar()
+
+    with caplog.at_level(logging.WARNING, logger="utils.monitor_loop"):
+        asyncio.run(cenario())
+
+    avisos = [r.getMessage() for r in caplog.records if "Event loop bloqueado" in r.getMessage()]
+    assert len(avisos) == 1
+    assert "_segurar_o_loop" in avisos[0]
+
+
+def test_loop_livre_nao_gera_aviso(caplog):
+    async def cenario():
+        monitor = MonitorEventLoop(limite_ms=100, intervalo_ms=20)
+        monitor.iniciar()
+        await asyncio.gather(*(asyncio.to_thread(time.sleep, 0.1) for _ in range(3)))
+        monitor.parar()
+
+    with caplog.at_level(logging.WARNING, logger="utils.monitor_loop"):
+        asyncio.run(cenario())
+
+    assert not [r for r in caplog.records if "Event loop bloqueado" in r.getMessage()]
+
+
+def test_perfil_da_rota_async_inclui_o_trabalho_no_threadpool():
+    sessao = SessaoPerfil({
+        "id": "teste", "rota": "/propostas/{proposta_id}/cotacao", "metodo": "POST",
+        "requisicoes": 1, "intervalo_ms": 50, "criado_em": "", "expira_em": time.time() + 60,
+    })
+
+    assert sessao.reservar(propostas.salvar_cotacao)
+    sessao.parar()
+
+    assert propostas._salvar_cotacao.__code__ in sessao.alvos
+
+
+def test_cotacao_grava_fora_do_event_loop(app_cliente, dados, monkeypatch):
+    threads = []
+    original = propostas._salvar_cotacao
+
+    def _salvar_cotacao(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(propostas, "_salvar_cotacao", _salvar_cotacao)
+    formulario = {
+        "transportadora_id[0]": str(dados["transportadoras"][0]),
+        "preco[0]": "150.00",
+        "prazo_dias[0]": "4",
+    }
+
+    resposta = app_cliente.post(
+        f"/propostas/{dados['pendente_envio']}/cotacao", data=formulario, follow_redirects=False
+    )
+
+    assert resposta.status_code == 303
+    thread_do_loop = app_cliente.portal.call(threading.get_ident)
+    assert threads and threads[0] != thread_do_loop
@@ -0,0 +1,154 @@
+"""Orçamento de consultas SQL das rotas principais.
+
+Cada rota tem um número máximo de statements (autenticação e sessão
+incluídas). Os limites não dependem do tamanho da base: um lazy load de
+`proposta.itens`, `cliente` ou `produto` por card/linha os estoura na hora e
+o teste lista os statements executados. Ao mudar uma rota de propósito,
+ajuste o orçamento aqui junto com a mudança.
+"""
+
+import pytest
+
+from database import SessionLocal
+from models import Proposta
+from services.bling_parser_service import BlingParserService
+from services.dashboard_service import DashboardService
+from services.historico_service import HistoricoService
+
+# Máximo de statements SQL por rota. Nas escritas os INSERTs dos itens entram na conta
+# (o documento de teste tem 9 itens); as buscas por produto não.
+ORCAMENTOS = {
+    "kanban": 3,
+    "kanban_carregar_mais": 2,
+    "detalhe": 5,
+    "dashboard": 5,
+    "historico": 3,
+    "historico_linhas": 2,
+    "importacao_bling": 26,
+    "reimportacao_bling": 29,
+    "cotacao": 16,
+}
+
+
+def test_kanban(app_cliente, dados, orcamento_sql):
+    with orcamento_sql("GET /propostas/", ORCAMENTOS["kanban"]):
+        resposta = app_cliente.get("/propostas/")
+    assert resposta.status_code == 200
+
+
+def test_kanban_carregar_mais(app_cliente, dados, orcamento_sql):
+    with orcamento_sql("GET /propostas/kanban/{status}", ORCAMENTOS["kanban_carregar_mais"]):
+        resposta = app_cliente.get("/propostas/kanban/pendente_envio", params={"vendedor": 2})
+    assert resposta.status_code == 200
+
+
+@pytest.mark.parametrize("status", ["pendente_simulacao", "pendente_envio", "concluida"])
+def test_detalhe_proposta(app_cliente, dados, orcamento_sql, status):
+    with orcamento_sql(f"GET /propostas/{{id}} ({status})", ORCAMENTOS["detalhe"]):
+        resposta = app_cliente.get(f"/propostas/{dados[status]}")
+    assert resposta.status_code == 200
+
+
+def test_dashboard(app_cliente, dados, orcamento_sql):
+    DashboardService.invalidar_cache()  # mede o painel montado do zero, não o cache
+    with orcamento_sql("GET /dashboard/", ORCAMENTOS["dashboard"]):
+        resposta = app_cliente.get("/dashboard/")
+    assert resposta.status_code == 200
+
+
+def test_historico(app_cliente, dados, orcamento_sql):
+    with orcamento_sql("GET /propostas/historico", ORCAMENTOS["historico"]):
+        resposta = app_cliente.get("/propostas/historico")
+    assert resposta.status_code == 200
+
+
+def test_historico_proxima_pagina(app_cliente, dados, orcamento_sql):
+    with SessionLocal() as db:
+        _, cursor = HistoricoService.carregar_pagina(db)
+    assert cursor, "a base semeada deve ter mais de uma página de histórico"
+
+    with orcamento_sql("GET /propostas/historico/linhas", ORCAMENTOS["historico_linhas"]):
+        resposta = app_cliente.get("/propostas/historico/linhas", params={"cursor": cursor})
+    assert resposta.status_code == 200
+
+
+DOCUMENTO_BLING = {
+    "id_bling": "hash-teste-importacao",
+    "cliente": {"nome": "Cliente 007", "documento": "00000000000007"},
+    "pedido": {"numero": "9901"},
+    "itens": [
+        {"sku": f"SKU{i:04d}", "codigo": f"SKU{i:04d}", "nome": f"Produto {i}",
+         "quantidade": i, "preco_unitario": 10.0, "preco_total": 10.0 * i}
+        for i in range(1, 9)
+    ] + [
+        {"sku": "SKU-NOVO-1", "codigo": "SKU-NOVO-1", "nome": "Produto novo",
+         "quantidade": 1, "preco_unitario": 99.0, "preco_total": 99.0},
+    ],
+}
+
+# Documento próprio da reimportação (outro id_bling): o teste não depende da ordem
+DOCUMENTO_REIMPORTACAO = {**DOCUMENTO_BLING, "id_bling": "hash-teste-reimportacao", "pedido": {"numero": "9902"}}
+
+# Reimportação com os preços alterados no Bling: o total gravado tem de acompanhar
+DOCUMENTO_REIMPORTACAO_ALTERADO = {
+    **DOCUMENTO_REIMPORTACAO,
+    "itens": [
+        {**item, "preco_unitario": item["preco_unitario"] * 2, "preco_total": item["preco_total"] * 2}
+        for item in DOCUMENTO_REIMPORTACAO["itens"]
+    ],
+}
+
+
+def _postar_importacao(app_cliente, monkeypatch, documento: dict):
+    # O parser baixa o doc.view do Bling; aqui o documento já vem pronto
+    monkeypatch.setattr(BlingParserService, "parse_doc_view", staticmethod(lambda link: documento))
+    return app_cliente.post(
+        "/integracoes/bling/importar/",
+        data={"link_bling": f"https://www.bling.com.br/doc.view.php?id={documento['id_bling']}"},
+        follow_redirects=False,
+    )
+
+
+def _conferir_proposta_importada(documento: dict):
+    with SessionLocal() as db:
+        proposta = db.query(Proposta).filter(Proposta.id_bling == documento["id_bling"]).one()
+        itens = {item.codigo: (item.quantidade, item.preco_total) for item in proposta.itens}
+        assert itens == {item["codigo"]: (item["quantidade"], item["preco_total"]) for item in documento["itens"]}
+        assert proposta.valor_total == pytest.approx(sum(item["preco_total"] for item in documento["itens"]))
+
+
+def _importar(app_cliente, orcamento_sql, monkeypatch, rota: str, limite: int, documento: dict):
+    with orcamento_sql(rota, limite):
+        resposta = _postar_importacao(app_cliente, monkeypatch, documento)
+    assert resposta.status_code == 303
+    assert "erro" not in resposta.headers["location"]
+    _conferir_proposta_importada(documento)
+
+
+def test_importacao_bling(app_cliente, dados, orcamento_sql, monkeypatch):
+    _importar(app_cliente, orcamento_sql, monkeypatch,
+              "POST /integracoes/bling/importar/ (nova)", ORCAMENTOS["importacao_bling"], DOCUMENTO_BLING)
+
+
+def test_reimportacao_bling(app_cliente, dados, orcamento_sql, monkeypatch):
+    # Primeira importação fora do orçamento; a medida é a do mesmo id_bling de novo,
+    # que atualiza a proposta existente e recria os itens
+    assert _postar_importacao(app_cliente, monkeypatch, DOCUMENTO_REIMPORTACAO).status_code == 303
+    _conferir_proposta_importada(DOCUMENTO_REIMPORTACAO)
+
+    _importar(app_cliente, orcamento_sql, monkeypatch, "POST /integracoes/bling/importar/ (existente)",
+              ORCAMENTOS["reimportacao_bling"], DOCUMENTO_REIMPORTACAO_ALTERADO)
+
+
+def test_cotacao(app_cliente, dados, orcamento_sql):
+    formulario = {"action": "concluir"}
+    for i, transportadora_id in enumerate(dados["transportadoras"]):
+        formulario[f"transportadora_id[{i}]"] = str(transportadora_id)
+        formulario[f"preco[{i}]"] = f"{150 + i * 10:.2f}"
+        formulario[f"prazo_dias[{i}]"] = str(3 + i)
+
+    with orcamento_sql("POST /propostas/{id}/cotacao", ORCAMENTOS["cotacao"]):
+        resposta = app_cliente.post(
+            f"/propostas/{dados['pendente_cotacao']}/cotacao", data=formulario, follow_redirects=False
+        )
+    assert resposta.status_code == 303
@@ -0,0 +1,44 @@
+"""Perfilador sob demanda: armar pela página de admin, perfilar N requisições e ver o resultado."""
+
+from utils.perfilador import listar_perfis, perfilador
+
+
+def test_perfila_as_proximas_requisicoes_da_rota(app_cliente, dados):
+    resposta = app_cliente.post(
+        "/admin/perfis",
+        data={"rota": "GET /propostas/{proposta_id}", "requisicoes": 3, "intervalo_ms": 1},
+        follow_redirects=False,
+    )
+    assert resposta.status_code == 303
+    assert perfilador.pedido_atual()["rota"] == "/propostas/{proposta_id}"
+
+    # Outra rota não consome as vagas do pedido
+    assert app_cliente.get("/propostas/").status_code == 200
+    for status in ("pendente_simulacao", "pendente_envio", "concluida"):
+        assert app_cliente.get(f"/propostas/{dados[status]}").status_code == 200
+
+    assert perfilador.pedido_atual() is None
+    perfil = listar_perfis()[0]
+    assert (perfil["metodo"], perfil["rota"], perfil["requisicoes"]) == ("GET", "/propostas/{proposta_id}", 3)
+
+    pilhas = app_cliente.get(f"/admin/perfis/{perfil['id']}/pilhas.txt")
+    assert pilhas.status_code == 200
+    for linha in pilhas.text.splitlines():
+        pilha, quantidade = linha.rsplit(" ", 1)
+        assert pilha.startswith("routers.propostas:detalhe_proposta")
+        assert int(quantidade) > 0
+
+    pagina = app_cliente.get(f"/admin/perfis/{perfil['id']}")
+    assert pagina.status_code == 200
+    assert "GET /propostas/{proposta_id}" in pagina.text
+
+
+def test_cancelar_descarta_pedido(app_cliente):
+    app_cliente.post("/admin/perfis", data={"rota": "GET /propostas/", "requisicoes": 5}, follow_redirects=False)
+    assert perfilador.pedido_atual() is not None
+
+    app_cliente.post("/admin/perfis/cancelar", follow_redirects=False)
+
+    assert perfilador.pedido_atual() is None
+    assert app_cliente.get("/propostas/").status_code == 200
+    assert perfilador.sessao is None
@@ -0,0 +1,88 @@
+"""Spans da importação do Bling: árvore de etapas, log de importação lenta e trace id nos logs."""
+
+import json
+import logging
+
+import requests
+
+from config import settings
+from utils import rastreamento
+from utils.rastreamento import ExportadorArquivo, instalar_trace_id_nos_logs, span, trace_id_atual
+
+DOC_VIEW_HTML = """<html><body>
+<p>Vendedor: Vendedor Rastro</p>
+<div><p>Para:</p><p>Cliente Rastro</p><p>CNPJ: 11.222.333/0001-44</p><p>Joinville - SC 89200-000</p></div>
+<table>
+<tr><th>Código</th><th>Descrição</th><th>Qtde</th><th>Preço un.</th><th>Total</th></tr>
+<tr><td>SKU0001</td><td>Produto 1</td><td>2</td><td>10,00</td><td>20,00</td></tr>
+<tr><td>SKU-RASTRO</td><td>Produto novo</td><td>1</td><td>5,00</td><td>5,00</td></tr>
+</table>
+</body></html>"""
+
+
+class _RespostaBling:
+    status_code = 200
+    text = DOC_VIEW_HTML
+    content = DOC_VIEW_HTML.encode()
+
+    def raise_for_status(self):
+        pass
+
+
+def _nomes(arvore: dict) -> list[str]:
+    return [arvore["nome"]] + [nome for filho in arvore["filhos"] for nome in _nomes(filho)]
+
+
+def test_importacao_gera_arvore_e_log_de_lentidao(app_cliente, dados, monkeypatch, tmp_path, caplog):
+    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: _RespostaBling())
+    monkeypatch.setattr(settings, "importacao_lenta_ms", 0)
+    monkeypatch.setattr(rastreamento, "_exportadores", [ExportadorArquivo(str(tmp_path / "rastros.jsonl"))])
+
+    with caplog.at_level(logging.WARNING, logger="utils.rastreamento"):
+        resposta = app_cliente.post(
+            "/propostas/nova",
+            data={"link_bling": "https://www.bling.com.br/doc.view.php?id=hash-teste-rastro"},
+            follow_redirects=False,
+        )
+    assert resposta.status_code == 303
+
+    rastro = json.loads((tmp_path / "rastros.jsonl").read_text(encoding="utf-8"))
+    nomes = _nomes(rastro)
+    assert nomes[0] == "importacao"
+    for etapa in ("bling.download", "bling.parse_html", "bling.extracao", "importacao.cliente",
+                  "importacao.produtos", "importacao.referencia", "proposta.atualizar_status",
+                  "status.historico", "importacao.commit"):
+        assert etapa in nomes
+
+    (lento,) = [r for r in caplog.records if "importacao lento" in r.getMessage()]
+    assert "importacao.produtos" in lento.getMessage()
+    assert lento.trace_id == rastro["trace_id"]
+
+
+def test_span_decorador_vira_filho_e_registra_erro():
+    @span("filho")
+    def falha():
+        raise ValueError("quebrou")
+
+    with span("raiz") as raiz:
+        try:
+            falha()
+        except ValueError:
+            pass
+        assert trace_id_atual() == raiz.trace_id
+
+    (filho,) = raiz.filhos
+    assert filho.nome == "filho"
+    assert filho.trace_id == raiz.trace_id
+    assert filho.erro == "ValueError: quebrou"
+    assert trace_id_atual() is None
+
+
+def test_trace_id_nos_logs(caplog):
+    instalar_trace_id_nos_logs()
+    with caplog.at_level(logging.INFO):
+        logging.getLogger("teste").info("fora")
+        with span("raiz") as raiz:
+            logging.getLogger("teste").info("dentro")
+
+    assert [r.trace_id for r in caplog.records] == ["-", raiz.trace_id]
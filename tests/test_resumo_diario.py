@@ -0,0 +1,31 @@
+"""Resumo diário: falha ao recalcular um dia é repetida antes de desistir."""
+
+from sqlalchemy.exc import OperationalError
+
+from database import SessionLocal
+from models import Proposta, PropostaResumoDiario
+from services.resumo_diario_service import ResumoDiarioService
+
+
+def test_falha_na_primeira_tentativa_e_repetida(dados, monkeypatch):
+    original = ResumoDiarioService.reconstruir
+    tentativas = []
+
+    def reconstruir(db, inicio, fim):
+        tentativas.append(inicio)
+        if len(tentativas) == 1:
+            raise OperationalError("DELETE FROM propostas_resumo_diario", {}, Exception("database is locked"))
+        return original(db, inicio, fim)
+
+    monkeypatch.setattr(ResumoDiarioService, "reconstruir", staticmethod(reconstruir))
+
+    with SessionLocal() as db:
+        proposta = db.get(Proposta, dados["pendente_envio"])
+        dia = proposta.criado_em.date()
+        db.query(PropostaResumoDiario).filter(PropostaResumoDiario.dia == dia).delete()
+
+        ResumoDiarioService.atualizar_dia(db, dia)
+
+        assert len(tentativas) == 2
+        assert db.query(PropostaResumoDiario).filter(PropostaResumoDiario.dia == dia).count() > 0
+        db.rollback()
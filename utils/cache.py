@@ -0,0 +1,180 @@
+"""Caches em memória do processo e sinalização de invalidação entre workers."""
+
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows (desenvolvimento): trava só dentro do processo
+    fcntl = None
+
+
+def _diretorio_marcadores() -> str:
+    return os.getenv("FLUXOLAND_CACHE_DIR") or tempfile.gettempdir()
+
+
+class MarcadorInvalidacao:
+    """Geração compartilhada entre os workers da mesma máquina.
+
+    Cada worker guarda a geração vista ao popular seu cache. `invalidar()`
+    avança o mtime de um arquivo de marcação; os demais workers percebem a
+    mudança na próxima chamada de `geracao()`, que custa apenas um `os.stat`
+    (nenhuma consulta ao banco).
+    """
+
+    def __init__(self, nome: str):
+        self.caminho = os.path.join(_diretorio_marcadores(), f"fluxoland-{nome}.marcador")
+        self._lock = threading.Lock()
+
+    def geracao(self) -> int:
+        try:
+            return os.stat(self.caminho).st_mtime_ns
+        except OSError:
+            return 0
+
+    def invalidar(self) -> int:
+        """Avança a geração (monotônica mesmo com relógio de baixa resolução)."""
+        with self._lock:
+            nova = max(time.time_ns(), self.geracao() + 1)
+            try:
+                with open(self.caminho, "a"):
+                    pass
+                os.utime(self.caminho, ns=(nova, nova))
+            except OSError:
+                # Sem diretório gravável a invalidação fica restrita ao processo atual.
+                return 0
+            return nova
+
+
+class TravaArquivo:
+    """Trava exclusiva entre processos da mesma máquina (flock não bloqueante).
+
+    Usada para que só um worker execute tarefas periódicas. O sistema
+    operacional libera a trava se o processo morrer.
+    """
+
+    def __init__(self, nome: str):
+        self.caminho = os.path.join(_diretorio_marcadores(), f"fluxoland-{nome}.lock")
+        self._lock = threading.Lock()
+        self._arquivo = None
+
+    def tentar(self, esperar: bool = False) -> bool:
+        """Adquire a trava se estiver livre; retorna False (sem esperar) se outro processo a detém.
+
+        Com `esperar=True` bloqueia até a trava ser liberada.
+        """
+        if not self._lock.acquire(blocking=esperar):
+            return False
+        try:
+            self._arquivo = open(self.caminho, "a")
+            if fcntl is not None:
+                fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_EX if esperar else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+            self._lock.release()
+            return False
+
+    def liberar(self) -> None:
+        if self._arquivo is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_UN)
+            self._arquivo.close()
+        finally:
+            self._arquivo = None
+            self._lock.release()
+
+
+# ==========================================================
+# CACHE COM TTL
+# ==========================================================
+
+_registro: dict[str, "CacheTTL"] = {}
+
+
+class CacheTTL:
+    """Cache por chave com expiração (TTL) e invalidação por evento.
+
+    - Entradas expiram após `ttl` segundos ou quando a geração do marcador
+      muda (invalidação vinda de qualquer worker).
+    - Requisições simultâneas para a mesma chave expirada esperam uma única
+      recomputação ("single-flight") em vez de recalcular cada uma.
+    - Contadores de acerto/erro ficam disponíveis em `estatisticas()`.
+    """
+
+    def __init__(self, nome: str, ttl: float, marcador: MarcadorInvalidacao | None = None):
+        self.nome = nome
+        self.ttl = ttl
+        self.marcador = marcador or MarcadorInvalidacao(f"cache-{nome}")
+        self._lock = threading.Lock()
+        self._locks_chave: dict = {}
+        self._entradas: dict = {}  # chave -> (valor, expira_em, geracao)
+        self._contadores = {"hits": 0, "misses": 0, "aguardou": 0, "invalidacoes": 0}
+        _registro[nome] = self
+
+    def _valida(self, chave, agora: float, geracao: int):
+        entrada = self._entradas.get(chave)
+        if entrada is None:
+            return None
+        _, expira_em, geracao_entrada = entrada
+        if agora >= expira_em or geracao_entrada != geracao:
+            return None
+        return entrada
+
+    def obter(self, chave, carregar):
+        """Valor em cache para `chave` ou o resultado de `carregar()` (armazenado)."""
+        geracao = self.marcador.geracao()
+
+        with self._lock:
+            entrada = self._valida(chave, time.monotonic(), geracao)
+            if entrada is not None:
+                self._contadores["hits"] += 1
+                return entrada[0]
+            lock_chave = self._locks_chave.setdefault(chave, threading.Lock())
+
+        with lock_chave:
+            # Outra thread pode ter recalculado enquanto esperávamos
+            with self._lock:
+                entrada = self._valida(chave, time.monotonic(), geracao)
+                if entrada is not None:
+                    self._contadores["aguardou"] += 1
+                    return entrada[0]
+                self._contadores["misses"] += 1
+
+            valor = carregar()
+
+            with self._lock:
+                self._entradas[chave] = (valor, time.monotonic() + self.ttl, geracao)
+            return valor
+
+    def invalidar(self) -> None:
+        """Descarta todas as entradas neste processo e sinaliza os demais workers."""
+        with self._lock:
+            self._entradas.clear()
+            self._contadores["invalidacoes"] += 1
+        self.marcador.invalidar()
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            contadores = dict(self._contadores)
+            entradas = len(self._entradas)
+        consultas = contadores["hits"] + contadores["aguardou"] + contadores["misses"]
+        acertos = contadores["hits"] + contadores["aguardou"]
+        return {
+            "nome": self.nome,
+            "ttl_segundos": self.ttl,
+            "entradas": entradas,
+            **contadores,
+            "taxa_acerto": round(acertos / consultas, 4) if consultas else None,
+        }
+
+
+def estatisticas_caches() -> list[dict]:
+    """Estatísticas de todos os caches TTL criados neste processo."""
+    return [cache.estatisticas() for cache in _registro.values()]
@@ -0,0 +1,287 @@
+"""Memória por rota: pico e locais de alocação de requisições amostradas, mais o RSS do processo.
+
+As instâncias gratuitas do Render morrem por OOM ao passar de 512 MB, e as
+páginas que carregam tudo (histórico, simulações, kanban com itens) são as
+candidatas. Com `MEMORIA_AMOSTRAGEM` > 0, essa fração das requisições roda
+com o `tracemalloc` ligado (uma por vez no processo) e registra:
+
+- o pico alocado pelo Python durante a requisição;
+- a variação do RSS do processo;
+- as alocações vivas quando a resposta começa (template renderizado, objetos
+  do ORM), agrupadas pela linha do projeto que as originou.
+
+O `tracemalloc` deixa a requisição amostrada algumas vezes mais lenta; as
+demais não pagam nada além de um `random()`. Como as alocações das outras
+threads entram na conta, o pico de uma requisição concorrente é aproximado.
+
+O RSS atual e o pico vão para o /metrics; o detalhe por rota, para a página
+/admin/memoria.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+
+from starlette.concurrency import run_in_threadpool
+
+from utils.metricas import REGISTRO, Histograma, Medidor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Amostras recentes mostradas na página de admin
+MAX_RECENTES = 30
+# Locais de alocação guardados por amostra
+MAX_LOCAIS = 10
+
+_IGNORAR_ARQUIVOS = frozenset((tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", "<unknown>"))
+
+
+# ============================================================================
+# RSS DO PROCESSO
+# ============================================================================
+
+def rss_pico_bytes() -> int:
+    """Maior RSS do processo até agora (ru_maxrss)."""
+    if resource is None:
+        raise OSError("resource indisponível nesta plataforma")
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS, em bytes
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+def rss_bytes() -> int:
+    """RSS atual (Linux: /proc/self/statm); fora do Linux, o pico."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as arquivo:
+            paginas = int(arquivo.read().split()[1])
+    except OSError:
+        return rss_pico_bytes()
+    return paginas * os.sysconf("SC_PAGE_SIZE")
+
+
+PROCESSO_RSS = REGISTRO.registrar(Medidor(
+    "fluxoland_processo_rss_bytes",
+    "Memória residente do processo (RSS).",
+    coletar=rss_bytes,
+))
+PROCESSO_RSS_PICO = REGISTRO.registrar(Medidor(
+    "fluxoland_processo_rss_pico_bytes",
+    "Maior RSS do processo desde o início.",
+    coletar=rss_pico_bytes,
+))
+REQUISICAO_MEMORIA_PICO = REGISTRO.registrar(Histograma(
+    "fluxoland_http_requisicao_memoria_pico_bytes",
+    "Pico de memória alocada pelo Python nas requisições amostradas (MEMORIA_AMOSTRAGEM).",
+    ("metodo", "rota"),
+    limites=tuple(mb * 1024 * 1024 for mb in (0.25, 1, 4, 16, 32, 64, 128, 256)),
+))
+
+
+# ============================================================================
+# MEDIÇÃO DE UMA REQUISIÇÃO
+# ============================================================================
+
+@lru_cache(maxsize=4096)
+def _nome_arquivo(caminho: str) -> str:
+    if caminho.startswith(PROJECT_ROOT + os.sep):
+        return os.path.relpath(caminho, PROJECT_ROOT)
+    if "site-packages" + os.sep in caminho:
+        return caminho.split("site-packages" + os.sep, 1)[1]
+    return os.path.basename(caminho)
+
+
+@lru_cache(maxsize=4096)
+def _do_projeto(caminho: str) -> bool:
+    return caminho.startswith(PROJECT_ROOT + os.sep) and "site-packages" not in caminho and f"{os.sep}.venv" not in caminho
+
+
+def _locais_de_alocacao(snapshot: tracemalloc.Snapshot, limite: int = MAX_LOCAIS) -> list[dict]:
+    """Alocações vivas agrupadas por (linha do projeto que originou, linha que alocou)."""
+    grupos: dict[tuple[str, str], list[int]] = {}
+    for estatistica in snapshot.statistics("traceback"):
+        frames = list(estatistica.traceback)  # do mais antigo para o mais recente
+        alocou = frames[-1]
+        if alocou.filename in _IGNORAR_ARQUIVOS:
+            continue
+        origem = next((frame for frame in reversed(frames) if _do_projeto(frame.filename)), None)
+        chave = (
+            f"{_nome_arquivo(origem.filename)}:{origem.lineno}" if origem else "—",
+            f"{_nome_arquivo(alocou.filename)}:{alocou.lineno}",
+        )
+        grupo = grupos.setdefault(chave, [0, 0])
+        grupo[0] += estatistica.size
+        grupo[1] += estatistica.count
+    maiores = sorted(grupos.items(), key=lambda item: item[1][0], reverse=True)[:limite]
+    return [
+        {"origem": origem, "alocacao": alocacao, "bytes": tamanho, "blocos": blocos}
+        for (origem, alocacao), (tamanho, blocos) in maiores
+    ]
+
+
+class _MedicaoRequisicao:
+    """tracemalloc ligado do início ao fim de uma requisição."""
+
+    def __init__(self, quadros: int):
+        self.quadros = quadros
+        self.ja_ligado = tracemalloc.is_tracing()
+        self.snapshot: tracemalloc.Snapshot | None = None
+
+    def iniciar(self) -> None:
+        if not self.ja_ligado:
+            tracemalloc.start(self.quadros)
+        tracemalloc.reset_peak()
+        self.base, _ = tracemalloc.get_traced_memory()
+        self.rss_inicio = rss_bytes()
+        self.inicio = time.perf_counter()
+
+    def registrar_locais(self) -> None:
+        """Chamado no início da resposta: o que a requisição ainda segura."""
+        # Só copia os traces: agrupar com o tracemalloc ligado rastrearia a própria análise (10x mais lento)
+        self.snapshot = tracemalloc.take_snapshot()
+
+    def encerrar(self) -> dict:
+        """Pico, RSS e duração ao fim da resposta (rápido: roda no event loop)."""
+        duracao = time.perf_counter() - self.inicio
+        _, pico = tracemalloc.get_traced_memory()
+        if not self.ja_ligado:
+            tracemalloc.stop()
+        return {
+            "pico_bytes": max(0, pico - self.base),
+            "rss_delta_bytes": rss_bytes() - self.rss_inicio,
+            "duracao_ms": duracao * 1000,
+        }
+
+    def locais(self) -> list[dict]:
+        """Agrupa o snapshot (centenas de ms em respostas grandes: rode fora do event loop)."""
+        return _locais_de_alocacao(self.snapshot) if self.snapshot else []
+
+
+# ============================================================================
+# ACOMPANHAMENTO POR ROTA
+# ============================================================================
+
+class AcompanhamentoMemoria:
+    """Configuração da amostragem e resultados agregados por rota (do processo)."""
+
+    def __init__(self):
+        self.amostragem = 0.0
+        self.quadros = 25
+        self.alerta_bytes = 0
+        self._medindo = threading.Lock()
+        self._lock = threading.Lock()
+        self._rotas: dict[tuple[str, str], dict] = {}
+        self._recentes: deque[dict] = deque(maxlen=MAX_RECENTES)
+
+    def configurar(self, amostragem: float, quadros: int = 25, alerta_mb: float = 0) -> None:
+        self.amostragem = max(0.0, min(amostragem, 1.0))
+        self.quadros = max(1, quadros)
+        self.alerta_bytes = int(alerta_mb * 1024 * 1024)
+
+    def sortear(self) -> bool:
+        return self.amostragem > 0 and random.random() < self.amostragem
+
+    def registrar(self, metodo: str, rota: str, status: int, medicao: dict) -> None:
+        amostra = {
+            "metodo": metodo,
+            "rota": rota,
+            "status": status,
+            "em": datetime.now().strftime("%d/%m %H:%M:%S"),
+            **medicao,
+        }
+        REQUISICAO_MEMORIA_PICO.observar(amostra["pico_bytes"], metodo=metodo, rota=rota)
+
+        with self._lock:
+            self._recentes.appendleft(amostra)
+            agregado = self._rotas.setdefault((metodo, rota), {
+                "metodo": metodo, "rota": rota, "amostras": 0, "pico_soma": 0,
+                "pico_max": 0, "rss_delta_max": 0, "pior": None,
+            })
+            agregado["amostras"] += 1
+            agregado["pico_soma"] += amostra["pico_bytes"]
+            agregado["rss_delta_max"] = max(agregado["rss_delta_max"], amostra["rss_delta_bytes"])
+            if agregado["pior"] is None or amostra["pico_bytes"] >= agregado["pico_max"]:
+                agregado["pico_max"] = amostra["pico_bytes"]
+                agregado["pior"] = amostra
+
+        if self.alerta_bytes and amostra["pico_bytes"] > self.alerta_bytes:
+            locais = ", ".join(f"{l['origem']} ({l['bytes'] / 1048576:.1f} MB)" for l in amostra["locais"][:3])
+            logger.warning(
+                f"Memória: {metodo} {rota} alocou {amostra['pico_bytes'] / 1048576:.1f} MB no pico "
+                f"(RSS {amostra['rss_delta_bytes'] / 1048576:+.1f} MB). Maiores origens: {locais or '—'}"
+            )
+
+    def rotas(self) -> list[dict]:
+        """Rotas amostradas, da maior para a menor em pico."""
+        with self._lock:
+            linhas = [dict(agregado) for agregado in self._rotas.values()]
+        for linha in linhas:
+            linha["pico_medio"] = linha["pico_soma"] / linha["amostras"]
+        return sorted(linhas, key=lambda linha: linha["pico_max"], reverse=True)
+
+    def recentes(self) -> list[dict]:
+        with self._lock:
+            return list(self._recentes)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._rotas.clear()
+            self._recentes.clear()
+
+
+memoria = AcompanhamentoMemoria()
+
+
+class MemoriaMiddleware:
+    """Middleware ASGI: mede a memória das requisições sorteadas (uma por vez no processo)."""
+
+    def __init__(self, app, ignorar: tuple[str, ...] = ("/static/", "/metrics", "/admin/memoria")):
+        self.app = app
+        self.ignorar = ignorar
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["path"].startswith(self.ignorar)
+            or not memoria.sortear()
+            or not memoria._medindo.acquire(blocking=False)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            medicao = _MedicaoRequisicao(memoria.quadros)
+            status = 500
+
+            async def enviar(mensagem):
+                nonlocal status
+                if mensagem["type"] == "http.response.start":
+                    status = mensagem["status"]
+                    medicao.registrar_locais()
+                await send(mensagem)
+
+            medicao.iniciar()
+            try:
+                await self.app(scope, receive, enviar)
+            finally:
+                rota = getattr(scope.get("route"), "path", "<sem rota>")
+                resultado = medicao.encerrar()
+                resultado["locais"] = await run_in_threadpool(medicao.locais)
+                memoria.registrar(scope["method"], rota, status, resultado)
+        finally:
+            memoria._medindo.release()
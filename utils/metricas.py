@@ -0,0 +1,317 @@
+"""Métricas no formato texto do Prometheus (contadores, medidores e histogramas).
+
+Registro próprio e sem dependências: cada observação custa um lock e uma
+busca binária nos limites do histograma. Os valores são do processo: com
+vários workers do uvicorn, cada raspagem vê só o worker que a atendeu (para
+números completos, um worker por porta/instância no Prometheus).
+
+    REQUISICOES_EM_ANDAMENTO.inc()
+    with IMPORTACAO_ETAPA.medir(etapa="download"):
+        ...
+    REGISTRO.exportar()   # texto para o /metrics
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator
+
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+# Segundos: de 5 ms (consulta simples) a 30 s (importação com Bling lento)
+LIMITES_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes: tuple[str, ...], valores: tuple[str, ...], extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+# ============================================================================
+# TIPOS DE MÉTRICA
+# ============================================================================
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+        self._valores: dict[tuple[str, ...], object] = {}
+
+    def _chave(self, rotulos: dict) -> tuple[str, ...]:
+        if len(rotulos) != len(self.rotulos):
+            raise ValueError(f"{self.nome}: rótulos esperados {self.rotulos}, recebidos {tuple(rotulos)}")
+        return tuple(str(rotulos[nome]) for nome in self.rotulos)
+
+    def linhas(self) -> list[str]:
+        cabecalho = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        with self._lock:
+            itens = list(self._valores.items())
+        return cabecalho + [linha for chave, valor in sorted(itens) for linha in self._amostras(chave, valor)]
+
+    def _amostras(self, chave: tuple[str, ...], valor) -> list[str]:
+        return [f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}"]
+
+
+class Contador(_Metrica):
+    """Valor que só cresce (eventos, falhas)."""
+
+    tipo = "counter"
+
+    def inc(self, valor: float = 1, **rotulos) -> None:
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+
+class Medidor(_Metrica):
+    """Valor instantâneo; com `coletar`, é lido na hora da exportação (sem rótulos)."""
+
+    tipo = "gauge"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...] = (), coletar: Callable[[], float] | None = None):
+        super().__init__(nome, ajuda, rotulos)
+        self.coletar = coletar
+
+    def set(self, valor: float, **rotulos) -> None:
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = valor
+
+    def inc(self, valor: float = 1, **rotulos) -> None:
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def dec(self, valor: float = 1, **rotulos) -> None:
+        self.inc(-valor, **rotulos)
+
+    def linhas(self) -> list[str]:
+        if self.coletar is not None:
+            try:
+                self.set(self.coletar())
+            except Exception as e:  # métrica indisponível não derruba o /metrics
+                logger.debug(f"Métrica {self.nome} indisponível: {e}")
+        return super().linhas()
+
+
+class Histograma(_Metrica):
+    """Distribuição de durações (s) em faixas cumulativas, com soma e contagem."""
+
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...] = (), limites: tuple[float, ...] = LIMITES_PADRAO):
+        super().__init__(nome, ajuda, rotulos)
+        self.limites = tuple(sorted(limites))
+
+    def observar(self, valor: float, **rotulos) -> None:
+        chave = self._chave(rotulos)
+        faixa = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._valores.get(chave)
+            if serie is None:
+                # [contagem por faixa (a última é +Inf), soma]
+                serie = self._valores[chave] = [[0] * (len(self.limites) + 1), 0.0]
+            serie[0][faixa] += 1
+            serie[1] += valor
+
+    @contextmanager
+    def medir(self, **rotulos) -> Iterator[None]:
+        """Observa a duração do bloco (também serve como decorador)."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **rotulos)
+
+    def _amostras(self, chave: tuple[str, ...], serie) -> list[str]:
+        contagens, soma = serie[0][:], serie[1]
+        linhas = []
+        acumulado = 0
+        for limite, quantidade in zip(self.limites + (float("inf"),), contagens):
+            acumulado += quantidade
+            rotulos = _formatar_rotulos(self.rotulos, chave, f'le="{_formatar_numero(limite)}"')
+            linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+        rotulos = _formatar_rotulos(self.rotulos, chave)
+        linhas.append(f"{self.nome}_sum{rotulos} {_formatar_numero(soma)}")
+        linhas.append(f"{self.nome}_count{rotulos} {acumulado}")
+        return linhas
+
+
+class Registro:
+    """Conjunto de métricas exportadas juntas."""
+
+    def __init__(self):
+        self._metricas: dict[str, _Metrica] = {}
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        if metrica.nome in self._metricas:
+            raise ValueError(f"Métrica duplicada: {metrica.nome}")
+        self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def exportar(self) -> str:
+        linhas = []
+        for metrica in self._metricas.values():
+            linhas.extend(metrica.linhas())
+        return "\n".join(linhas) + "\n"
+
+
+REGISTRO = Registro()
+
+
+# ============================================================================
+# MÉTRICAS DO APP
+# ============================================================================
+
+REQUISICOES_DURACAO = REGISTRO.registrar(Histograma(
+    "fluxoland_http_requisicao_segundos",
+    "Duração das requisições HTTP por rota (caminho da rota, não a URL).",
+    ("metodo", "rota", "status"),
+))
+REQUISICOES_EM_ANDAMENTO = REGISTRO.registrar(Medidor(
+    "fluxoland_http_requisicoes_em_andamento",
+    "Requisições HTTP sendo atendidas agora.",
+))
+
+POOL_ESPERA = REGISTRO.registrar(Histograma(
+    "fluxoland_db_pool_espera_segundos",
+    "Tempo para obter uma conexão do pool (fila, conexão nova e pre-ping).",
+    limites=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+))
+
+IMPORTACAO_ETAPA = REGISTRO.registrar(Histograma(
+    "fluxoland_importacao_etapa_segundos",
+    "Duração de cada etapa da importação do Bling (download, parse, gravacao).",
+    ("etapa",),
+))
+BLING_DOWNLOAD = REGISTRO.registrar(Histograma(
+    "fluxoland_bling_download_segundos",
+    "Latência das requisições ao doc.view do Bling.",
+    ("resultado",),
+))
+
+WHATSAPP_ENVIO = REGISTRO.registrar(Histograma(
+    "fluxoland_whatsapp_envio_segundos",
+    "Latência das chamadas ao webhook do BotConversa.",
+    ("resultado",),
+))
+WHATSAPP_FALHAS = REGISTRO.registrar(Contador(
+    "fluxoland_whatsapp_falhas_total",
+    "Mensagens de WhatsApp não entregues ao BotConversa (http = status de erro, excecao = rede/timeout).",
+    ("motivo",),
+))
+
+
+def instalar_metricas_pool(engine: Engine) -> None:
+    """Mede a obtenção de conexões e expõe o estado do pool do engine (idempotente)."""
+    if getattr(engine, "_metricas_instaladas", False):
+        return
+    raw_connection = engine.raw_connection
+
+    def raw_connection_medida():
+        with POOL_ESPERA.medir():
+            return raw_connection()
+
+    engine.raw_connection = raw_connection_medida
+    engine._metricas_instaladas = True
+
+    # SQLite usa pools sem estas contagens: as métricas só aparecem com QueuePool (PostgreSQL)
+    for nome, ajuda, leitura in (
+        ("fluxoland_db_pool_em_uso", "Conexões do pool emprestadas agora.", "checkedout"),
+        ("fluxoland_db_pool_overflow", "Conexões além de pool_size (negativo = vagas no pool).", "overflow"),
+        ("fluxoland_db_pool_tamanho", "pool_size configurado.", "size"),
+    ):
+        if hasattr(engine.pool, leitura) and nome not in REGISTRO._metricas:
+            REGISTRO.registrar(Medidor(nome, ajuda, coletar=lambda leitura=leitura: getattr(engine.pool, leitura)()))
+
+
+# ============================================================================
+# MIDDLEWARE E EXPOSIÇÃO
+# ============================================================================
+
+class MetricasMiddleware:
+    """Middleware ASGI: duração por rota e requisições em andamento (ignora estáticos e o /metrics)."""
+
+    def __init__(self, app, ignorar: tuple[str, ...] = ("/static/", "/metrics")):
+        self.app = app
+        self.ignorar = ignorar
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.ignorar):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            await send(mensagem)
+
+        REQUISICOES_EM_ANDAMENTO.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            REQUISICOES_EM_ANDAMENTO.dec()
+            # URLs sem rota (404) ficam num único rótulo: a cardinalidade não depende de quem acessa
+            rota = getattr(scope.get("route"), "path", "<sem rota>")
+            REQUISICOES_DURACAO.observar(
+                time.perf_counter() - inicio, metodo=scope["method"], rota=rota, status=status
+            )
+
+
+class _MetricasHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        corpo = REGISTRO.exportar().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", TIPO_CONTEUDO)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def iniciar_servidor_interno(host: str, porta: int) -> ThreadingHTTPServer | None:
+    """/metrics sem autenticação numa porta interna, em thread separada do event loop."""
+    try:
+        servidor = ThreadingHTTPServer((host, porta), _MetricasHandler)
+    except OSError as e:
+        # Com --workers, só o primeiro worker consegue a porta
+        logger.info(f"Porta de métricas {host}:{porta} indisponível neste processo: {e}")
+        return None
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="metricas", daemon=True).start()
+    logger.info(f"Métricas em http://{host}:{porta}/metrics")
+    return servidor
@@ -0,0 +1,93 @@
+"""Monitor do event loop: avisa quando um callback segura o loop além do limite.
+
+Enquanto um callback roda no loop (código síncrono dentro de um `async def`,
+por exemplo uma consulta ou um `requests.post`), nenhuma outra requisição do
+worker avança. O monitor tem duas partes:
+
+- uma tarefa de batimento no loop, que dorme `intervalo` e mede quanto
+  acordou atrasada. Esse atraso é o tempo de bloqueio, vai para o histograma
+  do /metrics e, acima do limite, para o log;
+- uma thread vigia, que percebe o batimento parado e copia a pilha da thread
+  do loop nesse momento. O warning mostra onde o loop estava preso.
+
+Funciona com o loop padrão e com o uvloop: não depende de detalhes internos
+do asyncio.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from utils.metricas import REGISTRO, Histograma
+
+logger = logging.getLogger(__name__)
+
+# Frames da pilha do loop mostrados no log (os mais internos)
+MAX_FRAMES_LOG = 12
+
+EVENT_LOOP_ATRASO = REGISTRO.registrar(Histograma(
+    "fluxoland_event_loop_atraso_segundos",
+    "Atraso do batimento do event loop (tempo em que um callback segurou o loop).",
+    limites=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+))
+
+
+class MonitorEventLoop:
+    """Batimento no loop + thread vigia que captura a pilha durante um bloqueio."""
+
+    def __init__(self, limite_ms: float, intervalo_ms: float | None = None):
+        self.limite = limite_ms / 1000
+        # Batimento mais curto que o limite: o bloqueio é visto enquanto ainda acontece
+        self.intervalo = (intervalo_ms / 1000) if intervalo_ms else max(self.limite / 4, 0.005)
+        self._batimento = time.monotonic()
+        self._thread_loop: int | None = None
+        self._pilha: list[str] | None = None
+        self._parar = threading.Event()
+        self._tarefa: asyncio.Task | None = None
+        self._vigia: threading.Thread | None = None
+
+    def iniciar(self) -> None:
+        """Chamado de dentro do loop (lifespan)."""
+        self._thread_loop = threading.get_ident()
+        self._batimento = time.monotonic()
+        self._parar.clear()
+        self._tarefa = asyncio.get_running_loop().create_task(self._bater())
+        self._vigia = threading.Thread(target=self._vigiar, name="monitor-loop", daemon=True)
+        self._vigia.start()
+        logger.info(f"Monitor do event loop ativo (limite {self.limite * 1000:.0f} ms)")
+
+    def parar(self) -> None:
+        self._parar.set()
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            self._tarefa = None
+
+    async def _bater(self) -> None:
+        while True:
+            inicio = time.monotonic()
+            await asyncio.sleep(self.intervalo)
+            agora = time.monotonic()
+            self._batimento = agora
+            atraso = max(0.0, agora - inicio - self.intervalo)
+            EVENT_LOOP_ATRASO.observar(atraso)
+            if atraso > self.limite:
+                self._avisar(atraso)
+            self._pilha = None
+
+    def _vigiar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            parado = time.monotonic() - self._batimento
+            if parado > self.limite + self.intervalo and self._pilha is None:
+                frame = sys._current_frames().get(self._thread_loop)
+                if frame is not None:
+                    self._pilha = traceback.format_stack(frame)[-MAX_FRAMES_LOG:]
+
+    def _avisar(self, atraso: float) -> None:
+        pilha = self._pilha
+        detalhe = ("\nPilha do loop durante o bloqueio:\n" + "".join(pilha)) if pilha else ""
+        logger.warning(f"Event loop bloqueado por {atraso * 1000:.0f} ms (limite {self.limite * 1000:.0f} ms){detalhe}")
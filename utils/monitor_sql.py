@@ -0,0 +1,171 @@
+"""Contagem de consultas SQL e tempo de banco por requisição.
+
+Os eventos `before/after_cursor_execute` do engine registram cada statement no
+contador da requisição atual (um ContextVar: endpoints síncronos rodam no
+threadpool com uma cópia do contexto e enxergam o mesmo contador). O
+middleware abre o contador, avisa no log quando a rota passa do orçamento ou
+repete a mesma consulta muitas vezes (N+1) e, em modo debug, devolve os
+números nos cabeçalhos da resposta.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+# Statements guardados por requisição para o diagnóstico (a contagem não tem limite)
+MAX_INSTRUCOES_GUARDADAS = 200
+
+_contador_atual: ContextVar[ContadorConsultas | None] = ContextVar("contador_consultas", default=None)
+
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|%\(\w+\)s|%s|\$\d+|\b\d+(?:\.\d+)?\b")
+_LISTAS = re.compile(r"\(\?(?:\s*,\s*\?)+\)")
+_GRUPOS_REPETIDOS = re.compile(r"(\(\?\))(?:\s*,\s*\1)+")
+
+
+@lru_cache(maxsize=1024)
+def forma_consulta(sql: str) -> str:
+    """SQL sem literais nem parâmetros: consultas que só mudam os valores têm a mesma forma."""
+    forma = _LITERAIS.sub("?", " ".join(sql.split()))
+    forma = _LISTAS.sub("(?)", forma)
+    return _GRUPOS_REPETIDOS.sub(r"\1", forma)
+
+
+class ContadorConsultas:
+    """Consultas executadas em um trecho (normalmente uma requisição)."""
+
+    __slots__ = ("quantidade", "tempo_s", "formas", "instrucoes")
+
+    def __init__(self):
+        self.quantidade = 0
+        self.tempo_s = 0.0
+        self.formas: Counter[str] = Counter()
+        self.instrucoes: list[tuple[str, float]] = []
+
+    @property
+    def tempo_ms(self) -> float:
+        return self.tempo_s * 1000
+
+    def registrar(self, sql: str, duracao_s: float) -> None:
+        self.quantidade += 1
+        self.tempo_s += duracao_s
+        self.formas[forma_consulta(sql)] += 1
+        if len(self.instrucoes) < MAX_INSTRUCOES_GUARDADAS:
+            self.instrucoes.append((sql, duracao_s))
+
+    def repetidas(self, minimo: int) -> list[tuple[str, int]]:
+        """Formas executadas pelo menos `minimo` vezes, da mais repetida para a menos."""
+        return [(forma, vezes) for forma, vezes in self.formas.most_common() if vezes >= minimo]
+
+
+@contextmanager
+def contar_consultas() -> Iterator[ContadorConsultas]:
+    """Conta as consultas feitas dentro do bloco (no contexto atual)."""
+    contador = ContadorConsultas()
+    token = _contador_atual.set(contador)
+    try:
+        yield contador
+    finally:
+        _contador_atual.reset(token)
+
+
+# ============================================================================
+# EVENTOS DO ENGINE
+# ============================================================================
+
+def _antes_de_executar(conn, cursor, statement, parameters, context, executemany):
+    if _contador_atual.get() is not None:
+        conn.info.setdefault("monitor_sql_inicio", []).append(time.perf_counter())
+
+
+def _depois_de_executar(conn, cursor, statement, parameters, context, executemany):
+    contador = _contador_atual.get()
+    inicios = conn.info.get("monitor_sql_inicio")
+    if contador is not None and inicios:
+        contador.registrar(statement, time.perf_counter() - inicios.pop())
+
+
+def instalar_monitor(engine: Engine) -> None:
+    """Liga a contagem no engine (idempotente). Sem contador ativo o custo é um ContextVar.get()."""
+    if not event.contains(engine, "before_cursor_execute", _antes_de_executar):
+        event.listen(engine, "before_cursor_execute", _antes_de_executar)
+        event.listen(engine, "after_cursor_execute", _depois_de_executar)
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+def _resumir(forma: str, limite: int = 160) -> str:
+    return forma if len(forma) <= limite else forma[:limite] + "..."
+
+
+class MonitorConsultasMiddleware:
+    """Middleware ASGI: um ContadorConsultas por requisição HTTP (exceto arquivos estáticos)."""
+
+    def __init__(
+        self,
+        app,
+        orcamento_consultas: int,
+        orcamento_ms: float,
+        limite_repeticoes: int,
+        cabecalho: bool = False,
+    ):
+        self.app = app
+        self.orcamento_consultas = orcamento_consultas
+        self.orcamento_ms = orcamento_ms
+        self.limite_repeticoes = limite_repeticoes
+        self.cabecalho = cabecalho
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/static/"):
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(mensagem):
+            # TemplateResponse já renderizou: no início da resposta as consultas estão contadas
+            if self.cabecalho and mensagem["type"] == "http.response.start":
+                cabecalhos = MutableHeaders(scope=mensagem)
+                cabecalhos.append("X-SQL-Consultas", str(contador.quantidade))
+                cabecalhos.append("Server-Timing", f"db;dur={contador.tempo_ms:.1f}")
+            await send(mensagem)
+
+        with contar_consultas() as contador:
+            try:
+                await self.app(scope, receive, enviar)
+            finally:
+                self._avaliar(scope, contador)
+
+    def _avaliar(self, scope, contador: ContadorConsultas) -> None:
+        """Warning no log quando a requisição estoura o orçamento ou repete consultas."""
+        if not contador.quantidade:
+            return
+
+        problemas = []
+        if contador.quantidade > self.orcamento_consultas:
+            problemas.append(f"{contador.quantidade} consultas (orçamento {self.orcamento_consultas})")
+        if contador.tempo_ms > self.orcamento_ms:
+            problemas.append(f"{contador.tempo_ms:.0f} ms no banco (orçamento {self.orcamento_ms:.0f} ms)")
+        for forma, vezes in contador.repetidas(self.limite_repeticoes)[:3]:
+            problemas.append(f"repetida {vezes}x: {_resumir(forma)}")
+        if not problemas:
+            return
+
+        # Caminho da rota (/propostas/{proposta_id}) agrupa as requisições da mesma página
+        rota = getattr(scope.get("route"), "path", scope["path"])
+        logger.warning(
+            f"SQL {scope['method']} {rota}: {contador.quantidade} consultas, "
+            f"{contador.tempo_ms:.0f} ms | " + " | ".join(problemas)
+        )
@@ -0,0 +1,136 @@
+"""Paginação por keyset (cursor) para listagens.
+
+O cursor é um token opaco (base64 de JSON) com os valores da última linha
+exibida na ordem da listagem. A próxima página filtra "depois" dessa linha,
+então o custo não cresce com a profundidade da página (ao contrário de OFFSET).
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Sequence
+
+from sqlalchemy import and_, or_
+
+
+# Linhas por página nas listagens de cadastro (simulações, transportadoras, ...)
+ITENS_POR_PAGINA = 50
+
+
+def codificar_cursor(*valores: Any) -> str:
+    """Gera o token de página a partir dos valores da última linha."""
+    serializaveis = [
+        {"dt": v.isoformat()} if isinstance(v, datetime) else v
+        for v in valores
+    ]
+    bruto = json.dumps(serializaveis, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(bruto).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(token: str | None) -> list[Any] | None:
+    """Inverso de `codificar_cursor`. Retorna None para token ausente ou inválido."""
+    if not token:
+        return None
+    try:
+        preenchido = token + "=" * (-len(token) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(preenchido.encode("ascii")))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(valores, list):
+        return None
+
+    resultado = []
+    for v in valores:
+        if isinstance(v, dict) and "dt" in v:
+            try:
+                v = datetime.fromisoformat(v["dt"])
+            except (TypeError, ValueError):
+                return None
+        resultado.append(v)
+    return resultado
+
+
+def filtro_apos(coluna_ordem, coluna_id, valor_ordem: Any, valor_id: int, *, desc: bool = True):
+    """Condição "linha vem depois de (valor_ordem, valor_id)" na ordenação (coluna_ordem, coluna_id).
+
+    Escrita com OR/AND (e não comparação de tupla) para aproveitar o índice
+    composto tanto no PostgreSQL quanto no SQLite.
+    """
+    if desc:
+        return or_(
+            coluna_ordem < valor_ordem,
+            and_(coluna_ordem == valor_ordem, coluna_id < valor_id),
+        )
+    return or_(
+        coluna_ordem > valor_ordem,
+        and_(coluna_ordem == valor_ordem, coluna_id > valor_id),
+    )
+
+
+
+def _filtro_apos_colunas(colunas: Sequence, valores: Sequence, desc: bool):
+    """Generalização de `filtro_apos` para N colunas na mesma direção."""
+    condicoes = []
+    for i, coluna in enumerate(colunas):
+        iguais = [colunas[j] == valores[j] for j in range(i)]
+        comparacao = coluna < valores[i] if desc else coluna > valores[i]
+        condicoes.append(and_(*iguais, comparacao))
+    return or_(*condicoes)
+
+
+def filtro_busca(termo: str | None, *colunas):
+    """`coluna ILIKE %termo%` em qualquer das colunas (None se o termo for vazio)."""
+    termo = (termo or "").strip()
+    if not termo:
+        return None
+    escapado = termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return or_(*[coluna.ilike(f"%{escapado}%", escape="\\") for coluna in colunas])
+
+
+class Pagina:
+    """Itens de uma página e os tokens das páginas vizinhas (None quando não há)."""
+
+    __slots__ = ("itens", "proximo", "anterior")
+
+    def __init__(self, itens: list, proximo: str | None, anterior: str | None):
+        self.itens = itens
+        self.proximo = proximo
+        self.anterior = anterior
+
+
+def paginar(query, colunas: Sequence, token: str | None, limite: int = ITENS_POR_PAGINA, *, desc: bool = False) -> Pagina:
+    """Uma página de `query` ordenada por `colunas` (a última deve ser única, ex.: id).
+
+    O token carrega a direção ("a" = depois de, "b" = antes de) e os valores
+    da linha de referência; os valores de cada linha são lidos pelos nomes
+    das colunas. Token inválido volta para a primeira página.
+    """
+    posicao = decodificar_cursor(token)
+    if posicao and (len(posicao) != len(colunas) + 1 or posicao[0] not in ("a", "b")):
+        posicao = None
+
+    voltando = bool(posicao) and posicao[0] == "b"
+    ordem_desc = desc != voltando
+    ordem = [coluna.desc() if ordem_desc else coluna.asc() for coluna in colunas]
+    if posicao:
+        query = query.filter(_filtro_apos_colunas(colunas, posicao[1:], ordem_desc))
+
+    # Uma linha a mais só para saber se existe página seguinte nessa direção.
+    linhas = query.order_by(*ordem).limit(limite + 1).all()
+    ha_mais = len(linhas) > limite
+    itens = linhas[:limite]
+    if voltando:
+        itens.reverse()
+    if not itens:
+        return Pagina([], None, None)
+
+    def _token(direcao: str, linha) -> str:
+        return codificar_cursor(direcao, *[getattr(linha, coluna.key) for coluna in colunas])
+
+    if voltando:
+        return Pagina(itens, _token("a", itens[-1]), _token("b", itens[0]) if ha_mais else None)
+    return Pagina(
+        itens,
+        _token("a", itens[-1]) if ha_mais else None,
+        _token("b", itens[0]) if posicao else None,
+    )
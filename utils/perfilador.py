@@ -0,0 +1,389 @@
+"""Perfilador por amostragem sob demanda: as próximas N requisições de uma rota.
+
+Um líder arma o perfil na página /admin/perfis. O pedido vai para um
+arquivo no diretório de cache, visível para todos os workers; só o worker
+que detém a trava "perfilador" mede, e assim as N requisições são contadas
+num lugar só.
+
+Enquanto uma requisição perfilada está em andamento, uma thread lê
+`sys._current_frames()` a cada `intervalo_ms`. Ela guarda só as pilhas que
+passam pelo endpoint da rota (do endpoint para dentro: serviços, consultas,
+templates). O custo fica nessas requisições; as demais pagam um `os.stat`
+por requisição.
+
+O resultado fica em pilhas colapsadas (`a;b;c 12`), que o flamegraph.pl e o
+speedscope abrem direto, mais um JSON com os metadados.
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from starlette.routing import Match
+
+from utils.cache import MarcadorInvalidacao, TravaArquivo, _diretorio_marcadores
+
+logger = logging.getLogger(__name__)
+
+# Perfis guardados (os mais antigos são apagados)
+MAX_PERFIS = 20
+# Pedido esquecido deixa de valer depois disto
+VALIDADE_PEDIDO_S = 3600
+# Frames por pilha (recursão profunda não gera linhas gigantes)
+MAX_PROFUNDIDADE = 120
+
+
+def diretorio_perfis() -> str:
+    return os.path.join(_diretorio_marcadores(), "fluxoland-perfis")
+
+
+def _caminho_pedido() -> str:
+    return os.path.join(_diretorio_marcadores(), "fluxoland-perfil-pedido.json")
+
+
+def _gravar_json(caminho: str, dados: dict) -> None:
+    """Escrita atômica (outro worker nunca lê o arquivo pela metade)."""
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def perfilar_com(endpoint):
+    """Decorador: as amostras da função contam no perfil de `endpoint`.
+
+    Para o trabalho que um endpoint async leva ao threadpool: essa thread não
+    tem o endpoint na pilha e ficaria fora do perfil.
+    """
+    def decorar(funcao):
+        endpoint.perfil_auxiliares = (*getattr(endpoint, "perfil_auxiliares", ()), funcao)
+        return funcao
+    return decorar
+
+
+def _nome_frame(frame) -> str:
+    codigo = frame.f_code
+    modulo = frame.f_globals.get("__name__", "?")
+    return f"{modulo}:{getattr(codigo, 'co_qualname', codigo.co_name)}"
+
+
+# ============================================================================
+# AMOSTRAGEM
+# ============================================================================
+
+class _Amostrador(threading.Thread):
+    """Lê as pilhas de todas as threads e conta as que passam por um dos `alvos` (code objects)."""
+
+    def __init__(self, sessao: SessaoPerfil):
+        super().__init__(name="perfilador", daemon=True)
+        self.sessao = sessao
+        self.parar = threading.Event()
+
+    def run(self):
+        intervalo = self.sessao.intervalo_ms / 1000
+        while not self.parar.wait(intervalo):
+            self.amostrar()
+
+    def amostrar(self) -> None:
+        alvos = self.sessao.alvos
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self.ident:
+                continue
+            pilha = []
+            while frame is not None and len(pilha) < MAX_PROFUNDIDADE:
+                pilha.append(_nome_frame(frame))
+                if frame.f_code in alvos:
+                    self.sessao.registrar_pilha(";".join(reversed(pilha)))
+                    break
+                frame = frame.f_back
+
+
+class SessaoPerfil:
+    """Um pedido sendo atendido por este worker: pilhas, durações e vagas restantes."""
+
+    def __init__(self, pedido: dict):
+        self.id = pedido["id"]
+        self.rota = pedido["rota"]
+        self.metodo = pedido["metodo"]
+        self.requisicoes = int(pedido["requisicoes"])
+        self.intervalo_ms = float(pedido["intervalo_ms"])
+        self.criado_em = pedido["criado_em"]
+        self.expira_em = float(pedido["expira_em"])
+        self.alvos: set = set()
+        self.pilhas: Counter[str] = Counter()
+        self.amostras = 0
+        self.duracoes_ms: list[float] = []
+        self.iniciadas = 0
+        self.em_andamento = 0
+        self._lock = threading.Lock()
+        self._amostrador: _Amostrador | None = None
+
+    @property
+    def completa(self) -> bool:
+        return len(self.duracoes_ms) >= self.requisicoes
+
+    def registrar_pilha(self, pilha: str) -> None:
+        with self._lock:
+            self.pilhas[pilha] += 1
+            self.amostras += 1
+
+    def reservar(self, endpoint) -> bool:
+        """Ocupa uma das N vagas e liga o amostrador; False se as vagas acabaram."""
+        with self._lock:
+            if self.iniciadas >= self.requisicoes:
+                return False
+            self.iniciadas += 1
+            self.em_andamento += 1
+            endpoint = inspect.unwrap(endpoint)
+            self.alvos.add(endpoint.__code__)
+            self.alvos.update(auxiliar.__code__ for auxiliar in getattr(endpoint, "perfil_auxiliares", ()))
+            if self._amostrador is None:
+                self._amostrador = _Amostrador(self)
+                self._amostrador.start()
+            return True
+
+    def concluir(self, duracao_s: float) -> None:
+        with self._lock:
+            self.duracoes_ms.append(duracao_s * 1000)
+            self.em_andamento -= 1
+            if self.em_andamento == 0 and self._amostrador is not None:
+                self._amostrador.parar.set()
+                self._amostrador = None
+
+    def parar(self) -> None:
+        with self._lock:
+            if self._amostrador is not None:
+                self._amostrador.parar.set()
+                self._amostrador = None
+
+    def gravar(self) -> None:
+        os.makedirs(diretorio_perfis(), exist_ok=True)
+        base = os.path.join(diretorio_perfis(), self.id)
+        with open(f"{base}.txt", "w", encoding="utf-8") as arquivo:
+            for pilha, quantidade in self.pilhas.most_common():
+                arquivo.write(f"{pilha} {quantidade}\n")
+        duracoes = sorted(self.duracoes_ms)
+        _gravar_json(f"{base}.json", {
+            "id": self.id,
+            "rota": self.rota,
+            "metodo": self.metodo,
+            "requisicoes": len(duracoes),
+            "requisicoes_pedidas": self.requisicoes,
+            "intervalo_ms": self.intervalo_ms,
+            "amostras": self.amostras,
+            "duracao_mediana_ms": duracoes[len(duracoes) // 2] if duracoes else None,
+            "duracao_max_ms": duracoes[-1] if duracoes else None,
+            "criado_em": self.criado_em,
+            "concluido_em": datetime.now().isoformat(timespec="seconds"),
+            "pid": os.getpid(),
+        })
+        _limpar_antigos()
+
+
+def _limpar_antigos() -> None:
+    perfis = listar_perfis()
+    for antigo in perfis[MAX_PERFIS:]:
+        for extensao in (".txt", ".json"):
+            try:
+                os.remove(os.path.join(diretorio_perfis(), antigo["id"] + extensao))
+            except OSError:
+                pass
+
+
+# ============================================================================
+# COORDENAÇÃO ENTRE WORKERS
+# ============================================================================
+
+class Perfilador:
+    """Estado do perfilador neste processo (pedido vigente, liderança e sessão)."""
+
+    def __init__(self):
+        self.marcador = MarcadorInvalidacao("perfil-pedido")
+        self.trava = TravaArquivo("perfilador")
+        self.lider = False
+        self.sessao: SessaoPerfil | None = None
+        self._geracao_vista = -1
+        self._lock = threading.Lock()
+
+    # ---- pedidos (qualquer worker) ----
+
+    def armar(self, metodo: str, rota: str, requisicoes: int, intervalo_ms: float) -> dict:
+        pedido = {
+            "id": datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6],
+            "metodo": metodo,
+            "rota": rota,
+            "requisicoes": requisicoes,
+            "intervalo_ms": intervalo_ms,
+            "criado_em": datetime.now().isoformat(timespec="seconds"),
+            "expira_em": time.time() + VALIDADE_PEDIDO_S,
+        }
+        _gravar_json(_caminho_pedido(), pedido)
+        self.marcador.invalidar()
+        logger.info(f"Perfil armado: {metodo} {rota}, {requisicoes} requisições a cada {intervalo_ms:g} ms")
+        return pedido
+
+    def cancelar(self) -> None:
+        try:
+            os.remove(_caminho_pedido())
+        except OSError:
+            pass
+        self.marcador.invalidar()
+
+    @staticmethod
+    def pedido_atual() -> dict | None:
+        try:
+            with open(_caminho_pedido(), encoding="utf-8") as arquivo:
+                pedido = json.load(arquivo)
+        except (OSError, ValueError):
+            return None
+        return pedido if pedido.get("expira_em", 0) > time.time() else None
+
+    # ---- medição (worker líder) ----
+
+    def _sincronizar(self) -> None:
+        geracao = self.marcador.geracao()
+        if geracao == self._geracao_vista:
+            return
+        with self._lock:
+            if geracao == self._geracao_vista:
+                return
+            self._geracao_vista = geracao
+            pedido = self.pedido_atual()
+            if self.sessao is not None and (pedido is None or pedido["id"] != self.sessao.id):
+                self.sessao.parar()  # cancelado ou substituído: descarta
+                self.sessao = None
+            if pedido is None:
+                return
+            if not self.lider:
+                # O líder anterior pode ter morrido: a trava do SO foi liberada com ele
+                self.lider = self.trava.tentar(esperar=False)
+            if self.lider and self.sessao is None:
+                self.sessao = SessaoPerfil(pedido)
+
+    def sessao_para(self, scope) -> tuple[SessaoPerfil, object] | None:
+        """Sessão e endpoint se esta requisição deve ser perfilada (custo sem pedido: um os.stat)."""
+        self._sincronizar()
+        sessao = self.sessao
+        if sessao is None:
+            return None
+        if time.time() > sessao.expira_em:
+            self._finalizar(sessao)
+            return None
+        if scope["method"] != sessao.metodo:
+            return None
+        for route in scope["app"].router.routes:
+            correspondencia, _ = route.matches(scope)
+            if correspondencia == Match.FULL:
+                if getattr(route, "path", None) == sessao.rota and hasattr(route, "endpoint"):
+                    return sessao, route.endpoint
+                return None
+        return None
+
+    def concluir(self, sessao: SessaoPerfil, duracao_s: float) -> None:
+        sessao.concluir(duracao_s)
+        if sessao.completa:
+            self._finalizar(sessao)
+
+    def _finalizar(self, sessao: SessaoPerfil) -> None:
+        with self._lock:
+            if self.sessao is not sessao:
+                return
+            self.sessao = None
+        sessao.parar()
+        try:
+            sessao.gravar()
+            logger.info(
+                f"Perfil {sessao.id} concluído: {sessao.metodo} {sessao.rota}, "
+                f"{len(sessao.duracoes_ms)} requisições, {sessao.amostras} amostras"
+            )
+        except OSError as e:
+            logger.warning(f"Perfil {sessao.id} não foi gravado: {e}")
+        pedido = self.pedido_atual()
+        if pedido and pedido["id"] == sessao.id:
+            self.cancelar()
+
+
+perfilador = Perfilador()
+
+
+# ============================================================================
+# LEITURA DOS RESULTADOS
+# ============================================================================
+
+def listar_perfis() -> list[dict]:
+    """Metadados dos perfis gravados, do mais recente para o mais antigo."""
+    try:
+        nomes = [nome for nome in os.listdir(diretorio_perfis()) if nome.endswith(".json")]
+    except OSError:
+        return []
+    perfis = []
+    for nome in nomes:
+        try:
+            with open(os.path.join(diretorio_perfis(), nome), encoding="utf-8") as arquivo:
+                perfis.append(json.load(arquivo))
+        except (OSError, ValueError):
+            continue
+    return sorted(perfis, key=lambda perfil: perfil["id"], reverse=True)
+
+
+def caminho_pilhas(perfil_id: str) -> str | None:
+    """Arquivo de pilhas colapsadas do perfil (None se o id não existir ou for inválido)."""
+    if not perfil_id.replace("-", "").isalnum():
+        return None
+    caminho = os.path.join(diretorio_perfis(), f"{perfil_id}.txt")
+    return caminho if os.path.exists(caminho) else None
+
+
+def resumir_pilhas(caminho: str, limite: int = 30) -> tuple[int, list[tuple[str, int, int]]]:
+    """Total de amostras e as funções mais quentes: (função, amostras próprias, amostras incluindo chamadas)."""
+    proprio: Counter[str] = Counter()
+    inclusivo: Counter[str] = Counter()
+    total = 0
+    with open(caminho, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            pilha, _, quantidade = linha.rstrip("\n").rpartition(" ")
+            quantidade = int(quantidade)
+            frames = pilha.split(";")
+            total += quantidade
+            proprio[frames[-1]] += quantidade
+            for frame in set(frames):
+                inclusivo[frame] += quantidade
+    funcoes = sorted(inclusivo, key=lambda nome: (proprio[nome], inclusivo[nome]), reverse=True)[:limite]
+    return total, [(nome, proprio[nome], inclusivo[nome]) for nome in funcoes]
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+class PerfiladorMiddleware:
+    """Middleware ASGI: liga o amostrador nas requisições do pedido vigente."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/static/"):
+            await self.app(scope, receive, send)
+            return
+
+        alvo = perfilador.sessao_para(scope)
+        if alvo is None or not alvo[0].reservar(alvo[1]):
+            await self.app(scope, receive, send)
+            return
+
+        sessao = alvo[0]
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            perfilador.concluir(sessao, time.perf_counter() - inicio)
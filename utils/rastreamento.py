@@ -0,0 +1,173 @@
+"""Rastreamento leve: spans aninhados por contexto, exportação e trace id nos logs.
+
+    with span("importacao", lento_ms=5000, link=link):
+        with span("bling.download"):
+            ...
+
+O span aberto fica num ContextVar: chamadas feitas dentro do bloco (inclusive
+em funções decoradas com `@span("nome")`) viram filhos dele. Quando o span
+raiz termina, o rastro completo vai para os exportadores configurados
+(`console` = log, `arquivo` = uma linha JSON por rastro). Com `lento_ms`, um
+span que passar do limite gera um warning com a árvore de tempos dele.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+_span_atual: ContextVar[Span | None] = ContextVar("span_atual", default=None)
+
+
+class Span:
+    """Trecho medido de um rastro, com atributos e filhos."""
+
+    __slots__ = ("nome", "trace_id", "span_id", "pai_id", "atributos", "inicio", "duracao_s", "erro", "filhos", "_relogio")
+
+    def __init__(self, nome: str, pai: Span | None, atributos: dict):
+        self.nome = nome
+        self.trace_id = pai.trace_id if pai else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.pai_id = pai.span_id if pai else None
+        self.atributos = atributos
+        self.inicio = datetime.now(timezone.utc)
+        self.duracao_s = 0.0
+        self.erro: str | None = None
+        self.filhos: list[Span] = []
+        self._relogio = time.perf_counter()
+
+    @property
+    def duracao_ms(self) -> float:
+        return self.duracao_s * 1000
+
+    def como_dict(self) -> dict:
+        return {
+            "nome": self.nome,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "pai_id": self.pai_id,
+            "inicio": self.inicio.isoformat(),
+            "duracao_ms": round(self.duracao_ms, 3),
+            "atributos": self.atributos,
+            "erro": self.erro,
+            "filhos": [filho.como_dict() for filho in self.filhos],
+        }
+
+    def arvore(self, nivel: int = 0) -> list[str]:
+        """Uma linha por span, indentada pela profundidade: `nome  123.4 ms  chave=valor`."""
+        detalhes = " ".join(f"{chave}={valor}" for chave, valor in self.atributos.items())
+        linha = f"{'  ' * nivel}{self.nome:<{max(1, 32 - 2 * nivel)}} {self.duracao_ms:>9.1f} ms"
+        if detalhes:
+            linha += f"  {detalhes}"
+        if self.erro:
+            linha += f"  ERRO {self.erro}"
+        linhas = [linha]
+        for filho in self.filhos:
+            linhas.extend(filho.arvore(nivel + 1))
+        return linhas
+
+
+@contextmanager
+def span(nome: str, lento_ms: float | None = None, **atributos) -> Iterator[Span]:
+    """Abre um span filho do atual (ou um rastro novo); também serve como decorador."""
+    pai = _span_atual.get()
+    atual = Span(nome, pai, atributos)
+    token = _span_atual.set(atual)
+    try:
+        yield atual
+    except BaseException as e:
+        atual.erro = f"{e.__class__.__name__}: {e}"
+        raise
+    finally:
+        atual.duracao_s = time.perf_counter() - atual._relogio
+        if pai is not None:
+            pai.filhos.append(atual)
+        # Ainda dentro do span: o log de lentidão e o exportador de console saem com o trace id
+        if lento_ms is not None and atual.duracao_ms >= lento_ms:
+            logger.warning(
+                f"{nome} lento: {atual.duracao_ms:.0f} ms (limite {lento_ms:.0f} ms)\n" + "\n".join(atual.arvore())
+            )
+        if pai is None:
+            _exportar(atual)
+        _span_atual.reset(token)
+
+
+def span_atual() -> Span | None:
+    return _span_atual.get()
+
+
+def trace_id_atual() -> str | None:
+    atual = _span_atual.get()
+    return atual.trace_id if atual else None
+
+
+# ============================================================================
+# EXPORTADORES
+# ============================================================================
+
+_exportadores: list[Callable[[Span], None]] = []
+
+
+def exportar_console(raiz: Span) -> None:
+    logger.info(f"Rastro {raiz.nome} ({raiz.duracao_ms:.0f} ms)\n" + "\n".join(raiz.arvore()))
+
+
+class ExportadorArquivo:
+    """Acrescenta cada rastro como uma linha JSON (seguro entre threads; entre workers, O_APPEND)."""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+
+    def __call__(self, raiz: Span) -> None:
+        linha = json.dumps(raiz.como_dict(), ensure_ascii=False, default=str) + "\n"
+        with self._lock, open(self.caminho, "a", encoding="utf-8") as arquivo:
+            arquivo.write(linha)
+
+
+def configurar_exportadores(nomes: str, arquivo: str) -> None:
+    """`nomes`: lista separada por vírgula de `console` e `arquivo` (vazio = só os logs de lentidão)."""
+    _exportadores.clear()
+    for nome in filter(None, (parte.strip() for parte in nomes.split(","))):
+        if nome == "console":
+            _exportadores.append(exportar_console)
+        elif nome == "arquivo":
+            _exportadores.append(ExportadorArquivo(arquivo))
+        else:
+            logger.warning(f"Exportador de rastros desconhecido: {nome}")
+
+
+def _exportar(raiz: Span) -> None:
+    for exportador in _exportadores:
+        try:
+            exportador(raiz)
+        except Exception as e:  # exportação nunca derruba a operação rastreada
+            logger.warning(f"Falha ao exportar rastro {raiz.trace_id}: {e}")
+
+
+# ============================================================================
+# LOGS
+# ============================================================================
+
+def instalar_trace_id_nos_logs() -> None:
+    """Todo LogRecord ganha `trace_id` (ou "-"), para usar no formato: `%(trace_id)s`."""
+    fabrica_original = logging.getLogRecordFactory()
+    if getattr(fabrica_original, "_com_trace_id", False):
+        return
+
+    def fabrica(*args, **kwargs):
+        registro = fabrica_original(*args, **kwargs)
+        registro.trace_id = trace_id_atual() or "-"
+        return registro
+
+    fabrica._com_trace_id = True
+    logging.setLogRecordFactory(fabrica)